@@ -1,235 +1,419 @@
 import os
+import sys
 import logging
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session
+import decimal
+import functools
+import orjson
+from types import MappingProxyType
+from flask import Flask, Blueprint, Response, render_template, request, jsonify, flash, redirect, url_for, session, send_file
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import QueuePool
+import audit
+from schemas import (parse_request, WriteFileRequest, DeleteFileRequest, ExecuteCodeRequest,
+                     CreateProjectRequest, GitCommitRequest, InstallPackageRequest,
+                     GenerateCodeRequest, FetchExternalRequest, CreateDocumentRequest)
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+class JsonLogFormatter(logging.Formatter):
+    """
+    Render log records as one JSON object per line.
+    """
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode()
+
+# Configure logging: INFO unless LOG_LEVEL says otherwise, JSON lines with LOG_FORMAT=json
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
+if os.environ.get("LOG_FORMAT") == "json":
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(JsonLogFormatter())
 
 class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
 
+def _orjson_default(obj):
+    # orjson handles datetime, UUID and dataclasses natively; cover the
+    # remaining types Flask's default provider knows about
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, MappingProxyType):
+        # Read-only document views from the in-memory database
+        return dict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider that serializes with orjson instead of the stdlib json module.
+    """
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def _json(data, status=200):
+    """
+    Build a JSON response directly from orjson bytes, skipping jsonify.
+    Used on read paths that can return large payloads.
+    """
+    body = orjson.dumps(data, default=_orjson_default, option=OrjsonProvider.option)
+    return Response(body, status=status, mimetype="application/json")
+
 # Create the Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev_secret_key")
 
+# Compress JSON payloads and the page templates; send_file responses are
+# passed through untouched
+app.config["COMPRESS_MIMETYPES"] = ["application/json", "text/html"]
+app.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+Compress(app)
+
 # Configure the database if available
 database_url = os.environ.get("DATABASE_URL")
 if database_url:
     app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    # pool_pre_ping issues a SELECT 1 on every checkout, which leaves backends
+    # idle in transaction behind PgBouncer's transaction pooling. Keep it off
+    # by default and recycle connections before PgBouncer's server_idle_timeout;
+    # set DB_POOL_PRE_PING=true only when connecting straight to Postgres.
     app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
+        "poolclass": QueuePool,
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 60)),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "false").lower() == "true",
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 5)),
+        "pool_timeout": 30,
+        "pool_use_lifo": True,
     }
     db.init_app(app)
 
-    with app.app_context():
-        # Import models here
-        import models
+    # Import models here
+    import models
+
+    # Creating tables costs information_schema round-trips, so run it once at
+    # deploy time with `flask --app main db-init` rather than in every worker.
+    # The run commands in .replit do this before starting gunicorn.
+    # DB_AUTO_CREATE=1 restores creating them on startup.
+    if os.environ.get("DB_AUTO_CREATE") == "1":
+        with app.app_context():
+            db.create_all()
+            models.create_monthly_partitions()
+
+    @app.cli.command("db-init")
+    def db_init():
+        """Create database tables for all models."""
         db.create_all()
+        models.create_monthly_partitions()
+        logging.info("Database tables created")
+
+    @app.cli.command("db-partitions")
+    def db_partitions():
+        """Create upcoming monthly partitions for the audit tables.
+
+        The audit writer already does this daily; run it by hand after
+        applying migrations/0003_partition_audit_tables.sql.
+        """
+        models.create_monthly_partitions()
+        logging.info("Audit table partitions created")
+
+    audit.start_worker(app, db)
 else:
     logging.warning("No DATABASE_URL found in environment variables. Database functionality disabled.")
-# Import utility modules
 
-from utils import file_operations, code_execution, project_management, \
-                 git_integration, package_management, user_interaction, \
-                 ai_features, api_utils, db_helper
+# Files at or above this size are served by /api/file/raw instead of JSON
+READ_FILE_JSON_LIMIT = int(os.environ.get("READ_FILE_JSON_LIMIT", 1024 * 1024))
+
+# Utility modules are resolved lazily on first use (see utils/__init__.py)
+import utils
+from utils.cache import TTLCache
+
+# Clients poll these idempotent reads; a sub-second TTL collapses bursts of
+# identical requests into one call
+_list_files_cache = TTLCache(ttl=1.0)
+_git_status_cache = TTLCache(ttl=1.0, maxsize=1)
+_collections_cache = TTLCache(ttl=1.0, maxsize=1)
+
+def _invalidate_git_status():
+    # Both this route-level cache and get_status's own cache outlive a file
+    # edit. If git_integration isn't loaded yet it has nothing cached, and
+    # file writes shouldn't pay for importing it
+    _git_status_cache.clear()
+    git_integration = sys.modules.get('utils.git_integration')
+    if git_integration is not None:
+        git_integration.invalidate_status_cache()
+
+# API endpoints are grouped into one blueprint per feature; they are
+# registered on the app at the bottom of this module
+file_bp = Blueprint('file', __name__, url_prefix='/api/file')
+code_bp = Blueprint('code', __name__, url_prefix='/api/code')
+project_bp = Blueprint('project', __name__, url_prefix='/api/project')
+git_bp = Blueprint('git', __name__, url_prefix='/api/git')
+package_bp = Blueprint('package', __name__, url_prefix='/api/package')
+ai_bp = Blueprint('ai', __name__, url_prefix='/api/ai')
+external_bp = Blueprint('external', __name__, url_prefix='/api/external')
+db_bp = Blueprint('db', __name__, url_prefix='/api/db')
+
+@functools.lru_cache(maxsize=32)
+def _render_cached(name, path):
+    return render_template(name)
+
+def _render_page(name):
+    """
+    Render a page template, reusing the HTML from earlier requests.
+    The pages take no context beyond the request path, so the output only
+    changes when the templates do; debug mode and pending flash messages
+    always render fresh.
+    """
+    if app.debug or session.get('_flashes'):
+        return render_template(name)
+    return _render_cached(name, request.path), 200, {'Cache-Control': 'public, max-age=60'}
 
 # Routes
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return _render_page('index.html')
 
 @app.route('/file-operations')
 def file_ops():
-    return render_template('file_operations.html')
+    return _render_page('file_operations.html')
 
-@app.route('/api/file/list', methods=['GET'])
+@file_bp.route('/list', methods=['GET'])
 def list_files():
     path = request.args.get('path', '.')
     try:
-        files = file_operations.list_files(path)
-        return jsonify({"status": "success", "files": files})
+        files = _list_files_cache.get(os.path.normpath(path), lambda: utils.file_operations.list_files(path))
+        return _json({"status": "success", "files": files})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
-@app.route('/api/file/read', methods=['GET'])
+@file_bp.route('/read', methods=['GET'])
 def read_file():
     path = request.args.get('path')
     if not path:
         return jsonify({"status": "error", "message": "No file path provided"}), 400
     try:
-        content = file_operations.read_file(path)
-        return jsonify({"status": "success", "content": content})
+        # Weak ETag from mtime and size lets polling editors get a 304
+        # without the file being read or encoded again
+        st = os.stat(path)
+        etag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        elif st.st_size >= READ_FILE_JSON_LIMIT:
+            # Too large to wrap in JSON; hand over to the streaming endpoint
+            return redirect(url_for('.raw_file', path=path), code=307)
+        else:
+            content = utils.file_operations.read_file(path)
+            response = _json({"status": "success", "content": content})
+        response.set_etag(etag, weak=True)
+        return response
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+@file_bp.route('/raw', methods=['GET'])
+def raw_file():
+    path = request.args.get('path')
+    if not path:
+        return jsonify({"status": "error", "message": "No file path provided"}), 400
+    try:
+        # send_file resolves relative paths against the app root, not the cwd
+        return send_file(os.path.abspath(path), conditional=True, etag=True)
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
-@app.route('/api/file/write', methods=['POST'])
+@file_bp.route('/write', methods=['POST'])
 def write_file():
-    data = request.json
-    path = data.get('path')
-    content = data.get('content')
-    if not path or content is None:
+    req = parse_request(WriteFileRequest)
+    if req is None or not req.path:
         return jsonify({"status": "error", "message": "Missing path or content"}), 400
     try:
-        file_operations.write_file(path, content)
+        utils.file_operations.write_file(req.path, req.content)
+        audit.record('FileOperation', operation_type='update', file_path=req.path)
+        _list_files_cache.clear()
+        _invalidate_git_status()
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
-@app.route('/api/file/delete', methods=['POST'])
+@file_bp.route('/delete', methods=['POST'])
 def delete_file():
-    data = request.json
-    path = data.get('path')
-    if not path:
+    req = parse_request(DeleteFileRequest)
+    if req is None or not req.path:
         return jsonify({"status": "error", "message": "No file path provided"}), 400
     try:
-        file_operations.delete_file(path)
+        utils.file_operations.delete_file(req.path)
+        audit.record('FileOperation', operation_type='delete', file_path=req.path)
+        _list_files_cache.clear()
+        _invalidate_git_status()
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/code-execution')
 def code_exec():
-    return render_template('code_execution.html')
+    return _render_page('code_execution.html')
 
-@app.route('/api/code/execute', methods=['POST'])
+@code_bp.route('/execute', methods=['POST'])
 def execute_code():
-    data = request.json
-    code = data.get('code')
-    language = data.get('language', 'python')
-    if not code:
+    req = parse_request(ExecuteCodeRequest)
+    if req is None or not req.code:
         return jsonify({"status": "error", "message": "No code provided"}), 400
     try:
-        result = code_execution.execute_code(code, language)
+        result = utils.code_execution.execute_code(req.code, req.language)
+        audit.record('CodeExecution', language=req.language, code_snippet=req.code,
+                     result=result['stdout'] if result['return_code'] == 0 else result['stderr'],
+                     execution_time=result['execution_time'])
         return jsonify({"status": "success", "result": result})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/project-management')
 def project_mgmt():
-    return render_template('project_management.html')
+    return _render_page('project_management.html')
 
-@app.route('/api/project/create', methods=['POST'])
+@project_bp.route('/create', methods=['POST'])
 def create_project():
-    data = request.json
-    name = data.get('name')
-    template = data.get('template')
-    if not name:
+    req = parse_request(CreateProjectRequest)
+    if req is None or not req.name:
         return jsonify({"status": "error", "message": "No project name provided"}), 400
     try:
-        project_management.create_project(name, template)
+        utils.project_management.create_project(req.name, req.template)
+        _invalidate_git_status()
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/git-integration')
 def git_page():
-    return render_template('git_integration.html')
+    return _render_page('git_integration.html')
 
-@app.route('/api/git/status', methods=['GET'])
+@git_bp.route('/status', methods=['GET'])
 def git_status():
     try:
-        status = git_integration.get_status()
+        status = _git_status_cache.get('status', utils.git_integration.get_status)
         return jsonify({"status": "success", "git_status": status})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
-@app.route('/api/git/commit', methods=['POST'])
+@git_bp.route('/commit', methods=['POST'])
 def git_commit():
-    data = request.json
-    message = data.get('message')
-    if not message:
+    req = parse_request(GitCommitRequest)
+    if req is None or not req.message:
         return jsonify({"status": "error", "message": "No commit message provided"}), 400
     try:
-        git_integration.commit(message)
+        utils.git_integration.commit(req.message)
+        audit.record('GitOperation', operation_type='commit', details=req.message)
+        _invalidate_git_status()
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/package-management')
 def package_mgmt():
-    return render_template('package_management.html')
+    return _render_page('package_management.html')
 
-@app.route('/api/package/install', methods=['POST'])
+@package_bp.route('/install', methods=['POST'])
 def install_package():
-    data = request.json
-    package_name = data.get('package')
-    if not package_name:
+    req = parse_request(InstallPackageRequest)
+    if req is None or not req.package:
         return jsonify({"status": "error", "message": "No package name provided"}), 400
     try:
-        package_management.install_package(package_name)
+        utils.package_management.install_package(req.package)
+        audit.record('PackageOperation', operation_type='install', package_name=req.package)
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/ai-features')
 def ai_page():
-    return render_template('ai_features.html')
+    return _render_page('ai_features.html')
 
-@app.route('/api/ai/generate', methods=['POST'])
+@ai_bp.route('/generate', methods=['POST'])
 def generate_code():
-    data = request.json
-    prompt = data.get('prompt')
-    if not prompt:
+    req = parse_request(GenerateCodeRequest)
+    if req is None or not req.prompt:
         return jsonify({"status": "error", "message": "No prompt provided"}), 400
     try:
-        generated_code = ai_features.generate_code(prompt)
+        generated_code = utils.ai_features.generate_code(req.prompt)
         return jsonify({"status": "success", "generated_code": generated_code})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
+@ai_bp.route('/generate/stream', methods=['POST'])
+def generate_code_stream():
+    req = parse_request(GenerateCodeRequest)
+    if req is None or not req.prompt:
+        return jsonify({"status": "error", "message": "No prompt provided"}), 400
+    # Plain text chunks as the model produces them, so the editor can render
+    # the code progressively; proxies must not buffer the response
+    return Response(utils.ai_features.generate_code_stream(req.prompt), mimetype='text/plain',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
 @app.route('/api-utils')
 def api_page():
-    return render_template('api_utils.html')
+    return _render_page('api_utils.html')
 
-@app.route('/api/external/fetch', methods=['POST'])
+@external_bp.route('/fetch', methods=['POST'])
 def fetch_external():
-    data = request.json
-    url = data.get('url')
-    if not url:
+    req = parse_request(FetchExternalRequest)
+    if req is None or not req.url:
         return jsonify({"status": "error", "message": "No URL provided"}), 400
     try:
-        response = api_utils.fetch_data(url)
+        response = utils.api_utils.fetch_data(req.url)
         return jsonify({"status": "success", "data": response})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
 @app.route('/database')
 def database_page():
-    return render_template('database.html')
+    return _render_page('database.html')
 
-@app.route('/api/db/collections', methods=['GET'])
+@db_bp.route('/collections', methods=['GET'])
 def get_collections():
     try:
-        collections = db_helper.get_collections()
-        return jsonify({"status": "success", "collections": collections})
+        collections = _collections_cache.get('collections', utils.db_helper.get_collections)
+        return _json({"status": "success", "collections": collections})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
-@app.route('/api/db/documents', methods=['GET'])
+@db_bp.route('/documents', methods=['GET'])
 def get_documents():
     collection_name = request.args.get('collection')
     if not collection_name:
         return jsonify({"status": "error", "message": "No collection name provided"}), 400
     try:
-        documents = db_helper.list_documents(collection_name)
-        return jsonify({"status": "success", "documents": documents})
+        documents = utils.db_helper.list_documents(collection_name)
+        return _json({"status": "success", "documents": documents})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
 
-@app.route('/api/db/document', methods=['POST'])
+@db_bp.route('/document', methods=['POST'])
 def create_document():
-    data = request.json
-    collection_name = data.get('collection')
-    document_data = data.get('data')
-    if not collection_name or not document_data:
+    req = parse_request(CreateDocumentRequest)
+    if req is None or not req.collection or not req.data:
         return jsonify({"status": "error", "message": "Missing collection name or document data"}), 400
     try:
-        document_id = db_helper.create_document(collection_name, document_data)
+        document_id = utils.db_helper.create_document(req.collection, req.data)
+        _collections_cache.clear()
         return jsonify({"status": "success", "document_id": document_id})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 400
+
+for blueprint in (file_bp, code_bp, project_bp, git_bp, package_bp, ai_bp, external_bp, db_bp):
+    app.register_blueprint(blueprint)
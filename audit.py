@@ -0,0 +1,116 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import insert
+
+# Audit events are queued by request handlers and written in batches by a
+# single background thread, so requests never wait on an INSERT + COMMIT
+audit_queue = queue.SimpleQueue()
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.2  # seconds to wait for more events before writing a batch
+
+# The writer also keeps the monthly partitions of the audit tables created
+# ahead of time, checking when it starts and then at most this often
+PARTITION_CHECK_INTERVAL = 24 * 60 * 60  # seconds
+
+_worker = None
+
+def record(model_name, **values):
+    """
+    Queue an audit row for insertion.
+
+    Args:
+        model_name (str): Name of the model class in models.py (e.g. 'FileOperation')
+        **values: Column values for the row
+    """
+    # Nothing drains the queue when the database is disabled
+    if _worker is None:
+        return
+    audit_queue.put((model_name, values))
+
+def start_worker(app, db):
+    """
+    Start the background thread that writes queued audit rows.
+
+    Args:
+        app (Flask): Application used to push an app context for the session
+        db (SQLAlchemy): Database extension instance
+    """
+    global _worker
+    if _worker is not None:
+        return _worker
+    _worker = threading.Thread(target=_drain, args=(app, db), name="audit-writer", daemon=True)
+    _worker.start()
+    return _worker
+
+def _next_batch():
+    """
+    Block for the first event, then collect whatever arrives within FLUSH_INTERVAL.
+    """
+    batch = [audit_queue.get()]
+    while len(batch) < BATCH_SIZE:
+        try:
+            batch.append(audit_queue.get(timeout=FLUSH_INTERVAL))
+        except queue.Empty:
+            break
+    return batch
+
+def _ensure_partitions(models, db):
+    try:
+        models.create_monthly_partitions()
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error creating audit table partitions: {str(e)}")
+
+def _fit(model, values):
+    """
+    Truncate string values to their column's length, so an over-long path or
+    package name doesn't make PostgreSQL reject the whole batch.
+    """
+    columns = model.__table__.columns
+    for key, value in values.items():
+        length = getattr(columns[key].type, 'length', None) if key in columns else None
+        if length and isinstance(value, str) and len(value) > length:
+            values[key] = value[:length]
+    return values
+
+def _insert(db, models, rows_by_model):
+    # One explicit transaction per call; begin() commits on success and
+    # rolls back on error
+    with db.session.begin():
+        for model_name, rows in rows_by_model.items():
+            db.session.execute(insert(getattr(models, model_name)), rows)
+
+def _drain(app, db):
+    import models
+
+    next_partition_check = 0.0
+    while True:
+        batch = _next_batch()
+        rows_by_model = defaultdict(list)
+        for model_name, values in batch:
+            try:
+                row = _fit(getattr(models, model_name), values)
+            except Exception as e:
+                logging.error(f"Dropping invalid {model_name} audit row: {str(e)}")
+                continue
+            rows_by_model[model_name].append(row)
+
+        with app.app_context():
+            if time.monotonic() >= next_partition_check:
+                _ensure_partitions(models, db)
+                next_partition_check = time.monotonic() + PARTITION_CHECK_INTERVAL
+            try:
+                _insert(db, models, rows_by_model)
+            except Exception as e:
+                logging.warning(f"Error writing {len(batch)} audit rows, retrying one at a time: {str(e)}")
+                # Retry row by row so one bad row only loses itself
+                for model_name, rows in rows_by_model.items():
+                    for row in rows:
+                        try:
+                            _insert(db, models, {model_name: [row]})
+                        except Exception as e:
+                            logging.error(f"Error writing {model_name} audit row: {str(e)}")
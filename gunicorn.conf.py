@@ -0,0 +1,26 @@
+import os
+import multiprocessing
+
+# Gunicorn picks this file up automatically from the working directory.
+# Route handlers mostly wait on subprocesses, the filesystem and outbound
+# HTTP, so threaded workers let one process serve many requests at once.
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Without PostgreSQL or MongoDB, /api/db is served from a process-local
+# in-memory database, and every worker process would hold a separate copy of
+# it. Scale with threads in a single worker then, and only add processes
+# when the data lives in a shared backend.
+_shared_backend = bool(os.environ.get("DATABASE_URL") or os.environ.get("MONGO_URI"))
+workers = int(os.environ.get(
+    "GUNICORN_WORKERS",
+    min(multiprocessing.cpu_count() * 2 + 1, 8) if _shared_backend else 1
+))
+if workers > 1 and not _shared_backend:
+    raise RuntimeError(
+        "GUNICORN_WORKERS > 1 needs DATABASE_URL or MONGO_URI: the in-memory "
+        "database can't be shared between worker processes"
+    )
@@ -0,0 +1,13 @@
+-- Backfill the timestamp indexes declared in models.py on existing tables.
+-- db.create_all() only creates indexes for new tables. CONCURRENTLY cannot
+-- run inside a transaction, so apply with: psql "$DATABASE_URL" -f <this file>
+--
+-- PostgreSQL rejects CREATE INDEX CONCURRENTLY on partitioned tables, so the
+-- partitioned audit tables (file_operation, code_execution, ai_interaction)
+-- are not listed here: 0003 creates their indexes when it converts them,
+-- and db-init creates them along with the tables on a fresh database.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_git_operation_timestamp ON git_operation (timestamp);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_package_operation_timestamp ON package_operation (timestamp);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_git_operation_type_ts ON git_operation (operation_type, timestamp DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_package_operation_type_ts ON package_operation (operation_type, timestamp DESC);
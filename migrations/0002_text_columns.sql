@@ -0,0 +1,11 @@
+-- Widen project.description from varchar(500) to text to match models.py,
+-- and compress the large free-text columns with lz4 (PostgreSQL 14+).
+-- SET COMPRESSION only affects newly written values.
+ALTER TABLE project ALTER COLUMN description TYPE TEXT;
+
+ALTER TABLE project ALTER COLUMN description SET COMPRESSION lz4;
+ALTER TABLE code_execution ALTER COLUMN code_snippet SET COMPRESSION lz4;
+ALTER TABLE code_execution ALTER COLUMN result SET COMPRESSION lz4;
+ALTER TABLE git_operation ALTER COLUMN details SET COMPRESSION lz4;
+ALTER TABLE ai_interaction ALTER COLUMN prompt SET COMPRESSION lz4;
+ALTER TABLE ai_interaction ALTER COLUMN response SET COMPRESSION lz4;
@@ -0,0 +1,106 @@
+-- Convert the audit tables created before partitioning (plain tables with a
+-- serial id) into the monthly range-partitioned tables declared in
+-- models.py. db.create_all() never alters existing tables, and
+-- create_monthly_partitions() skips tables that aren't partitioned yet.
+--
+-- Each table is renamed aside, recreated as a partitioned table with a
+-- DEFAULT partition, refilled with its rows (ids kept, missing timestamps
+-- set to now()), re-indexed, and the old table dropped. Tables that are
+-- already partitioned are left alone, so the file is safe to re-run.
+-- Everything runs in one transaction and locks the tables while it copies.
+--
+-- Apply with: psql "$DATABASE_URL" -f <this file>
+-- then run `flask --app main db-partitions`, which moves this and next
+-- month's rows out of the DEFAULT partition into their own partitions.
+-- Column compression set by 0002 is not carried over to the new tables.
+BEGIN;
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('file_operation')) IS DISTINCT FROM 'r' THEN
+        RETURN;
+    END IF;
+    ALTER TABLE file_operation RENAME TO file_operation_unpartitioned;
+    ALTER INDEX file_operation_pkey RENAME TO file_operation_unpartitioned_pkey;
+    ALTER SEQUENCE IF EXISTS file_operation_id_seq RENAME TO file_operation_unpartitioned_id_seq;
+    DROP INDEX IF EXISTS ix_file_operation_timestamp;
+    DROP INDEX IF EXISTS ix_file_operation_type_ts;
+
+    CREATE TABLE file_operation (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+        operation_type VARCHAR(20) NOT NULL,
+        file_path VARCHAR(255) NOT NULL,
+        timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+    CREATE TABLE file_operation_default PARTITION OF file_operation DEFAULT;
+
+    INSERT INTO file_operation (id, operation_type, file_path, timestamp)
+    SELECT id, operation_type, file_path, COALESCE(timestamp, now()) FROM file_operation_unpartitioned;
+    PERFORM setval(pg_get_serial_sequence('file_operation', 'id'),
+                   (SELECT COALESCE(max(id), 0) + 1 FROM file_operation), false);
+
+    CREATE INDEX ix_file_operation_timestamp ON file_operation (timestamp);
+    CREATE INDEX ix_file_operation_type_ts ON file_operation (operation_type, timestamp DESC);
+    DROP TABLE file_operation_unpartitioned;
+END $$;
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('code_execution')) IS DISTINCT FROM 'r' THEN
+        RETURN;
+    END IF;
+    ALTER TABLE code_execution RENAME TO code_execution_unpartitioned;
+    ALTER INDEX code_execution_pkey RENAME TO code_execution_unpartitioned_pkey;
+    ALTER SEQUENCE IF EXISTS code_execution_id_seq RENAME TO code_execution_unpartitioned_id_seq;
+    DROP INDEX IF EXISTS ix_code_execution_timestamp;
+
+    CREATE TABLE code_execution (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+        language VARCHAR(50) NOT NULL,
+        code_snippet TEXT NOT NULL,
+        result TEXT,
+        execution_time DOUBLE PRECISION,
+        timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+    CREATE TABLE code_execution_default PARTITION OF code_execution DEFAULT;
+
+    INSERT INTO code_execution (id, language, code_snippet, result, execution_time, timestamp)
+    SELECT id, language, code_snippet, result, execution_time, COALESCE(timestamp, now()) FROM code_execution_unpartitioned;
+    PERFORM setval(pg_get_serial_sequence('code_execution', 'id'),
+                   (SELECT COALESCE(max(id), 0) + 1 FROM code_execution), false);
+
+    CREATE INDEX ix_code_execution_timestamp ON code_execution (timestamp);
+    DROP TABLE code_execution_unpartitioned;
+END $$;
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('ai_interaction')) IS DISTINCT FROM 'r' THEN
+        RETURN;
+    END IF;
+    ALTER TABLE ai_interaction RENAME TO ai_interaction_unpartitioned;
+    ALTER INDEX ai_interaction_pkey RENAME TO ai_interaction_unpartitioned_pkey;
+    ALTER SEQUENCE IF EXISTS ai_interaction_id_seq RENAME TO ai_interaction_unpartitioned_id_seq;
+    DROP INDEX IF EXISTS ix_ai_interaction_timestamp;
+
+    CREATE TABLE ai_interaction (
+        id INTEGER GENERATED BY DEFAULT AS IDENTITY,
+        prompt TEXT NOT NULL,
+        response TEXT,
+        timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+        PRIMARY KEY (id, timestamp)
+    ) PARTITION BY RANGE (timestamp);
+    CREATE TABLE ai_interaction_default PARTITION OF ai_interaction DEFAULT;
+
+    INSERT INTO ai_interaction (id, prompt, response, timestamp)
+    SELECT id, prompt, response, COALESCE(timestamp, now()) FROM ai_interaction_unpartitioned;
+    PERFORM setval(pg_get_serial_sequence('ai_interaction', 'id'),
+                   (SELECT COALESCE(max(id), 0) + 1 FROM ai_interaction), false);
+
+    CREATE INDEX ix_ai_interaction_timestamp ON ai_interaction (timestamp);
+    DROP TABLE ai_interaction_unpartitioned;
+END $$;
+
+COMMIT;
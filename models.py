@@ -1,42 +1,144 @@
-from app import db
-from datetime import datetime
+import datetime
+import logging
+from app import app, db
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import func
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), unique=True, nullable=False)
-    description = db.Column(db.String(500))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    description = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, server_default=func.now())
+    updated_at = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now())
+
+# High-write audit tables are range-partitioned by month on PostgreSQL; the
+# partition key has to be part of the primary key there. Other databases
+# keep a plain autoincrement id, which a composite key would break (SQLite
+# only fills in an INTEGER PRIMARY KEY on its own)
+PARTITIONED = make_url(app.config["SQLALCHEMY_DATABASE_URI"]).get_backend_name() == 'postgresql'
+_PARTITION_ARGS = {'postgresql_partition_by': 'RANGE (timestamp)'} if PARTITIONED else {}
+
+def _audit_id():
+    if PARTITIONED:
+        return db.Column(db.Integer, db.Identity(), primary_key=True)
+    return db.Column(db.Integer, primary_key=True)
+
+def _audit_timestamp():
+    return db.Column(db.DateTime, primary_key=PARTITIONED, server_default=func.now(), index=True)
 
 class FileOperation(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
+    id = _audit_id()
     operation_type = db.Column(db.String(20), nullable=False)  # create, read, update, delete
     file_path = db.Column(db.String(255), nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = _audit_timestamp()
+
+    __table_args__ = (
+        db.Index('ix_file_operation_type_ts', operation_type, timestamp.desc()),
+        _PARTITION_ARGS,
+    )
     
 class CodeExecution(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
+    id = _audit_id()
     language = db.Column(db.String(50), nullable=False)
     code_snippet = db.Column(db.Text, nullable=False)
     result = db.Column(db.Text)
     execution_time = db.Column(db.Float)  # in seconds
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = _audit_timestamp()
+
+    __table_args__ = _PARTITION_ARGS
 
 class GitOperation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     operation_type = db.Column(db.String(50), nullable=False)  # commit, push, pull, etc.
     details = db.Column(db.Text)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, server_default=func.now(), index=True)
+
+    __table_args__ = (
+        db.Index('ix_git_operation_type_ts', operation_type, timestamp.desc()),
+    )
 
 class PackageOperation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     operation_type = db.Column(db.String(20), nullable=False)  # install, uninstall, update
     package_name = db.Column(db.String(255), nullable=False)
     version = db.Column(db.String(50))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, server_default=func.now(), index=True)
+
+    __table_args__ = (
+        db.Index('ix_package_operation_type_ts', operation_type, timestamp.desc()),
+    )
 
 class AIInteraction(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
+    id = _audit_id()
     prompt = db.Column(db.Text, nullable=False)
     response = db.Column(db.Text)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = _audit_timestamp()
+
+    __table_args__ = _PARTITION_ARGS
+
+PARTITIONED_MODELS = (FileOperation, CodeExecution, AIInteraction)
+
+def create_monthly_partitions(months_ahead=1):
+    """
+    Create the DEFAULT partition of each audit table and monthly partitions
+    for the current month and the following months. Safe to run repeatedly:
+    db-init runs it, and the audit writer re-runs it daily.
+
+    Rows written before their month's partition existed sit in the DEFAULT
+    partition, so inserts never fail for lack of a partition; they are moved
+    into the month's partition when it is created. Tables still unpartitioned
+    (created before partitioning) are skipped until
+    migrations/0003_partition_audit_tables.sql converts them.
+
+    Args:
+        months_ahead (int): Number of future months to create partitions for
+    """
+    if not PARTITIONED:
+        return
+
+    # Concurrent runs (several workers, a deploy's db-init) take turns
+    db.session.execute(text("SELECT pg_advisory_xact_lock(hashtext('create_monthly_partitions'))"))
+    for model in PARTITIONED_MODELS:
+        table = model.__tablename__
+        kind = db.session.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {'table': table}
+        ).scalar()
+        if kind != 'p':
+            logging.warning(f"Table {table} is not partitioned yet; apply migrations/0003_partition_audit_tables.sql")
+            continue
+
+        db.session.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+        start = datetime.date.today().replace(day=1)
+        for _ in range(months_ahead + 1):
+            end = (start + datetime.timedelta(days=32)).replace(day=1)
+            _create_partition(table, start, end)
+            start = end
+    db.session.commit()
+
+def _create_partition(table, start, end):
+    """
+    Create one month's partition, moving that month's rows out of the
+    DEFAULT partition first (PostgreSQL refuses the partition otherwise).
+    """
+    partition = f"{table}_{start:%Y_%m}"
+    exists = db.session.execute(text("SELECT to_regclass(:name)"), {'name': partition}).scalar()
+    if exists is not None:
+        return
+
+    in_range = f"timestamp >= '{start.isoformat()}' AND timestamp < '{end.isoformat()}'"
+    # Keep new rows for this month out of the DEFAULT partition meanwhile
+    db.session.execute(text(f"LOCK TABLE {table}_default IN SHARE ROW EXCLUSIVE MODE"))
+    stray = db.session.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_range})")).scalar()
+    if stray:
+        db.session.execute(text(
+            f"CREATE TEMPORARY TABLE {partition}_moved ON COMMIT DROP AS "
+            f"SELECT * FROM {table}_default WHERE {in_range}"
+        ))
+        db.session.execute(text(f"DELETE FROM {table}_default WHERE {in_range}"))
+    db.session.execute(text(
+        f"CREATE TABLE {partition} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    if stray:
+        db.session.execute(text(f"INSERT INTO {table} SELECT * FROM {partition}_moved"))
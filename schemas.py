@@ -0,0 +1,79 @@
+import dataclasses
+from dataclasses import dataclass
+import orjson
+from flask import request
+
+# Request bodies for the JSON API. Fields without a default are required;
+# parse_request() checks presence and type in one pass over the body.
+
+@dataclass(slots=True)
+class WriteFileRequest:
+    path: str
+    content: str
+
+@dataclass(slots=True)
+class DeleteFileRequest:
+    path: str
+
+@dataclass(slots=True)
+class ExecuteCodeRequest:
+    code: str
+    language: str = 'python'
+
+@dataclass(slots=True)
+class CreateProjectRequest:
+    name: str
+    template: str = None
+
+@dataclass(slots=True)
+class GitCommitRequest:
+    message: str
+
+@dataclass(slots=True)
+class InstallPackageRequest:
+    package: str
+
+@dataclass(slots=True)
+class GenerateCodeRequest:
+    prompt: str
+
+@dataclass(slots=True)
+class FetchExternalRequest:
+    url: str
+
+@dataclass(slots=True)
+class CreateDocumentRequest:
+    collection: str
+    data: dict
+
+def parse_request(cls):
+    """
+    Build a request dataclass from the JSON body of the current request.
+
+    Args:
+        cls (type): Dataclass describing the expected body
+
+    Returns:
+        object: Instance of cls, or None if the body is not a JSON object,
+            a required field is missing, or a field has the wrong type
+    """
+    # Parse the raw body bytes directly; orjson takes bytes, so this skips
+    # Werkzeug's charset decode and the JSON provider indirection
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    values = {}
+    for field in dataclasses.fields(cls):
+        value = data.get(field.name)
+        if value is None:
+            if field.default is dataclasses.MISSING:
+                return None
+            continue
+        if not isinstance(value, field.type):
+            return None
+        values[field.name] = value
+    return cls(**values)
@@ -0,0 +1,69 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from utils import ai_features
+
+def _completion(content):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+class CompletionCacheTest(unittest.TestCase):
+    def setUp(self):
+        ai_features._llm_cache.backend.clear()
+        self.addCleanup(ai_features._llm_cache.backend.clear)
+        self.create = mock.Mock(side_effect=lambda **kwargs: _completion('{"n": 1}'))
+        patcher = mock.patch.object(ai_features, '_create', self.create)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_default_temperature_is_not_cached(self):
+        messages = [{"role": "user", "content": "hi"}]
+        ai_features._complete("m", messages)
+        ai_features._complete("m", messages)
+        self.assertEqual(self.create.call_count, 2)
+
+    def test_temperature_zero_is_cached_and_copied(self):
+        messages = [{"role": "user", "content": "hi"}]
+        first = ai_features._complete("m", messages, parse=json.loads, temperature=0)
+        first["n"] = 2
+        second = ai_features._complete("m", messages, parse=json.loads, temperature=0)
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual(second, {"n": 1})
+
+    def test_explain_code_is_cached(self):
+        with mock.patch.object(ai_features, '_ai_mode', return_value=ai_features._MODE_OPENAI):
+            ai_features.explain_code("print(1)")
+            ai_features.explain_code("print(1)")
+        self.assertEqual(self.create.call_count, 1)
+        self.assertEqual(self.create.call_args.kwargs["temperature"], 0)
+
+class ReviewBatchTest(unittest.TestCase):
+    def setUp(self):
+        review = {"suggestions": [{"issue": "x"}], "summary": "s", "identified_issues": [],
+                  "fixes": [], "explanation": "", "fixed_code": "", "unit_tests": "tests"}
+        self.create = mock.Mock(side_effect=lambda **kwargs: _completion(json.dumps(review)))
+        for name, value in (('_create', self.create), ('_cache_key', lambda *args: None),
+                            ('_ai_mode', lambda: ai_features._MODE_OPENAI)):
+            patcher = mock.patch.object(ai_features, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_one_request_per_snippet(self):
+        with ai_features.review_batch(error_message="boom"):
+            suggestions = ai_features.suggest_improvements("x = 1")
+            suggestions["suggestions"].clear()
+            ai_features.debug_code("x = 1", "boom")
+            self.assertEqual(ai_features.generate_unit_tests("x = 1"), "tests")
+            self.assertEqual(len(ai_features.suggest_improvements("x = 1")["suggestions"]), 1)
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_debug_without_batch_error_message_asks_separately(self):
+        with ai_features.review_batch():
+            ai_features.suggest_improvements("x = 1")
+            ai_features.debug_code("x = 1", "boom")
+            ai_features.generate_unit_tests("x = 1")
+        self.assertEqual(self.create.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
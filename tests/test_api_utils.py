@@ -0,0 +1,127 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from utils import api_utils
+
+def _serve_once(body, advertised_length, extra_headers=b''):
+    """
+    Answer one request with body, advertising advertised_length bytes, then
+    close the connection. Returns the URL to fetch.
+    """
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            data = b''
+            while b'\r\n\r\n' not in data:
+                data += conn.recv(4096)
+            conn.sendall(
+                b'HTTP/1.1 200 OK\r\nContent-Length: ' + str(advertised_length).encode()
+                + b'\r\nConnection: close\r\n' + extra_headers + b'\r\n' + body
+            )
+        server.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return f"http://127.0.0.1:{server.getsockname()[1]}/file"
+
+class DownloadFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.destination = os.path.join(self.directory, 'out.bin')
+
+    def test_complete_body_is_saved(self):
+        body = os.urandom(100000)
+        api_utils.download_file(_serve_once(body, len(body)), self.destination)
+        with open(self.destination, 'rb') as f:
+            self.assertEqual(f.read(), body)
+
+    def test_truncated_body_raises(self):
+        url = _serve_once(b'x' * 5000, 100000)
+        requests = api_utils._get_requests()
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            api_utils.download_file(url, self.destination)
+        # No preallocated zeros are left standing in for the missing bytes
+        self.assertEqual(os.path.getsize(self.destination), 5000)
+
+class RateLimiterTest(unittest.TestCase):
+    def _response(self, status, **headers):
+        return mock.Mock(status_code=status, headers=headers)
+
+    def test_header_backoff_is_capped(self):
+        limiter = api_utils.RateLimiter(max_backoff=0.2)
+        limiter.acquire('example.com')
+        limiter.release('example.com', self._response(429, **{'Retry-After': '86400'}))
+        start = time.monotonic()
+        limiter.acquire('example.com', timeout=5)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_acquire_times_out(self):
+        limiter = api_utils.RateLimiter(max_concurrency=1)
+        limiter.acquire('example.com')
+        with self.assertRaises(TimeoutError):
+            limiter.acquire('example.com', timeout=0.1)
+
+class BuildUrlTest(unittest.TestCase):
+    def test_unhashable_static_params(self):
+        url = api_utils.build_url('https://example.com/', 'items', {'page': 2}, static_params={'ids': [1, 2]})
+        self.assertEqual(url, 'https://example.com/items?ids=%5B1%2C+2%5D&page=2')
+
+class IdempotentWriteTest(unittest.TestCase):
+    def setUp(self):
+        api_utils._recent_writes.clear()
+        self.addCleanup(api_utils._recent_writes.clear)
+        patcher = mock.patch.object(api_utils, 'fetch_data', side_effect=lambda url, **kwargs: {"items": [1]})
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_replay_is_per_credentials(self):
+        api_utils.post_data('https://api.test/x', {'a': 1}, headers={'Authorization': 'one'})
+        api_utils.post_data('https://api.test/x', {'a': 1}, headers={'Authorization': 'two'})
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_replayed_result_is_a_copy(self):
+        first = api_utils.post_data('https://api.test/x', {'a': 1})
+        first["items"].append(2)
+        second = api_utils.post_data('https://api.test/x', {'a': 1})
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(second, {"items": [1]})
+
+class ConcurrentPagesTest(unittest.TestCase):
+    def test_fetches_stay_bounded(self):
+        fetched = []
+
+        def send(method, url, headers=None, params=None):
+            fetched.append(params['page'])
+            return {'results': [params['page']]}
+
+        with mock.patch.object(api_utils, '_send', side_effect=send), \
+                mock.patch.object(api_utils, '_parse_body', side_effect=lambda body: body), \
+                mock.patch.object(api_utils, 'PAGINATE_MAX_WORKERS', 3):
+            results = api_utils._fetch_pages_concurrently('https://api.test/x', {}, {}, range(1, 1001))
+            self.assertEqual([next(results) for _ in range(5)], [1, 2, 3, 4, 5])
+            time.sleep(0.1)
+            self.assertLessEqual(len(fetched), 8)
+            self.assertEqual(list(results), list(range(6, 1001)))
+
+class SendBodyTest(unittest.TestCase):
+    def test_empty_object_is_sent_as_json(self):
+        prepared = api_utils._prepare('POST', 'https://api.test/x', None, None, None)
+        with mock.patch.object(api_utils, '_prepare', return_value=prepared) as prepare, \
+                mock.patch.object(api_utils.get_session(), 'send', side_effect=RuntimeError('stop')):
+            with self.assertRaises(RuntimeError):
+                api_utils._send('POST', 'https://api.test/x', data={})
+        _, _, headers, _, body = prepare.call_args.args
+        self.assertEqual(body, b'{}')
+        self.assertEqual(headers['Content-Type'], 'application/json')
+
+if __name__ == '__main__':
+    unittest.main()
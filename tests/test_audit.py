@@ -0,0 +1,22 @@
+import unittest
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+import audit
+
+Base = declarative_base()
+
+class Row(Base):
+    __tablename__ = 'row'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(5))
+
+class FitTest(unittest.TestCase):
+    def test_truncates_to_column_length(self):
+        self.assertEqual(audit._fit(Row, {'name': 'abcdefgh'}), {'name': 'abcde'})
+
+    def test_leaves_other_values_alone(self):
+        values = {'id': 7, 'name': 'abc', 'extra': 'x' * 10}
+        self.assertEqual(audit._fit(Row, dict(values)), values)
+
+if __name__ == '__main__':
+    unittest.main()
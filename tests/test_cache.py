@@ -0,0 +1,24 @@
+import unittest
+from utils.cache import TTLCache
+
+class TTLCacheTest(unittest.TestCase):
+    def test_failed_computes_leave_no_key_locks(self):
+        cache = TTLCache(ttl=60)
+
+        def fail():
+            raise FileNotFoundError('missing')
+
+        for n in range(100):
+            with self.assertRaises(FileNotFoundError):
+                cache.get(f'/missing/{n}', fail)
+        self.assertEqual(cache._key_locks, {})
+
+    def test_values_are_cached(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+        for _ in range(3):
+            self.assertEqual(cache.get('k', lambda: calls.append(1) or 'v'), 'v')
+        self.assertEqual(len(calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
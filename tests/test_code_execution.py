@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from utils import code_execution
+
+@unittest.skipUnless(shutil.which('bash'), "bash is not installed")
+class BashStdinTest(unittest.TestCase):
+    def test_reading_stdin_does_not_consume_the_script(self):
+        result = code_execution.execute_code('cat\necho after', 'bash')
+        self.assertEqual(result['return_code'], 0)
+        self.assertEqual(result['stdout'], 'after\n')
+
+    def test_read_gets_eof_instead_of_the_next_line(self):
+        result = code_execution.execute_code('read x\necho "got [$x]"\necho after', 'bash')
+        self.assertEqual(result['stdout'], 'got []\nafter\n')
+
+    def test_code_too_big_for_an_argument_runs_from_a_file(self):
+        code = 'x=' + 'a' * (code_execution.INLINE_CODE_LIMIT + 1) + '\necho ${#x}'
+        result = code_execution.execute_code(code, 'bash')
+        self.assertEqual(result['stdout'], f"{code_execution.INLINE_CODE_LIMIT + 1}\n")
+
+@unittest.skipUnless(code_execution.PRLIMIT_AVAILABLE, "prlimit is Linux-only")
+class LimitsTest(unittest.TestCase):
+    def test_limits_are_in_place_before_the_code_runs(self):
+        with mock.patch.object(code_execution, 'WARM_PYTHON_ENABLED', False):
+            result = code_execution.execute_code(
+                'import resource\nprint(resource.getrlimit(resource.RLIMIT_NOFILE))'
+            )
+        self.assertEqual(result['stdout'], '(256, 256)\n')
+
+class ColdPythonTest(unittest.TestCase):
+    def test_stdin_is_empty_and_exit_code_is_kept(self):
+        with mock.patch.object(code_execution, 'WARM_PYTHON_ENABLED', False):
+            result = code_execution.execute_code('import sys\nprint(repr(sys.stdin.read()))\nraise SystemExit(3)')
+        self.assertEqual(result['stdout'], "''\n")
+        self.assertEqual(result['return_code'], 3)
+
+def _fake_build(key, venv_dir, ready_marker, dependencies):
+    with code_execution._venv_lock(venv_dir, exclusive=True):
+        if not os.path.exists(ready_marker):
+            os.makedirs(venv_dir, exist_ok=True)
+            open(ready_marker, 'w').close()
+
+@unittest.skipUnless(code_execution.fcntl, "flock is POSIX-only")
+class VenvEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        for name, value in (('_VENV_ROOT', self.root), ('_MAX_VENVS', 1), ('_build_venv', _fake_build)):
+            patcher = mock.patch.object(code_execution, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_environment_in_use_is_not_evicted(self):
+        inside, release = threading.Event(), threading.Event()
+        def run():
+            with code_execution._use_venv(['a']) as python_path:
+                self.in_use = os.path.dirname(os.path.dirname(python_path))
+                inside.set()
+                release.wait()
+        thread = threading.Thread(target=run)
+        thread.start()
+        inside.wait()
+        try:
+            with code_execution._use_venv(['b']):
+                pass
+            self.assertTrue(os.path.isdir(self.in_use))
+        finally:
+            release.set()
+            thread.join()
+
+        with code_execution._use_venv(['c']):
+            pass
+        self.assertFalse(os.path.exists(self.in_use))
+        self.assertFalse(os.path.exists(f"{self.in_use}.lock"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from utils import db_helper
+from utils.db_helper import MemoryDBHelper
+
+class MemoryLogReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.path = os.path.join(self.directory, 'db.log')
+
+    def _open(self):
+        helper = MemoryDBHelper(self.path)
+        self.addCleanup(helper.close)
+        return helper
+
+    def test_writes_survive_a_reload(self):
+        helper = self._open()
+        first = helper.create_document('notes', {'text': 'one', 'tags': ['a']})
+        second = helper.create_document('notes', {'text': 'two'})
+        helper.update_document('notes', first, {'text': 'uno'})
+        helper.delete_document('notes', second)
+        helper.close()
+
+        reloaded = self._open()
+        self.assertEqual([(d['_id'], d['text'], d.get('tags')) for d in reloaded.list_documents('notes')],
+                         [(first, 'uno', ['a'])])
+        # Generated IDs continue after the highest one in use
+        self.assertNotEqual(reloaded.create_document('notes', {'text': 'three'}), first)
+
+    def test_replay_after_compaction(self):
+        helper = self._open()
+        original = db_helper.MEMORY_DB_COMPACT_SLACK
+        db_helper.MEMORY_DB_COMPACT_SLACK = 5
+        self.addCleanup(setattr, db_helper, 'MEMORY_DB_COMPACT_SLACK', original)
+        doc_id = helper.create_document('counters', {'n': 0})
+        for n in range(1, 21):
+            helper.update_document('counters', doc_id, {'n': n})
+        helper.close()
+
+        self.assertEqual(self._open().get_document_by_id('counters', doc_id)['n'], 20)
+
+    def test_torn_tail_is_discarded(self):
+        helper = self._open()
+        doc_id = helper.create_document('notes', {'text': 'kept'})
+        helper.close()
+        with open(self.path, 'ab') as log:
+            log.write(b'{"op": "put", "c": "notes", "d": {"_id": "9"')
+
+        reloaded = self._open()
+        self.assertEqual([d['_id'] for d in reloaded.list_documents('notes')], [doc_id])
+        reloaded.create_document('notes', {'text': 'after'})
+        reloaded.close()
+        self.assertEqual(len(self._open().list_documents('notes')), 2)
+
+    @unittest.skipUnless(db_helper.fcntl, "flock is POSIX-only")
+    def test_second_opener_is_refused(self):
+        self._open()
+        with self.assertRaises(RuntimeError):
+            MemoryDBHelper(self.path)
+
+class MemoryIterDocumentsTest(unittest.TestCase):
+    def test_deleting_while_iterating(self):
+        helper = MemoryDBHelper()
+        for n in range(5):
+            helper.create_document('items', {'n': n})
+        for document in helper.iter_documents('items'):
+            helper.delete_document('items', document['_id'])
+        self.assertEqual(helper.count_documents('items'), 0)
+
+    def test_creating_while_iterating(self):
+        helper = MemoryDBHelper()
+        helper.create_document('items', {'n': 0})
+        seen = [document['n'] for document in helper.iter_documents('items')
+                if helper.create_document('items', {'n': 1})]
+        self.assertEqual(seen, [0])
+
+class MemoryConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        original = db_helper.MEMORY_DB_COMPACT_SLACK
+        db_helper.MEMORY_DB_COMPACT_SLACK = 20
+        self.addCleanup(setattr, db_helper, 'MEMORY_DB_COMPACT_SLACK', original)
+
+    def test_readers_and_a_writer_share_an_instance(self):
+        helper = MemoryDBHelper(os.path.join(self.directory, 'db.log'))
+        self.addCleanup(helper.close)
+        errors = []
+        done = threading.Event()
+
+        def write():
+            try:
+                for i in range(2000):
+                    doc_id = helper.create_document('notes', {'n': i, 'kind': i % 3})
+                    if i % 2:
+                        helper.update_document('notes', doc_id, {'n': -i})
+                    if i % 5 == 0:
+                        helper.delete_document('notes', doc_id)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        def read():
+            try:
+                while not done.is_set():
+                    helper.list_documents('notes', limit=None)
+                    helper.list_documents('notes', query={'kind': 1}, sort=[('n', -1)], limit=5)
+                    helper.count_documents('notes', {'kind': 2})
+                    list(helper.iter_documents('notes'))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(helper.count_documents('notes'), 1600)
+        helper.close()
+        reloaded = MemoryDBHelper(helper.path)
+        self.addCleanup(reloaded.close)
+        self.assertEqual(reloaded.count_documents('notes'), 1600)
+
+if __name__ == '__main__':
+    unittest.main()
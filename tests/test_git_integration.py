@@ -0,0 +1,49 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+from utils import git_integration
+
+class StatusCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        subprocess.run(['git', 'init', '-q', self.directory], check=True)
+        git_integration.invalidate_status_cache()
+
+    def test_invalidate_shows_new_files(self):
+        self.assertNotIn('new.txt', git_integration.get_status(self.directory))
+        with open(os.path.join(self.directory, 'new.txt'), 'w') as f:
+            f.write('x')
+        git_integration.invalidate_status_cache()
+        self.assertIn('new.txt', git_integration.get_status(self.directory))
+
+class CommitTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        subprocess.run(['git', 'init', '-q', self.directory], check=True)
+        for key, value in (('user.name', 'Test'), ('user.email', 'test@example.com')):
+            subprocess.run(['git', 'config', key, value], cwd=self.directory, check=True)
+
+    def _check_both_paths(self, message):
+        paths = [False] + ([True] if git_integration.PYGIT2_AVAILABLE else [])
+        for use_pygit2 in paths:
+            with self.subTest(pygit2=use_pygit2), \
+                    mock.patch.object(git_integration, 'PYGIT2_AVAILABLE', use_pygit2):
+                with self.assertRaises(subprocess.CalledProcessError):
+                    git_integration.commit(message, self.directory)
+
+    def test_nothing_staged_raises_on_every_path(self):
+        self._check_both_paths('empty')
+
+    def test_empty_message_raises_on_every_path(self):
+        with open(os.path.join(self.directory, 'f.txt'), 'w') as f:
+            f.write('x')
+        git_integration.add_files(['f.txt'], self.directory)
+        self._check_both_paths('')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,15 @@
+import subprocess
+import sys
+import unittest
+from unittest import mock
+from utils import package_management
+
+class PipEnvironmentTest(unittest.TestCase):
+    def test_installs_with_the_running_interpreter(self):
+        done = subprocess.CompletedProcess([], 0, '', '')
+        with mock.patch.object(package_management.subprocess, 'run', return_value=done) as run:
+            package_management.install_packages(['six'])
+        self.assertEqual(run.call_args.args[0], [sys.executable, '-m', 'pip', 'install', 'six'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from utils import project_management
+
+class ListProjectsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        project_management._scan_projects.cache_clear()
+
+    def test_sees_metadata_written_by_another_process(self):
+        os.mkdir(os.path.join(self.directory, 'demo'))
+        with mock.patch.object(project_management.time, 'monotonic', return_value=100.0):
+            self.assertEqual(project_management.list_projects(self.directory), [])
+        # Written without clearing this process's cache, as another worker would
+        with open(os.path.join(self.directory, 'demo', '.project_metadata.json'), 'w') as f:
+            f.write('{}')
+        with mock.patch.object(project_management.time, 'monotonic',
+                               return_value=100.0 + project_management.PROJECT_LIST_TTL):
+            self.assertEqual(project_management.list_projects(self.directory), ['demo'])
+
+class WriteMetadataTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_concurrent_writers_dont_collide(self):
+        path = os.path.join(self.directory, '.project_metadata.json')
+        errors = []
+
+        def write(n):
+            try:
+                for i in range(50):
+                    project_management._write_metadata(path, {'writer': n, 'i': i, 'pad': 'x' * 4096})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        with open(path) as f:
+            self.assertEqual(json.load(f)['i'], 49)
+        self.assertEqual(os.listdir(self.directory), ['.project_metadata.json'])
+
+class DeleteProjectTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_removes_links_without_following_them(self):
+        outside = os.path.join(self.directory, 'outside')
+        os.makedirs(os.path.join(outside, 'keep'))
+        project = os.path.join(self.directory, 'demo')
+        os.makedirs(os.path.join(project, 'src'))
+        os.symlink(outside, os.path.join(project, 'src', 'link'))
+        self.assertTrue(project_management.delete_project(project))
+        self.assertFalse(os.path.exists(project))
+        self.assertTrue(os.path.isdir(os.path.join(outside, 'keep')))
+
+    def test_refuses_a_linked_project(self):
+        os.mkdir(os.path.join(self.directory, 'real'))
+        link = os.path.join(self.directory, 'demo')
+        os.symlink(os.path.join(self.directory, 'real'), link)
+        with self.assertRaises(OSError):
+            project_management.delete_project(link)
+        self.assertTrue(os.path.isdir(os.path.join(self.directory, 'real')))
+
+if __name__ == '__main__':
+    unittest.main()
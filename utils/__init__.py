@@ -1,10 +1,27 @@
-# Import all utility modules to make them available through the utils package
-from utils import file_operations
-from utils import code_execution
-from utils import project_management
-from utils import git_integration
-from utils import package_management
-from utils import user_interaction
-from utils import ai_features
-from utils import api_utils
-from utils import db_helper
+# Utility modules are imported lazily on first attribute access so that
+# importing the package (e.g. from app.py) doesn't pull in every backend
+import importlib
+
+__all__ = [
+    "file_operations",
+    "file_operations_async",
+    "code_execution",
+    "project_management",
+    "git_integration",
+    "package_management",
+    "user_interaction",
+    "ai_features",
+    "api_utils",
+    "api_utils_async",
+    "db_helper",
+]
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,9 +1,15 @@
 import os
+import re
+import copy
 import logging
-import json
-import base64
-import random
+import functools
 import time
+import asyncio
+import threading
+import contextlib
+import contextvars
+from string import Template
+from utils.llm_cache import LLMCache
 
 # Check if API keys are available - these will be None if not set
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
@@ -12,44 +18,252 @@ PERPLEXITY_API_KEY = os.environ.get("PERPLEXITY_API_KEY")
 # Flag to determine if we can use real AI services
 HAS_AI_SERVICES = bool(OPENAI_API_KEY or PERPLEXITY_API_KEY)
 
-# Conditionally import OpenAI client only if the API key is available
+# The OpenAI clients are imported and built on first use, so processes that
+# never call an AI function don't pay for the openai/httpx/ssl imports
 openai = None
-if OPENAI_API_KEY:
-    try:
-        from openai import OpenAI
-        openai = OpenAI(api_key=OPENAI_API_KEY)
-        logging.info("OpenAI client initialized successfully")
-    except ImportError:
-        logging.warning("OpenAI package not installed, but API key is present")
-    except Exception as e:
-        logging.error(f"Error initializing OpenAI client: {str(e)}")
+async_openai = None
+_create = None
+_acreate = None
+_clients_initialized = False
+_clients_lock = threading.Lock()
+
+def _init_openai_clients():
+    """
+    Import openai and build the sync and async clients, once.
+    """
+    global openai, async_openai, _create, _acreate, _clients_initialized
+    with _clients_lock:
+        if _clients_initialized:
+            return
+        _clients_initialized = True
+        if not OPENAI_API_KEY:
+            return
+        try:
+            import atexit
+            import httpx
+            from openai import OpenAI, AsyncOpenAI
+            # One pooled keep-alive transport shared by every call, so requests
+            # reuse connections instead of repeating the TCP/TLS handshake
+            http_limits = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+            http_client = httpx.Client(limits=http_limits, timeout=httpx.Timeout(60.0, connect=10.0), http2=True)
+            atexit.register(http_client.close)
+            openai = OpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+            # Async client for the a_* entry points, on its own pooled transport
+            async_openai = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                http_client=httpx.AsyncClient(limits=http_limits, timeout=httpx.Timeout(60.0, connect=10.0), http2=True)
+            )
+            # Bound once so each completion call skips the attribute chain
+            _create = openai.chat.completions.create
+            _acreate = async_openai.chat.completions.create
+            logging.info("OpenAI client initialized successfully")
+        except ImportError:
+            logging.warning("OpenAI package not installed, but API key is present")
+        except Exception as e:
+            logging.error(f"Error initializing OpenAI client: {str(e)}")
+
+def _get_openai_client():
+    """
+    Get the sync OpenAI client, or None if it is unavailable.
+    """
+    if not _clients_initialized:
+        _init_openai_clients()
+    return openai
+
+def _get_async_openai_client():
+    """
+    Get the async OpenAI client, or None if it is unavailable.
+    """
+    if not _clients_initialized:
+        _init_openai_clients()
+    return async_openai
 
 # Add a flag for simulated responses when no API keys are available
 SIMULATE_AI_RESPONSES = not HAS_AI_SERVICES
 
-def generate_code(prompt, language="python", model="gpt-4o"):
+# Which backend the AI functions use, resolved once on first call since the
+# OpenAI client itself is built lazily
+_MODE_SIMULATE, _MODE_OPENAI, _MODE_NONE = 0, 1, 2
+_MODE = None
+
+def _ai_mode():
     """
-    Generate code based on a prompt using AI services or simulated responses.
+    Get the AI backend mode: _MODE_SIMULATE, _MODE_OPENAI or _MODE_NONE.
+    """
+    global _MODE
+    if _MODE is None:
+        if SIMULATE_AI_RESPONSES:
+            _MODE = _MODE_SIMULATE
+        elif _get_openai_client():
+            _MODE = _MODE_OPENAI
+        else:
+            _MODE = _MODE_NONE
+    return _MODE
+
+# the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+# do not change this unless explicitly requested by the user
+_DEFAULT_MODEL = "gpt-4o"
+
+def set_default_model(name):
+    """
+    Set the OpenAI model used when a call doesn't pass one.
     
-    # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
-    # do not change this unless explicitly requested by the user
+    Args:
+        name (str): OpenAI model name
+    """
+    global _DEFAULT_MODEL
+    _DEFAULT_MODEL = name
+
+# Set inside review_batch(); while active, suggest_improvements, debug_code and
+# generate_unit_tests are answered from one combined review_code request per
+# snippet, kept in the batch's "reviews" dict for the batch's lifetime
+_review_batch = contextvars.ContextVar("review_batch", default=None)
+
+# Seconds simulated responses wait before returning, to mimic API latency (off by default)
+SIMULATE_DELAY = float(os.environ.get("SIMULATE_DELAY", 0))
+
+# Completions are cached by their full request so repeated prompts skip the API
+_llm_cache = LLMCache()
+
+# Only temperature 0 requests are cached by default: at any other temperature
+# a repeated prompt is expected to get a fresh sample. LLM_CACHE_ALL=1 caches
+# every request regardless.
+LLM_CACHE_ALL = os.environ.get("LLM_CACHE_ALL") == "1"
+
+# Sampling temperature for the analysis entry points (explain, document,
+# review), where the same code should get the same answer and so can be
+# served from the cache; generation keeps the API's default temperature
+ANALYSIS_TEMPERATURE = 0
+
+def _cache_key(model, messages, kwargs):
+    """
+    Build the response cache key for a request, or None if it shouldn't be cached.
+    """
+    temperature = kwargs.get("temperature")
+    if temperature != 0 and not LLM_CACHE_ALL:
+        return None
+    return LLMCache.cache_key(model, messages, temperature, kwargs.get("response_format"))
+
+def _cache_get(key):
+    # Parsed responses can be mutable; hand each caller its own copy
+    if key is None:
+        return None
+    return copy.deepcopy(_llm_cache.get(key))
+
+def _cache_set(key, value):
+    if key is not None:
+        _llm_cache.set(key, copy.deepcopy(value))
+
+# Running totals of prompt tokens and those served from OpenAI's prompt cache
+_prompt_tokens_total = 0
+_prompt_tokens_cached = 0
+_prompt_stats_lock = threading.Lock()
+
+def _record_prompt_cache_usage(completion):
+    """
+    Log how many prompt tokens of a completion were served from the prompt cache.
     
     Args:
-        prompt (str): Description of the code to generate
-        language (str): Target programming language
-        model (str): OpenAI model to use (when OpenAI is available)
+        completion: Chat completion returned by the OpenAI client
+    """
+    global _prompt_tokens_total, _prompt_tokens_cached
+    usage = getattr(completion, "usage", None)
+    if usage is None or not usage.prompt_tokens:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+    with _prompt_stats_lock:
+        _prompt_tokens_total += usage.prompt_tokens
+        _prompt_tokens_cached += cached
+        hit_rate = _prompt_tokens_cached / _prompt_tokens_total
+    logging.debug(f"Prompt cache: {cached}/{usage.prompt_tokens} tokens cached, {hit_rate:.1%} overall")
+
+def _complete(model, messages, parse=None, **kwargs):
+    """
+    Run a chat completion through the response cache.
+    
+    Only temperature 0 requests are cached unless LLM_CACHE_ALL is set.
+    
+    Args:
+        model (str, optional): OpenAI model to use; defaults to _DEFAULT_MODEL
+        messages (list): Chat messages
+        parse (callable, optional): Applied to the response text before caching
+        **kwargs: Extra arguments for chat.completions.create
     
     Returns:
-        str: Generated code
+        str or any: Response text, or the parsed response if parse is given
     """
-    # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
-        
-        # Generate a simulated response based on the language
-        if language.lower() == "python":
-            return f"""# Generated example based on: {prompt}
+    model = model or _DEFAULT_MODEL
+    key = _cache_key(model, messages, kwargs)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    
+    completion = _create(model=model, messages=messages, **kwargs)
+    _record_prompt_cache_usage(completion)
+    content = completion.choices[0].message.content
+    if parse is not None:
+        content = parse(content)
+    _cache_set(key, content)
+    return content
+
+async def _acomplete(model, messages, parse=None, **kwargs):
+    """
+    Async counterpart of _complete, sharing the same response cache.
+    """
+    model = model or _DEFAULT_MODEL
+    key = _cache_key(model, messages, kwargs)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+    
+    completion = await _acreate(model=model, messages=messages, **kwargs)
+    _record_prompt_cache_usage(completion)
+    content = completion.choices[0].message.content
+    if parse is not None:
+        content = parse(content)
+    _cache_set(key, content)
+    return content
+
+def _complete_stream(model, messages, **kwargs):
+    """
+    Run a streaming chat completion, yielding text as it arrives.
+    
+    The full text is stored in the same response cache as _complete, and a
+    cached response is yielded in one piece.
+    
+    Args:
+        model (str, optional): OpenAI model to use; defaults to _DEFAULT_MODEL
+        messages (list): Chat messages
+        **kwargs: Extra arguments for chat.completions.create
+    
+    Yields:
+        str: Response text deltas
+    """
+    model = model or _DEFAULT_MODEL
+    key = _cache_key(model, messages, kwargs)
+    cached = _cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+    
+    parts = []
+    stream = _create(model=model, messages=messages, stream=True,
+                     stream_options={"include_usage": True}, **kwargs)
+    for chunk in stream:
+        # The final chunk carries usage only, with no choices
+        if chunk.choices:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        elif getattr(chunk, "usage", None) is not None:
+            _record_prompt_cache_usage(chunk)
+    _cache_set(key, "".join(parts))
+
+# Simulated responses, parsed once at import and filled in with substitute()
+
+_PY_GENERATE_TMPL = Template("""# Generated example based on: $prompt
 # Note: This is a simulated response. For real AI code generation, please add an API key.
 
 def main():
@@ -57,7 +271,7 @@ def main():
     Main function to demonstrate functionality described in the prompt.
     This is placeholder code and may not fully implement the requested functionality.
     \"\"\"
-    print("Example implementation for: {prompt}")
+    print("Example implementation for: $prompt")
     
     # Example implementation
     result = process_data_example("example")
@@ -70,65 +284,389 @@ def process_data_example(value):
 
 if __name__ == "__main__":
     main()
-"""
-        elif language.lower() == "javascript":
-            return f"""// Generated example based on: {prompt}
+""")
+
+_JS_GENERATE_TMPL = Template("""// Generated example based on: $prompt
 // Note: This is a simulated response. For real AI code generation, please add an API key.
 
 /**
  * Main function to demonstrate functionality described in the prompt.
  * This is placeholder code and may not fully implement the requested functionality.
  */
-function main() {{
-  console.log("Example implementation for: {prompt}");
+function main() {
+  console.log("Example implementation for: $prompt");
   
   // Example implementation
   const result = processDataExample("example");
   return result;
-}}
+}
 
 /**
  * Process the input data and return a result.
- * @param {{string}} inputValue - The input to process
- * @return {{string}} The processed result
+ * @param {string} inputValue - The input to process
+ * @return {string} The processed result
  */
-function processDataExample(inputValue) {{
+function processDataExample(inputValue) {
   // Placeholder implementation
-  return `Processed: ${{inputValue}}`;
-}}
+  return `Processed: $${inputValue}`;
+}
 
 main();
-"""
-        else:
-            return f"""/* Generated example based on: {prompt}
+""")
+
+_GENERIC_GENERATE_TMPL = Template("""/* Generated example based on: $prompt
    Note: This is a simulated response. For real AI code generation, please add an API key.
-   This is a generic placeholder for the {language} programming language. */
+   This is a generic placeholder for the $language programming language. */
 
 // This is just placeholder code
 // To get actual AI-generated code, please add an API key to the application
 // You can set the OPENAI_API_KEY or PERPLEXITY_API_KEY environment variable
 
 // Example placeholder implementation
-function main() {{
-  // Example implementation that would address: {prompt}
+function main() {
+  // Example implementation that would address: $prompt
   console.log("Implementation would go here");
-}}
-"""
+}
+""")
+
+_PY_TEST_TMPL = Template("""# Generated Unit Tests (Simulated)
+# Note: This is a simulated response. For real AI-generated tests, please add an API key.
+
+import unittest
+
+class TestSimulatedFunctionality(unittest.TestCase):
+    \"\"\"
+    This is a placeholder test class. 
+    Real AI would generate tests specific to your code.
+    \"\"\"
+    
+    def test_example(self):
+        \"\"\"Test basic functionality\"\"\"
+        # Placeholder test that would be replaced with real tests
+        # specific to your actual code
+        self.assertEqual(1, 1)
+    
+    def test_edge_case(self):
+        \"\"\"Test edge cases\"\"\"
+        # Placeholder test for edge cases
+        self.assertTrue(True)
+
+if __name__ == '__main__':
+    unittest.main()
+""")
+
+_JS_TEST_TMPL = Template("""// Generated Unit Tests (Simulated)
+// Note: This is a simulated response. For real AI-generated tests, please add an API key.
+
+const assert = require('assert');
+// or using Jest: const { test, expect } = require('@jest/globals');
+
+describe('Simulated Tests', () => {
+  // These are placeholder tests.
+  // Real AI would generate tests specific to your code.
+  
+  test('basic functionality', () => {
+    // Placeholder test that would be replaced with real tests
+    // specific to your actual code
+    assert.strictEqual(1, 1);
+  });
+  
+  test('edge cases', () => {
+    // Placeholder test for edge cases
+    assert.strictEqual(true, true);
+  });
+});
+""")
+
+_GENERIC_TEST_TMPL = Template("""/* Generated Unit Tests (Simulated)
+   Note: This is a simulated response. For real AI-generated tests, please add an API key.
+   This is a generic placeholder for the $language programming language. */
+
+// This is just placeholder test code
+// To get actual AI-generated tests, please add an API key to the application
+// You can set the OPENAI_API_KEY or PERPLEXITY_API_KEY environment variable
+
+// Example placeholder test suite
+function runTests() {
+  // Test 1: Basic functionality
+  // Test 2: Edge cases
+  // Test 3: Error handling
+  console.log("Running simulated tests...");
+  console.log("All tests passed (simulated)");
+}
+
+runTests();
+""")
+
+_PY_TRANSLATE_TMPL = Template("""# Translated from $source_language to Python (Simulated)
+# Note: This is a simulated response. For real AI-powered translation, please add an API key.
+
+def main():
+    \"\"\"
+    Main function translated from $source_language.
+    This is placeholder code and may not correctly translate the original.
+    \"\"\"
+    print(f"This is a simulated translation from $source_language to Python")
+    
+    # Simulated translation of the original code
+    result = process_data_example("example")
+    return result
+
+def process_data_example(value):
+    \"\"\"Process the input data and return a result.\"\"\"
+    # Placeholder implementation
+    return f"Processed: {value}"
+
+if __name__ == "__main__":
+    main()
+""")
+
+_JS_TRANSLATE_TMPL = Template("""// Translated from $source_language to JavaScript (Simulated)
+// Note: This is a simulated response. For real AI-powered translation, please add an API key.
+
+/**
+ * Main function translated from $source_language.
+ * This is placeholder code and may not correctly translate the original.
+ */
+function main() {
+  console.log(`This is a simulated translation from $source_language to JavaScript`);
+  
+  // Simulated translation of the original code
+  const result = processDataExample("example");
+  return result;
+}
+
+/**
+ * Process the input data and return a result.
+ * @param {string} inputValue - The input to process
+ * @return {string} The processed result
+ */
+function processDataExample(inputValue) {
+  // Placeholder implementation
+  return `Processed: $${inputValue}`;
+}
+
+main();
+""")
+
+_GENERIC_TRANSLATE_TMPL = Template("""/* Translated from $source_language to $target_language (Simulated)
+   Note: This is a simulated response. For real AI-powered translation, please add an API key.
+   This is a generic placeholder for the $target_language programming language. */
+
+// This is just placeholder translated code
+// To get actual AI-powered code translation, please add an API key to the application
+// You can set the OPENAI_API_KEY or PERPLEXITY_API_KEY environment variable
+
+// Example placeholder implementation
+function main() {
+  // Simulated translation from $source_language to $target_language
+  console.log("This is a simulated translation");
+}
+
+main();
+""")
+
+# Chat messages for each entry point, shared by the sync and async variants
+
+# System prompts per AI feature. They contain no per-request text, so every
+# call starts with a byte-identical prefix that OpenAI's automatic prompt
+# caching can reuse; the language goes in a separate message after it.
+_SYSTEM_PROMPTS = {
+    "generate": "You are an expert programmer. Generate clean, efficient, and well-documented code in the target language based on the user's requirements. Include comments to explain any complex logic.",
+    "improve": "You are an expert programmer and code reviewer. Analyze the provided code and suggest improvements in terms of efficiency, readability, and best practices for its language. Format your response as a JSON object with the following structure: {\"suggestions\": [{\"issue\": \"description of the issue\", \"improvement\": \"suggested improvement\", \"code\": \"improved code snippet\"}], \"summary\": \"overall summary of suggestions\"}.",
+    "debug": "You are an expert programmer and debugger. Analyze the provided code and error message to identify and fix the issues. Format your response as a JSON object with the following structure: {\"identified_issues\": [\"issue 1\", \"issue 2\"], \"fixes\": [{\"original\": \"original problematic code\", \"fixed\": \"fixed code\"}], \"explanation\": \"explanation of the issues and fixes\", \"fixed_code\": \"complete fixed code\"}.",
+    "tests": "You are an expert programmer specializing in test-driven development. Generate comprehensive unit tests for the provided code using the idiomatic testing tools of its language, covering edge cases and ensuring good test coverage.",
+    "translate": "You are an expert programmer in many languages. Translate the provided code from the source language to equivalent code in the target language, maintaining the same functionality and logic. Include comments to explain any language-specific adaptations.",
+    "review": "You are an expert programmer, code reviewer and debugger specializing in test-driven development. Review the provided code in one pass: suggest improvements in terms of efficiency, readability, and best practices for its language; identify and fix any bugs, using the error message if one is given; and generate comprehensive unit tests using the idiomatic testing tools of its language, covering edge cases. Format your response as a JSON object with the following structure: {\"suggestions\": [{\"issue\": \"description of the issue\", \"improvement\": \"suggested improvement\", \"code\": \"improved code snippet\"}], \"summary\": \"overall summary of suggestions\", \"identified_issues\": [\"issue 1\", \"issue 2\"], \"fixes\": [{\"original\": \"original problematic code\", \"fixed\": \"fixed code\"}], \"explanation\": \"explanation of the issues and fixes\", \"fixed_code\": \"complete fixed code\", \"unit_tests\": \"complete unit test code\"}.",
+    "docs": "You are an expert programmer and technical writer. Generate clear, comprehensive documentation for the provided code, including function descriptions, parameter details, return values, and usage examples.",
+}
+
+@functools.lru_cache(maxsize=128)
+def _language_prompt(language, target_language=None):
+    if target_language is not None:
+        return f"Source language: {language}\nTarget language: {target_language}"
+    return f"Language: {language}"
+
+def _generate_code_messages(prompt, language):
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_PROMPTS["generate"]
+        },
+        {"role": "system", "content": _language_prompt(language)},
+        {"role": "user", "content": prompt}
+    ]
+
+def _explain_code_messages(code):
+    return [
+        {
+            "role": "system",
+            "content": "You are an expert programmer and educator. Explain the provided code in a clear, concise manner that would help someone understand what it does and how it works."
+        },
+        {"role": "user", "content": f"Please explain this code:\n\n```\n{code}\n```"}
+    ]
+
+def _suggest_improvements_messages(code, language):
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_PROMPTS["improve"]
+        },
+        {"role": "system", "content": _language_prompt(language)},
+        {"role": "user", "content": f"Please suggest improvements for this {language} code:\n\n```\n{code}\n```"}
+    ]
+
+def _debug_code_messages(code, error_message, language):
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_PROMPTS["debug"]
+        },
+        {"role": "system", "content": _language_prompt(language)},
+        {"role": "user", "content": f"Please debug this {language} code which produces the following error:\n\nError: {error_message}\n\nCode:\n```\n{code}\n```"}
+    ]
+
+_IMAGE_CHUNK_SIZE = 48 * 1024  # multiple of 3, so chunks encode without padding
+
+def _image_data_url(image_path):
+    """
+    Build a base64 data URL for an image file.
+
+    The file is read in fixed-size chunks and each chunk is base64-encoded
+    straight into a preallocated buffer, so the raw image and its full
+    base64 copy are never held in memory at the same time.
+
+    Args:
+        image_path (str): Path to the image file
+
+    Returns:
+        str: data: URL with the MIME type guessed from the file extension
+    """
+    import base64
+    import mimetypes
+
+    mime_type = mimetypes.guess_type(image_path)[0]
+    if not mime_type or not mime_type.startswith("image/"):
+        mime_type = "image/jpeg"
+    prefix = f"data:{mime_type};base64,".encode("ascii")
+
+    size = os.path.getsize(image_path)
+    buf = bytearray(len(prefix) + (size + 2) // 3 * 4)
+    buf[:len(prefix)] = prefix
+    pos = len(prefix)
+
+    chunk = bytearray(_IMAGE_CHUNK_SIZE)
+    with open(image_path, "rb") as image_file, memoryview(chunk) as view:
+        while True:
+            n = image_file.readinto(chunk)
+            if not n:
+                break
+            encoded = base64.b64encode(view[:n])
+            buf[pos:pos + len(encoded)] = encoded
+            pos += len(encoded)
+
+    # Trim in case the file shrank while it was being read
+    del buf[pos:]
+    return buf.decode("ascii")
+
+def _analyze_image_messages(image_path):
+    image_url = _image_data_url(image_path)
+
+    return [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": "Analyze this image in detail and describe its key elements, context, and any notable aspects."
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {"url": image_url}
+                }
+            ]
+        }
+    ]
+
+def _generate_unit_tests_messages(code, language):
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_PROMPTS["tests"]
+        },
+        {"role": "system", "content": _language_prompt(language)},
+        {"role": "user", "content": f"Please generate unit tests for this {language} code:\n\n```\n{code}\n```"}
+    ]
+
+def _translate_code_messages(code, source_language, target_language):
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_PROMPTS["translate"]
+        },
+        {"role": "system", "content": _language_prompt(source_language, target_language)},
+        {"role": "user", "content": f"Please translate this {source_language} code to {target_language}:\n\n```\n{code}\n```"}
+    ]
+
+def _generate_documentation_messages(code, language):
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_PROMPTS["docs"]
+        },
+        {"role": "system", "content": _language_prompt(language)},
+        {"role": "user", "content": f"Please generate documentation for this {language} code:\n\n```\n{code}\n```"}
+    ]
+
+def _review_code_messages(code, language, error_message=None):
+    if error_message:
+        content = f"Please review this {language} code which produces the following error:\n\nError: {error_message}\n\nCode:\n```\n{code}\n```"
+    else:
+        content = f"Please review this {language} code:\n\n```\n{code}\n```"
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_PROMPTS["review"]
+        },
+        {"role": "system", "content": _language_prompt(language)},
+        {"role": "user", "content": content}
+    ]
+
+def generate_code(prompt, language="python", model=None):
+    """
+    Generate code based on a prompt using AI services or simulated responses.
+    
+    # the newest OpenAI model is "gpt-4o" which was released May 13, 2024.
+    # do not change this unless explicitly requested by the user
+    
+    Args:
+        prompt (str): Description of the code to generate
+        language (str): Target programming language
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
+    
+    Returns:
+        str: Generated code
+    """
+    mode = _ai_mode()
+    
+    # Handle case with no API keys available
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
+        
+        # Generate a simulated response based on the language
+        if language.lower() == "python":
+            return _PY_GENERATE_TMPL.substitute(prompt=prompt)
+        elif language.lower() == "javascript":
+            return _JS_GENERATE_TMPL.substitute(prompt=prompt)
+        else:
+            return _GENERIC_GENERATE_TMPL.substitute(prompt=prompt, language=language)
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert {language} programmer. Generate clean, efficient, and well-documented {language} code based on the user's requirements. Include comments to explain any complex logic."
-                    },
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            return completion.choices[0].message.content
+            return _complete(model, _generate_code_messages(prompt, language))
         except Exception as e:
             logging.error(f"Error generating code with OpenAI: {str(e)}")
             raise
@@ -139,7 +677,36 @@ function main() {{
         logging.error(error_msg)
         return f"# Error: {error_msg}\n\n# Please add an API key to enable AI code generation."
 
-def explain_code(code, model="gpt-4o"):
+# Leading keyword of a snippet's first line -> language, for the simulated explain_code
+_LANG_PREFIX_RE = re.compile(r"(def |function |const |let |#include)")
+_LANG_PREFIX_MAP = {
+    "def ": "Python",
+    "function ": "JavaScript",
+    "const ": "JavaScript",
+    "let ": "JavaScript",
+    "#include": "C or C++",
+}
+
+def _detect_language(first_line):
+    """
+    Guess the language of a code snippet from its first line.
+
+    Args:
+        first_line (str): First line of the snippet
+
+    Returns:
+        str: Language name, or "unknown"
+    """
+    if "import " in first_line or "class " in first_line:
+        return "Python"
+    match = _LANG_PREFIX_RE.match(first_line)
+    if match:
+        return _LANG_PREFIX_MAP[match.group(1)]
+    if first_line.endswith(";"):
+        return "C or C++"
+    return "unknown"
+
+def explain_code(code, model=None):
     """
     Explain a piece of code using AI services or simulated responses.
     
@@ -148,29 +715,24 @@ def explain_code(code, model="gpt-4o"):
     
     Args:
         code (str): Code to explain
-        model (str): OpenAI model to use (when OpenAI is available)
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
     
     Returns:
         str: Explanation of the code
     """
+    mode = _ai_mode()
+    
     # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
         
-        # Analyze code basics
-        code_lines = code.strip().split("\n")
-        first_line = code_lines[0] if code_lines else ""
-        line_count = len(code_lines)
-        
-        # Try to detect language
-        language = "unknown"
-        if first_line.startswith("def ") or "import " in first_line or "class " in first_line:
-            language = "Python"
-        elif first_line.startswith("function ") or first_line.startswith("const ") or first_line.startswith("let "):
-            language = "JavaScript"
-        elif first_line.startswith("#include") or first_line.endswith(";"):
-            language = "C or C++"
+        # Analyze code basics without splitting the whole snippet into lines
+        code = code.strip()
+        first_line = code.partition("\n")[0]
+        line_count = code.count("\n") + 1
+        language = _detect_language(first_line)
         
         return f"""# Code Explanation (Simulated)
 
@@ -194,19 +756,9 @@ To get a real AI-powered explanation of this code, you can:
 """
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert programmer and educator. Explain the provided code in a clear, concise manner that would help someone understand what it does and how it works."
-                    },
-                    {"role": "user", "content": f"Please explain this code:\n\n```\n{code}\n```"}
-                ]
-            )
-            return completion.choices[0].message.content
+            return _complete(model, _explain_code_messages(code), temperature=ANALYSIS_TEMPERATURE)
         except Exception as e:
             logging.error(f"Error explaining code with OpenAI: {str(e)}")
             raise
@@ -217,7 +769,7 @@ To get a real AI-powered explanation of this code, you can:
         logging.error(error_msg)
         return f"# Error: {error_msg}\n\n# Please add an API key to enable AI code explanation."
 
-def suggest_improvements(code, language="python", model="gpt-4o"):
+def suggest_improvements(code, language="python", model=None):
     """
     Suggest improvements for a piece of code using AI services or simulated responses.
     
@@ -227,15 +779,18 @@ def suggest_improvements(code, language="python", model="gpt-4o"):
     Args:
         code (str): Code to improve
         language (str): Programming language of the code
-        model (str): OpenAI model to use (when OpenAI is available)
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
     
     Returns:
         dict: Suggestions for code improvements
     """
+    mode = _ai_mode()
+    
     # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
         
         # Return a simulated response
         return {
@@ -255,21 +810,15 @@ def suggest_improvements(code, language="python", model="gpt-4o"):
         }
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert {language} programmer and code reviewer. Analyze the provided code and suggest improvements in terms of efficiency, readability, and best practices. Format your response as a JSON object with the following structure: {{\"suggestions\": [{{\"issue\": \"description of the issue\", \"improvement\": \"suggested improvement\", \"code\": \"improved code snippet\"}}], \"summary\": \"overall summary of suggestions\"}}."
-                    },
-                    {"role": "user", "content": f"Please suggest improvements for this {language} code:\n\n```\n{code}\n```"}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            return json.loads(completion.choices[0].message.content)
+            batch = _review_batch.get()
+            if batch is not None:
+                review = _batch_review(batch, code, language, None, model)
+                return {"suggestions": review.get("suggestions", []), "summary": review.get("summary", "")}
+            import orjson
+            return _complete(model, _suggest_improvements_messages(code, language),
+                             response_format={"type": "json_object"}, parse=orjson.loads)
         except Exception as e:
             logging.error(f"Error suggesting code improvements with OpenAI: {str(e)}")
             error_msg = f"Error suggesting improvements: {str(e)}"
@@ -287,7 +836,7 @@ def suggest_improvements(code, language="python", model="gpt-4o"):
             "summary": error_msg
         }
 
-def debug_code(code, error_message, language="python", model="gpt-4o"):
+def debug_code(code, error_message, language="python", model=None):
     """
     Debug code using AI services or simulated responses.
     
@@ -298,15 +847,18 @@ def debug_code(code, error_message, language="python", model="gpt-4o"):
         code (str): Code to debug
         error_message (str): Error message from running the code
         language (str): Programming language of the code
-        model (str): OpenAI model to use (when OpenAI is available)
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
     
     Returns:
         dict: Debugging results with identified issues and fixes
     """
+    mode = _ai_mode()
+    
     # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
         
         # Return a simulated response
         return {
@@ -325,21 +877,20 @@ def debug_code(code, error_message, language="python", model="gpt-4o"):
         }
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert {language} programmer and debugger. Analyze the provided code and error message to identify and fix the issues. Format your response as a JSON object with the following structure: {{\"identified_issues\": [\"issue 1\", \"issue 2\"], \"fixes\": [{{\"original\": \"original problematic code\", \"fixed\": \"fixed code\"}}], \"explanation\": \"explanation of the issues and fixes\", \"fixed_code\": \"complete fixed code\"}}."
-                    },
-                    {"role": "user", "content": f"Please debug this {language} code which produces the following error:\n\nError: {error_message}\n\nCode:\n```\n{code}\n```"}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            return json.loads(completion.choices[0].message.content)
+            batch = _review_batch.get()
+            if batch is not None:
+                review = _batch_review(batch, code, language, error_message, model)
+                return {
+                    "identified_issues": review.get("identified_issues", []),
+                    "fixes": review.get("fixes", []),
+                    "explanation": review.get("explanation", ""),
+                    "fixed_code": review.get("fixed_code", code)
+                }
+            import orjson
+            return _complete(model, _debug_code_messages(code, error_message, language),
+                             response_format={"type": "json_object"}, parse=orjson.loads)
         except Exception as e:
             logging.error(f"Error debugging code with OpenAI: {str(e)}")
             error_msg = f"Error debugging code: {str(e)}"
@@ -361,7 +912,7 @@ def debug_code(code, error_message, language="python", model="gpt-4o"):
             "fixed_code": code
         }
 
-def analyze_image(image_path, model="gpt-4o"):
+def analyze_image(image_path, model=None):
     """
     Analyze an image using AI services or simulated responses.
     
@@ -370,7 +921,7 @@ def analyze_image(image_path, model="gpt-4o"):
     
     Args:
         image_path (str): Path to the image file
-        model (str): OpenAI model to use (when OpenAI is available)
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
     
     Returns:
         str: Analysis of the image
@@ -379,10 +930,13 @@ def analyze_image(image_path, model="gpt-4o"):
     if not os.path.exists(image_path):
         return f"Error: Image file not found at path: {image_path}"
     
+    mode = _ai_mode()
+    
     # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
         
         # Get basic image info
         file_size = os.path.getsize(image_path) / 1024  # KB
@@ -410,33 +964,9 @@ To get real AI-powered image analysis, please add an OpenAI API key (OPENAI_API_
 """
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            # Read the image file and convert to base64
-            with open(image_path, "rb") as image_file:
-                base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-            
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Analyze this image in detail and describe its key elements, context, and any notable aspects."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=500
-            )
-            
-            return completion.choices[0].message.content
+            return _complete(model, _analyze_image_messages(image_path), max_tokens=500)
         except Exception as e:
             logging.error(f"Error analyzing image with OpenAI: {str(e)}")
             return f"Error analyzing image: {str(e)}"
@@ -447,7 +977,7 @@ To get real AI-powered image analysis, please add an OpenAI API key (OPENAI_API_
         logging.error(error_msg)
         return f"# Error: {error_msg}\n\n# Please add an API key to enable AI image analysis."
 
-def generate_unit_tests(code, language="python", model="gpt-4o"):
+def generate_unit_tests(code, language="python", model=None):
     """
     Generate unit tests for a piece of code using AI services or simulated responses.
     
@@ -457,102 +987,34 @@ def generate_unit_tests(code, language="python", model="gpt-4o"):
     Args:
         code (str): Code to generate tests for
         language (str): Programming language of the code
-        model (str): OpenAI model to use (when OpenAI is available)
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
     
     Returns:
         str: Generated unit tests
     """
+    mode = _ai_mode()
+    
     # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
         
         # Generate a simulated response based on the language
         if language.lower() == "python":
-            return f"""# Generated Unit Tests (Simulated)
-# Note: This is a simulated response. For real AI-generated tests, please add an API key.
-
-import unittest
-
-class TestSimulatedFunctionality(unittest.TestCase):
-    \"\"\"
-    This is a placeholder test class. 
-    Real AI would generate tests specific to your code.
-    \"\"\"
-    
-    def test_example(self):
-        \"\"\"Test basic functionality\"\"\"
-        # Placeholder test that would be replaced with real tests
-        # specific to your actual code
-        self.assertEqual(1, 1)
-    
-    def test_edge_case(self):
-        \"\"\"Test edge cases\"\"\"
-        # Placeholder test for edge cases
-        self.assertTrue(True)
-
-if __name__ == '__main__':
-    unittest.main()
-"""
+            return _PY_TEST_TMPL.substitute()
         elif language.lower() == "javascript":
-            return f"""// Generated Unit Tests (Simulated)
-// Note: This is a simulated response. For real AI-generated tests, please add an API key.
-
-const assert = require('assert');
-// or using Jest: const {{ test, expect }} = require('@jest/globals');
-
-describe('Simulated Tests', () => {{
-  // These are placeholder tests.
-  // Real AI would generate tests specific to your code.
-  
-  test('basic functionality', () => {{
-    // Placeholder test that would be replaced with real tests
-    // specific to your actual code
-    assert.strictEqual(1, 1);
-  }});
-  
-  test('edge cases', () => {{
-    // Placeholder test for edge cases
-    assert.strictEqual(true, true);
-  }});
-}});
-"""
+            return _JS_TEST_TMPL.substitute()
         else:
-            return f"""/* Generated Unit Tests (Simulated)
-   Note: This is a simulated response. For real AI-generated tests, please add an API key.
-   This is a generic placeholder for the {language} programming language. */
-
-// This is just placeholder test code
-// To get actual AI-generated tests, please add an API key to the application
-// You can set the OPENAI_API_KEY or PERPLEXITY_API_KEY environment variable
-
-// Example placeholder test suite
-function runTests() {{
-  // Test 1: Basic functionality
-  // Test 2: Edge cases
-  // Test 3: Error handling
-  console.log("Running simulated tests...");
-  console.log("All tests passed (simulated)");
-}}
-
-runTests();
-"""
+            return _GENERIC_TEST_TMPL.substitute(language=language)
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert {language} programmer specializing in test-driven development. Generate comprehensive unit tests for the provided code, covering edge cases and ensuring good test coverage."
-                    },
-                    {"role": "user", "content": f"Please generate unit tests for this {language} code:\n\n```\n{code}\n```"}
-                ]
-            )
-            
-            return completion.choices[0].message.content
+            batch = _review_batch.get()
+            if batch is not None:
+                return _batch_review(batch, code, language, None, model).get("unit_tests", "")
+            return _complete(model, _generate_unit_tests_messages(code, language))
         except Exception as e:
             logging.error(f"Error generating unit tests with OpenAI: {str(e)}")
             return f"# Error generating unit tests: {str(e)}"
@@ -563,7 +1025,7 @@ runTests();
         logging.error(error_msg)
         return f"# Error: {error_msg}\n\n# Please add an API key to enable AI unit test generation."
 
-def translate_code(code, source_language, target_language, model="gpt-4o"):
+def translate_code(code, source_language, target_language, model=None):
     """
     Translate code from one programming language to another using AI services or simulated responses.
     
@@ -574,101 +1036,31 @@ def translate_code(code, source_language, target_language, model="gpt-4o"):
         code (str): Code to translate
         source_language (str): Source programming language
         target_language (str): Target programming language
-        model (str): OpenAI model to use (when OpenAI is available)
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
     
     Returns:
         str: Translated code
     """
+    mode = _ai_mode()
+    
     # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
         
         # Generate a simulated translation based on the target language
         if target_language.lower() == "python":
-            return f"""# Translated from {source_language} to Python (Simulated)
-# Note: This is a simulated response. For real AI-powered translation, please add an API key.
-
-def main():
-    \"\"\"
-    Main function translated from {source_language}.
-    This is placeholder code and may not correctly translate the original.
-    \"\"\"
-    print(f"This is a simulated translation from {source_language} to Python")
-    
-    # Simulated translation of the original code
-    result = process_data_example("example")
-    return result
-
-def process_data_example(value):
-    \"\"\"Process the input data and return a result.\"\"\"
-    # Placeholder implementation
-    return f"Processed: {value}"
-
-if __name__ == "__main__":
-    main()
-"""
+            return _PY_TRANSLATE_TMPL.substitute(source_language=source_language)
         elif target_language.lower() == "javascript":
-            return f"""// Translated from {source_language} to JavaScript (Simulated)
-// Note: This is a simulated response. For real AI-powered translation, please add an API key.
-
-/**
- * Main function translated from {source_language}.
- * This is placeholder code and may not correctly translate the original.
- */
-function main() {{
-  console.log(`This is a simulated translation from {source_language} to JavaScript`);
-  
-  // Simulated translation of the original code
-  const result = processDataExample("example");
-  return result;
-}}
-
-/**
- * Process the input data and return a result.
- * @param {{string}} inputValue - The input to process
- * @return {{string}} The processed result
- */
-function processDataExample(inputValue) {{
-  // Placeholder implementation
-  return `Processed: ${{inputValue}}`;
-}}
-
-main();
-"""
+            return _JS_TRANSLATE_TMPL.substitute(source_language=source_language)
         else:
-            return f"""/* Translated from {source_language} to {target_language} (Simulated)
-   Note: This is a simulated response. For real AI-powered translation, please add an API key.
-   This is a generic placeholder for the {target_language} programming language. */
-
-// This is just placeholder translated code
-// To get actual AI-powered code translation, please add an API key to the application
-// You can set the OPENAI_API_KEY or PERPLEXITY_API_KEY environment variable
-
-// Example placeholder implementation
-function main() {{
-  // Simulated translation from {source_language} to {target_language}
-  console.log("This is a simulated translation");
-}}
-
-main();
-"""
+            return _GENERIC_TRANSLATE_TMPL.substitute(source_language=source_language, target_language=target_language)
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert programmer in both {source_language} and {target_language}. Translate the provided {source_language} code to equivalent {target_language} code, maintaining the same functionality and logic. Include comments to explain any language-specific adaptations."
-                    },
-                    {"role": "user", "content": f"Please translate this {source_language} code to {target_language}:\n\n```\n{code}\n```"}
-                ]
-            )
-            
-            return completion.choices[0].message.content
+            return _complete(model, _translate_code_messages(code, source_language, target_language))
         except Exception as e:
             logging.error(f"Error translating code with OpenAI: {str(e)}")
             return f"# Error translating code: {str(e)}"
@@ -679,7 +1071,7 @@ main();
         logging.error(error_msg)
         return f"# Error: {error_msg}\n\n# Please add an API key to enable AI code translation."
 
-def generate_documentation(code, language="python", model="gpt-4o"):
+def generate_documentation(code, language="python", model=None):
     """
     Generate documentation for a piece of code using AI services or simulated responses.
     
@@ -689,15 +1081,18 @@ def generate_documentation(code, language="python", model="gpt-4o"):
     Args:
         code (str): Code to document
         language (str): Programming language of the code
-        model (str): OpenAI model to use (when OpenAI is available)
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
     
     Returns:
         str: Generated documentation
     """
+    mode = _ai_mode()
+    
     # Handle case with no API keys available
-    if SIMULATE_AI_RESPONSES:
-        # Simulate processing time
-        time.sleep(1.5)
+    if mode == _MODE_SIMULATE:
+        # Optional artificial latency, see SIMULATE_DELAY
+        if SIMULATE_DELAY:
+            time.sleep(SIMULATE_DELAY)
         
         # Get some basic code info
         code_lines = code.strip().split("\n")
@@ -734,20 +1129,10 @@ To get real AI-powered documentation for this code, please add an OpenAI API key
 """
     
     # Use OpenAI if available
-    elif openai and OPENAI_API_KEY:
+    elif mode == _MODE_OPENAI:
         try:
-            completion = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are an expert {language} programmer and technical writer. Generate clear, comprehensive documentation for the provided code, including function descriptions, parameter details, return values, and usage examples."
-                    },
-                    {"role": "user", "content": f"Please generate documentation for this {language} code:\n\n```\n{code}\n```"}
-                ]
-            )
-            
-            return completion.choices[0].message.content
+            return _complete(model, _generate_documentation_messages(code, language),
+                             temperature=ANALYSIS_TEMPERATURE)
         except Exception as e:
             logging.error(f"Error generating documentation with OpenAI: {str(e)}")
             return f"# Error generating documentation: {str(e)}"
@@ -756,4 +1141,251 @@ To get real AI-powered documentation for this code, please add an OpenAI API key
     else:
         error_msg = "No AI service available. Please provide either OPENAI_API_KEY or PERPLEXITY_API_KEY environment variables."
         logging.error(error_msg)
-        return f"# Error: {error_msg}\n\n# Please add an API key to enable AI documentation generation."
\ No newline at end of file
+        return f"# Error: {error_msg}\n\n# Please add an API key to enable AI documentation generation."
+
+# Streaming variants for the free-text entry points. With OpenAI they yield
+# the response as it is generated; simulated and unconfigured modes yield the
+# regular response in one piece.
+
+def generate_code_stream(prompt, language="python", model=None):
+    """
+    Streaming version of generate_code.
+    
+    Args:
+        prompt (str): Description of the code to generate
+        language (str): Target programming language
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
+    
+    Yields:
+        str: Chunks of generated code
+    """
+    if _ai_mode() != _MODE_OPENAI:
+        yield generate_code(prompt, language, model)
+        return
+    try:
+        yield from _complete_stream(model, _generate_code_messages(prompt, language))
+    except Exception as e:
+        logging.error(f"Error generating code with OpenAI: {str(e)}")
+        raise
+
+def explain_code_stream(code, model=None):
+    """
+    Streaming version of explain_code.
+    
+    Args:
+        code (str): Code to explain
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
+    
+    Yields:
+        str: Chunks of the explanation
+    """
+    if _ai_mode() != _MODE_OPENAI:
+        yield explain_code(code, model)
+        return
+    try:
+        yield from _complete_stream(model, _explain_code_messages(code), temperature=ANALYSIS_TEMPERATURE)
+    except Exception as e:
+        logging.error(f"Error explaining code with OpenAI: {str(e)}")
+        raise
+
+def _review(code, language, error_message, model):
+    import orjson
+    return _complete(model, _review_code_messages(code, language, error_message),
+                     response_format={"type": "json_object"}, parse=orjson.loads,
+                     temperature=ANALYSIS_TEMPERATURE)
+
+def _batch_review(batch, code, language, error_message, model):
+    """
+    Get the combined review for a snippet inside review_batch(), requesting
+    it only the first time.
+    
+    The batch's error message takes precedence, so calls that pass their own
+    (debug_code) share the review with those that don't.
+    
+    Returns:
+        dict: A copy of the review, so callers can't change each other's
+    """
+    error_message = batch["error_message"] if batch["error_message"] is not None else error_message
+    key = (code, language, error_message, model or _DEFAULT_MODEL)
+    reviews = batch["reviews"]
+    if key not in reviews:
+        reviews[key] = _review(code, language, error_message, model)
+    return copy.deepcopy(reviews[key])
+
+def review_code(code, language="python", error_message=None, model=None):
+    """
+    Review a piece of code in a single AI request: improvement suggestions,
+    debugging and unit tests together.
+    
+    Args:
+        code (str): Code to review
+        language (str): Programming language of the code
+        error_message (str, optional): Error message from running the code
+        model (str, optional): OpenAI model to use (when OpenAI is available); defaults to _DEFAULT_MODEL
+    
+    Returns:
+        dict: The suggest_improvements and debug_code fields plus "unit_tests"
+    """
+    mode = _ai_mode()
+    
+    # Simulated and unconfigured modes have no request to save, so combine
+    # the individual responses
+    if mode != _MODE_OPENAI:
+        review = suggest_improvements(code, language, model)
+        review.update(debug_code(code, error_message or "", language, model))
+        review["unit_tests"] = generate_unit_tests(code, language, model)
+        return review
+    
+    try:
+        return _review(code, language, error_message, model)
+    except Exception as e:
+        logging.error(f"Error reviewing code with OpenAI: {str(e)}")
+        error_msg = f"Error reviewing code: {str(e)}"
+        return {
+            "suggestions": [],
+            "summary": error_msg,
+            "identified_issues": [error_msg],
+            "fixes": [],
+            "explanation": error_msg,
+            "fixed_code": code,
+            "unit_tests": ""
+        }
+
+@contextlib.contextmanager
+def review_batch(error_message=None):
+    """
+    Answer suggest_improvements, debug_code and generate_unit_tests calls made
+    inside the block from one shared review_code request per code snippet.
+    
+    The combined response is kept for the rest of the block, so a full review
+    costs one API round trip instead of three. Pass the error_message that
+    debug_code will receive so all three share it; without one, debug_code
+    gets a separate review that includes its own error message.
+    
+    Args:
+        error_message (str, optional): Error message included in the review
+    """
+    token = _review_batch.set({"error_message": error_message, "reviews": {}})
+    try:
+        yield
+    finally:
+        _review_batch.reset(token)
+
+# Async variants of the entry points. They await AsyncOpenAI directly, so
+# independent calls can run concurrently on one event loop, e.g.
+#   await asyncio.gather(a_explain_code(code), a_suggest_improvements(code), a_generate_unit_tests(code))
+# Simulated and unconfigured modes fall back to the sync functions in a thread.
+
+def _use_async_openai():
+    return _ai_mode() == _MODE_OPENAI and _get_async_openai_client() is not None
+
+async def a_generate_code(prompt, language="python", model=None):
+    """
+    Async version of generate_code.
+    """
+    if not _use_async_openai():
+        return await asyncio.to_thread(generate_code, prompt, language, model)
+    try:
+        return await _acomplete(model, _generate_code_messages(prompt, language))
+    except Exception as e:
+        logging.error(f"Error generating code with OpenAI: {str(e)}")
+        raise
+
+async def a_explain_code(code, model=None):
+    """
+    Async version of explain_code.
+    """
+    if not _use_async_openai():
+        return await asyncio.to_thread(explain_code, code, model)
+    try:
+        return await _acomplete(model, _explain_code_messages(code), temperature=ANALYSIS_TEMPERATURE)
+    except Exception as e:
+        logging.error(f"Error explaining code with OpenAI: {str(e)}")
+        raise
+
+async def a_suggest_improvements(code, language="python", model=None):
+    """
+    Async version of suggest_improvements.
+    """
+    if not _use_async_openai():
+        return await asyncio.to_thread(suggest_improvements, code, language, model)
+    try:
+        import orjson
+        return await _acomplete(model, _suggest_improvements_messages(code, language),
+                                response_format={"type": "json_object"}, parse=orjson.loads)
+    except Exception as e:
+        logging.error(f"Error suggesting code improvements with OpenAI: {str(e)}")
+        return {
+            "suggestions": [],
+            "summary": f"Error suggesting improvements: {str(e)}"
+        }
+
+async def a_debug_code(code, error_message, language="python", model=None):
+    """
+    Async version of debug_code.
+    """
+    if not _use_async_openai():
+        return await asyncio.to_thread(debug_code, code, error_message, language, model)
+    try:
+        import orjson
+        return await _acomplete(model, _debug_code_messages(code, error_message, language),
+                                response_format={"type": "json_object"}, parse=orjson.loads)
+    except Exception as e:
+        logging.error(f"Error debugging code with OpenAI: {str(e)}")
+        error_msg = f"Error debugging code: {str(e)}"
+        return {
+            "identified_issues": [error_msg],
+            "fixes": [],
+            "explanation": error_msg,
+            "fixed_code": code
+        }
+
+async def a_analyze_image(image_path, model=None):
+    """
+    Async version of analyze_image.
+    """
+    if not _use_async_openai() or not os.path.exists(image_path):
+        return await asyncio.to_thread(analyze_image, image_path, model)
+    try:
+        messages = await asyncio.to_thread(_analyze_image_messages, image_path)
+        return await _acomplete(model, messages, max_tokens=500)
+    except Exception as e:
+        logging.error(f"Error analyzing image with OpenAI: {str(e)}")
+        return f"Error analyzing image: {str(e)}"
+
+async def a_generate_unit_tests(code, language="python", model=None):
+    """
+    Async version of generate_unit_tests.
+    """
+    if not _use_async_openai():
+        return await asyncio.to_thread(generate_unit_tests, code, language, model)
+    try:
+        return await _acomplete(model, _generate_unit_tests_messages(code, language))
+    except Exception as e:
+        logging.error(f"Error generating unit tests with OpenAI: {str(e)}")
+        return f"# Error generating unit tests: {str(e)}"
+
+async def a_translate_code(code, source_language, target_language, model=None):
+    """
+    Async version of translate_code.
+    """
+    if not _use_async_openai():
+        return await asyncio.to_thread(translate_code, code, source_language, target_language, model)
+    try:
+        return await _acomplete(model, _translate_code_messages(code, source_language, target_language))
+    except Exception as e:
+        logging.error(f"Error translating code with OpenAI: {str(e)}")
+        return f"# Error translating code: {str(e)}"
+
+async def a_generate_documentation(code, language="python", model=None):
+    """
+    Async version of generate_documentation.
+    """
+    if not _use_async_openai():
+        return await asyncio.to_thread(generate_documentation, code, language, model)
+    try:
+        return await _acomplete(model, _generate_documentation_messages(code, language),
+                                temperature=ANALYSIS_TEMPERATURE)
+    except Exception as e:
+        logging.error(f"Error generating documentation with OpenAI: {str(e)}")
+        return f"# Error generating documentation: {str(e)}"
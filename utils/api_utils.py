@@ -1,12 +1,382 @@
-import requests
-import json
+import importlib.util
+import copy
 import logging
 import os
 import time
-from urllib.parse import urlparse, urljoin
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from utils.cache import content_digest
+from utils.llm_cache import MemoryBackend
+from urllib.parse import urlparse, urljoin, urlencode
 import hashlib
+import hmac
+import functools
+import itertools
+import orjson
 
-def fetch_data(url, method='GET', headers=None, params=None, data=None, timeout=30):
+# Optional incremental JSON parsing for fetch_data(stream=True), imported
+# when a stream is first parsed
+IJSON_AVAILABLE = importlib.util.find_spec('ijson') is not None
+
+# requests pulls in urllib3, idna, charset_normalizer and certifi, tens of
+# milliseconds of import time, so it is loaded on the first HTTP call rather
+# than when this module is imported
+_requests = None
+
+def _get_requests():
+    global _requests
+    if _requests is None:
+        import requests
+        _requests = requests
+    return _requests
+
+# Read size for download_file; large chunks keep the write syscall count low
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Bodies smaller than this are parsed in one go even when streaming
+STREAM_PARSE_MIN_BYTES = 64 * 1024
+
+# One pooled session shared by every helper, so repeated calls to the same
+# host reuse keep-alive connections instead of repeating the TCP/TLS handshake
+_SESSION = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Get the shared requests session, creating it on first use.
+    
+    Returns:
+        requests.Session: Session with pooled HTTP and HTTPS adapters
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _session_lock:
+            if _SESSION is None:
+                requests = _get_requests()
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _SESSION = session
+    return _SESSION
+
+def _parse_wait(value):
+    """
+    Parse a Retry-After or rate-limit reset header into seconds to wait.
+    
+    Args:
+        value (str): Delay in seconds, Unix timestamp, HTTP-date or ISO 8601 time
+    
+    Returns:
+        float: Seconds to wait, or None if the value can't be parsed
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+        # Large values are absolute Unix timestamps rather than delays
+        if seconds > 1e9:
+            seconds -= time.time()
+        return max(seconds, 0.0)
+    except ValueError:
+        pass
+    # email.utils is only needed for HTTP-date values, so import it here
+    from email.utils import parsedate_to_datetime
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            when = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+class RateLimiter:
+    """
+    Per-host client-side throttle that blocks before a request is sent.
+    
+    Each host gets a sliding one-minute request window (when rpm is set), a
+    pause taken from Retry-After / rate-limit headers, and a concurrency
+    limit adjusted AIMD-style: it grows by 1/limit on every success and is
+    halved on 429 or 5xx responses. Server-requested pauses are capped at
+    max_backoff, and acquire() gives up after acquire_timeout, so one bogus
+    reset header can't park every caller indefinitely.
+    """
+    
+    _REMAINING_HEADERS = ('X-RateLimit-Remaining', 'RateLimit-Remaining', 'anthropic-ratelimit-requests-remaining')
+    _RESET_HEADERS = ('X-RateLimit-Reset', 'RateLimit-Reset', 'anthropic-ratelimit-requests-reset')
+    
+    def __init__(self, rpm=None, max_concurrency=16, min_concurrency=1, max_backoff=60.0, acquire_timeout=60.0):
+        """
+        Initialize the limiter.
+        
+        Args:
+            rpm (int): Maximum requests per minute per host, or None for no window limit
+            max_concurrency (int): Upper bound for concurrent requests per host
+            min_concurrency (int): Lower bound the limit is halved down to
+            max_backoff (float): Longest pause taken from response headers, in seconds
+            acquire_timeout (float): Default seconds acquire() waits before raising
+        """
+        self.rpm = rpm
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_backoff = max_backoff
+        self.acquire_timeout = acquire_timeout
+        self._hosts = {}
+        self._lock = threading.Condition()
+    
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {
+                'sent': deque(),
+                'limit': float(self.max_concurrency),
+                'in_flight': 0,
+                'blocked_until': 0.0,
+            }
+        return state
+    
+    def acquire(self, host, timeout=None):
+        """
+        Wait until a request to host may be sent, then reserve a slot.
+        
+        Args:
+            host (str): Host the request goes to
+            timeout (float, optional): Seconds to wait at most; defaults to acquire_timeout
+        
+        Raises:
+            TimeoutError: If no slot became available in time
+        """
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        with self._lock:
+            state = self._state(host)
+            while True:
+                now = time.monotonic()
+                sent = state['sent']
+                while sent and sent[0] <= now - 60:
+                    sent.popleft()
+                
+                wait = state['blocked_until'] - now
+                if self.rpm and len(sent) >= self.rpm:
+                    wait = max(wait, sent[0] + 60 - now)
+                if wait <= 0 and state['in_flight'] < int(state['limit']):
+                    break
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for the rate limit on {host}")
+                # Woken early by release() when a slot frees up
+                self._lock.wait(timeout=min(wait, remaining) if wait > 0 else remaining)
+            
+            state['in_flight'] += 1
+            sent.append(now)
+    
+    def release(self, host, response=None):
+        """
+        Free the slot taken by acquire() and learn from the response.
+        
+        Args:
+            host (str): Host the request went to
+            response (requests.Response): Response received, or None if the request failed
+        """
+        with self._lock:
+            state = self._state(host)
+            state['in_flight'] -= 1
+            if response is not None:
+                self._update(state, response)
+            self._lock.notify_all()
+    
+    def _update(self, state, response):
+        status = response.status_code
+        if status == 429 or status >= 500:
+            state['limit'] = max(self.min_concurrency, state['limit'] * 0.5)
+        else:
+            state['limit'] = min(self.max_concurrency, state['limit'] + 1 / state['limit'])
+        
+        headers = response.headers
+        wait = _parse_wait(headers.get('Retry-After')) if status in (429, 503) else None
+        if wait is None:
+            remaining = next((headers[h] for h in self._REMAINING_HEADERS if h in headers), None)
+            if remaining is not None and remaining.strip() == '0':
+                wait = next((_parse_wait(headers[h]) for h in self._RESET_HEADERS if h in headers), None)
+        if wait:
+            wait = min(wait, self.max_backoff)
+            state['blocked_until'] = max(state['blocked_until'], time.monotonic() + wait)
+
+# Shared limiter for fetch_data; API_RATE_LIMIT_RPM caps requests per minute per host
+_rate_limiter = RateLimiter(rpm=int(os.environ.get('API_RATE_LIMIT_RPM', 0)) or None)
+
+# Conditional GET cache: responses with validators are kept and revalidated
+# with If-None-Match / If-Modified-Since, so an unchanged resource costs a
+# 304 with no body; Cache-Control max-age responses skip the request entirely
+_response_cache = MemoryBackend(maxsize=256)
+
+def _response_cache_key(url, headers, params):
+    params_key = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    headers_key = sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items())
+    return repr((url, params_key, headers_key))
+
+def _freshness(response):
+    # Seconds the response may be reused without revalidation, or None if it must not be stored
+    cache_control = response.headers.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control:
+        return None
+    max_age = 0
+    if 'no-cache' not in cache_control:
+        for directive in cache_control.split(','):
+            name, _, value = directive.strip().partition('=')
+            if name == 'max-age' and value.isdigit():
+                max_age = int(value)
+    if not max_age and 'ETag' not in response.headers and 'Last-Modified' not in response.headers:
+        return None
+    return max_age
+
+# Session.request() re-merges session headers, cookies and auth (reading
+# ~/.netrc) and re-resolves proxy/CA settings from the environment on every
+# call. Requests are instead prepared from a cached template per
+# (method, url, headers), with only params and body filled in per call, and
+# the environment settings are resolved once per origin.
+_prepared_templates = MemoryBackend(maxsize=256)
+
+def _prepare(method, url, headers, params, body):
+    session = get_session()
+    # Templates would freeze cookies, so prepare from scratch once any are set
+    if session.cookies:
+        return session.prepare_request(_get_requests().Request(method, url, headers=headers, params=params, data=body))
+    
+    key = (method, url, tuple(sorted(headers.items())) if headers else ())
+    template = _prepared_templates.get(key)
+    if template is None:
+        template = session.prepare_request(_get_requests().Request(method, url, headers=headers))
+        _prepared_templates.set(key, template)
+    
+    prepared = template.copy()
+    if params:
+        prepared.prepare_url(url, params)
+    if body is not None:
+        prepared.prepare_body(body, None)
+    return prepared
+
+@functools.lru_cache(maxsize=64)
+def _env_settings_for_origin(origin):
+    settings = get_session().merge_environment_settings(origin, {}, None, None, None)
+    settings.pop('stream', None)
+    return settings
+
+def _env_settings(url):
+    """
+    Get the proxy/verify/cert settings requests would apply to a URL.
+    
+    Returns:
+        dict: Keyword arguments for Session.send
+    """
+    parts = urlparse(url)
+    return _env_settings_for_origin(f"{parts.scheme}://{parts.netloc}")
+
+def _send(method, url, headers=None, params=None, data=None, timeout=30, stream=False, use_cache=True):
+    """
+    Send a request through the shared session and rate limiter.
+    
+    Non-streamed GETs go through the conditional response cache unless
+    use_cache is False; a forced refresh still stores the new response.
+    
+    Returns:
+        requests.Response: Response, after raise_for_status()
+    """
+    host = urlparse(url).netloc
+    body = None
+    # An empty dict or list is still a JSON body ("{}"), as with json=data
+    if data is not None:
+        body = orjson.dumps(data)
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+    
+    cache_key = cached = None
+    if method.upper() == 'GET' and not stream:
+        cache_key = _response_cache_key(url, headers, params)
+        if use_cache:
+            cached = _response_cache.get(cache_key)
+        if cached is not None:
+            if cached['fresh_until'] > time.monotonic():
+                return cached['response']
+            validators = {}
+            if cached['etag']:
+                validators['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                validators['If-Modified-Since'] = cached['last_modified']
+            headers = {**(headers or {}), **validators}
+    
+    _rate_limiter.acquire(host)
+    response = None
+    try:
+        prepared = _prepare(method.upper(), url, headers, params, body)
+        response = get_session().send(prepared, timeout=timeout, stream=stream, **_env_settings(prepared.url))
+    except _get_requests().RequestException as e:
+        if cached is None:
+            raise
+        # Serve the stale copy rather than failing outright
+        logging.warning(f"Serving cached response for {url} after error: {str(e)}")
+        return cached['response']
+    finally:
+        _rate_limiter.release(host, response)
+    
+    if response.status_code == 304 and cached is not None:
+        max_age = _freshness(response)
+        cached['fresh_until'] = time.monotonic() + (max_age or 0)
+        return cached['response']
+    
+    # Raise an exception for HTTP errors
+    response.raise_for_status()
+    
+    if cache_key is not None:
+        max_age = _freshness(response)
+        if max_age is not None:
+            _response_cache.set(cache_key, {
+                'response': response,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fresh_until': time.monotonic() + max_age,
+            })
+    return response
+
+def _parse_body(response):
+    # Try to parse as JSON, fallback to text if not JSON. orjson parses the
+    # raw bytes, skipping the charset detection response.json() runs first
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return {"text": response.text}
+
+def _items_at(body, items_path):
+    # Walk an ijson-style prefix like 'results.item' through a parsed body
+    node = body
+    for key in items_path.split('.'):
+        if key == 'item':
+            break
+        node = node.get(key, []) if isinstance(node, dict) else []
+    return iter(node if isinstance(node, list) else [])
+
+def _stream_items(response, items_path):
+    """
+    Yield the items at items_path from a streamed response body.
+    
+    Large bodies are parsed incrementally off the socket with ijson when it
+    is installed; small ones, or all of them without ijson, are read whole.
+    """
+    with response:
+        length = response.headers.get('Content-Length')
+        if IJSON_AVAILABLE and (length is None or int(length) >= STREAM_PARSE_MIN_BYTES):
+            # Let urllib3 undo any gzip/deflate encoding as ijson reads
+            import ijson
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, items_path)
+        else:
+            yield from _items_at(_parse_body(response), items_path)
+
+def fetch_data(url, method='GET', headers=None, params=None, data=None, timeout=30, stream=False, items_path='results.item', bypass_cache=False):
     """
     Fetch data from an API endpoint.
     
@@ -17,35 +387,52 @@ def fetch_data(url, method='GET', headers=None, params=None, data=None, timeout=
         params (dict): Query parameters
         data (dict): Request body data
         timeout (int): Request timeout in seconds
+        stream (bool): Return an iterator over the items at items_path instead of the parsed body
+        items_path (str): ijson prefix of the items to stream, e.g. 'results.item' or 'item' for a top-level list
+        bypass_cache (bool): Skip cached GET responses and fetch a fresh copy
     
     Returns:
-        dict: Response data
+        dict: Response data, or an iterator of items when stream is True
     """
     if headers is None:
         headers = {}
     
     try:
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            json=data if data else None,
-            timeout=timeout
-        )
-        
-        # Raise an exception for HTTP errors
-        response.raise_for_status()
-        
-        # Try to parse as JSON, fallback to text if not JSON
-        try:
-            return response.json()
-        except ValueError:
-            return {"text": response.text}
-    except requests.exceptions.RequestException as e:
+        response = _send(method, url, headers, params, data, timeout, stream=stream, use_cache=not bypass_cache)
+        if stream:
+            return _stream_items(response, items_path)
+        return _parse_body(response)
+    except _get_requests().RequestException as e:
         logging.error(f"Error fetching data from {url}: {str(e)}")
         raise
 
+def _iter_body(r):
+    """
+    Yield a streamed response body in DOWNLOAD_CHUNK_SIZE pieces.
+    
+    Bodies without a Content-Encoding are read with urllib3's readinto into
+    one reused buffer, skipping requests' chunk generator; urllib3 still
+    raises if the body ends before its Content-Length. The yielded views are
+    only valid until the next chunk. Encoded bodies go through iter_content
+    so they are decompressed.
+    """
+    if r.headers.get('Content-Encoding'):
+        yield from r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        return
+    
+    from urllib3.exceptions import ProtocolError
+    buf = bytearray(DOWNLOAD_CHUNK_SIZE)
+    view = memoryview(buf)
+    while True:
+        try:
+            n = r.raw.readinto(buf)
+        except ProtocolError as e:
+            # Surface it as iter_content would
+            raise _get_requests().exceptions.ChunkedEncodingError(e)
+        if not n:
+            break
+        yield view[:n]
+
 def download_file(url, destination, headers=None, timeout=60):
     """
     Download a file from a URL.
@@ -67,17 +454,74 @@ def download_file(url, destination, headers=None, timeout=60):
         os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
         
         # Stream the download to allow for large files
-        with requests.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        with get_session().get(url, headers=headers, stream=True, timeout=timeout) as r:
             r.raise_for_status()
-            with open(destination, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                # Reserve the whole file up front when its size is known; with a
+                # Content-Encoding the decoded size differs, so skip it then
+                total = 0 if r.headers.get('Content-Encoding') else int(r.headers.get('Content-Length') or 0)
+                if total and hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(fd, 0, total)
+                    except OSError:
+                        pass  # Not supported by this filesystem
+                
+                written = 0
+                try:
+                    for chunk in _iter_body(r):
+                        view = memoryview(chunk)
+                        while view:
+                            n = os.write(fd, view)
+                            view = view[n:]
+                        written += len(chunk)
+                finally:
+                    # Drop any preallocated space the body didn't fill
+                    if written < total:
+                        os.ftruncate(fd, written)
+                
+                # A body shorter than its Content-Length means the connection
+                # dropped; fail rather than pass it off as the whole file
+                if total and written != total:
+                    raise _get_requests().exceptions.ChunkedEncodingError(
+                        f"Download ended after {written} of {total} bytes"
+                    )
+            finally:
+                os.close(fd)
         
         return destination
     except Exception as e:
         logging.error(f"Error downloading file from {url}: {str(e)}")
         raise
 
+# Writes carry an Idempotency-Key derived from (method, url, body), so a
+# retried POST/PUT whose first attempt actually succeeded is coalesced by the
+# server. Responses are also remembered briefly, and an identical write -
+# same headers too, so callers with different credentials never share one -
+# replayed within IDEMPOTENCY_WINDOW seconds is answered from memory.
+IDEMPOTENCY_WINDOW = float(os.environ.get('API_IDEMPOTENCY_WINDOW', 5))
+_recent_writes = MemoryBackend(maxsize=256)
+
+def _idempotency_key(method, url, data):
+    return content_digest([method, url, data])
+
+def _idempotent_write(method, url, data, headers, timeout):
+    headers = dict(headers or {})
+    key = next((v for k, v in headers.items() if k.lower() == 'idempotency-key'), None)
+    if key is None:
+        key = headers['Idempotency-Key'] = _idempotency_key(method, url, data)
+    
+    replay_key = content_digest([method, url, data, headers])
+    cached = _recent_writes.get(replay_key)
+    if cached is not None:
+        # Each caller gets its own copy to modify
+        return copy.deepcopy(cached)
+    
+    result = fetch_data(url, method=method, headers=headers, data=data, timeout=timeout)
+    if IDEMPOTENCY_WINDOW > 0:
+        _recent_writes.set(replay_key, copy.deepcopy(result), ttl=IDEMPOTENCY_WINDOW)
+    return result
+
 def post_data(url, data, headers=None, timeout=30):
     """
     Post data to an API endpoint.
@@ -85,13 +529,13 @@ def post_data(url, data, headers=None, timeout=30):
     Args:
         url (str): URL to post data to
         data (dict): Data to post
-        headers (dict): HTTP headers
+        headers (dict): HTTP headers; an Idempotency-Key is added unless present
         timeout (int): Request timeout in seconds
     
     Returns:
         dict: Response data
     """
-    return fetch_data(url, method='POST', headers=headers, data=data, timeout=timeout)
+    return _idempotent_write('POST', url, data, headers, timeout)
 
 def put_data(url, data, headers=None, timeout=30):
     """
@@ -100,13 +544,13 @@ def put_data(url, data, headers=None, timeout=30):
     Args:
         url (str): URL to put data to
         data (dict): Data to put
-        headers (dict): HTTP headers
+        headers (dict): HTTP headers; an Idempotency-Key is added unless present
         timeout (int): Request timeout in seconds
     
     Returns:
         dict: Response data
     """
-    return fetch_data(url, method='PUT', headers=headers, data=data, timeout=timeout)
+    return _idempotent_write('PUT', url, data, headers, timeout)
 
 def delete_data(url, headers=None, timeout=30):
     """
@@ -122,7 +566,7 @@ def delete_data(url, headers=None, timeout=30):
     """
     return fetch_data(url, method='DELETE', headers=headers, timeout=timeout)
 
-def handle_rate_limiting(response, retry_after=None, max_retries=3):
+def handle_rate_limiting(response, retry_after=None, max_retries=3, timeout=30):
     """
     Handle rate-limiting in API responses.
     
@@ -130,6 +574,7 @@ def handle_rate_limiting(response, retry_after=None, max_retries=3):
         response (requests.Response): Response object
         retry_after (int): Seconds to wait before retrying, or None to use response headers
         max_retries (int): Maximum number of retries
+        timeout (int): Timeout in seconds for each retried request
     
     Returns:
         requests.Response: Response after successful retry or the original response
@@ -141,28 +586,39 @@ def handle_rate_limiting(response, retry_after=None, max_retries=3):
         
         # Determine how long to wait
         if retry_after is None:
-            retry_after_header = response.headers.get('Retry-After')
-            if retry_after_header:
-                try:
-                    wait_time = int(retry_after_header)
-                except ValueError:
-                    # If it's a date, we need to parse it
-                    wait_time = 10  # Default to 10 seconds if we can't parse
+            # Retry-After may be a delay in seconds or an HTTP-date
+            wait_time = _parse_wait(response.headers.get('Retry-After'))
+            if wait_time is not None:
+                wait_time = min(wait_time, _rate_limiter.max_backoff)
             else:
-                wait_time = 2 ** retries  # Exponential backoff
+                # Exponential backoff with jitter so clients don't retry in lockstep
+                wait_time = 2 ** retries + random.uniform(0, 1)
         else:
             wait_time = retry_after
         
-        logging.info(f"Rate limited. Retrying after {wait_time} seconds (retry {retries}/{max_retries})")
+        logging.info(f"Rate limited. Retrying after {wait_time:.1f} seconds (retry {retries}/{max_retries})")
         time.sleep(wait_time)
         
-        # Retry the request
-        response = requests.request(
-            method=response.request.method,
-            url=response.request.url,
-            headers=response.request.headers,
-            data=response.request.body
-        )
+        # Resend the already-encoded request as is: its body bytes,
+        # Content-Length and any signed headers are reused, not rebuilt
+        retry_request = response.request.copy()
+        if retry_request.body is not None and not isinstance(retry_request.body, (bytes, str)):
+            # A streamed upload body was consumed by the first send; only a
+            # seekable file can be replayed, by rewinding it
+            try:
+                _get_requests().utils.rewind_body(retry_request)
+            except _get_requests().exceptions.UnrewindableBodyError:
+                logging.error(f"Cannot retry {retry_request.method} {retry_request.url}: request body can't be replayed")
+                break
+        
+        host = urlparse(retry_request.url).netloc
+        _rate_limiter.acquire(host)
+        retried = None
+        try:
+            retried = get_session().send(retry_request, timeout=timeout, **_env_settings(retry_request.url))
+        finally:
+            _rate_limiter.release(host, retried)
+        response = retried
     
     return response
 
@@ -196,6 +652,10 @@ def create_webhook(url, callback_url, events=None, headers=None):
         logging.error(f"Error creating webhook: {str(e)}")
         raise
 
+@functools.lru_cache(maxsize=32)
+def _secret_bytes(secret):
+    return secret.encode('utf-8')
+
 def verify_webhook(request_data, secret, signature_header):
     """
     Verify a webhook signature.
@@ -212,22 +672,141 @@ def verify_webhook(request_data, secret, signature_header):
         if not signature_header:
             return False
         
-        # Calculate the HMAC signature
-        computed_signature = "sha256=" + hmac.new(
-            secret.encode('utf-8'),
+        scheme, _, signature_hex = signature_header.partition('=')
+        if scheme != 'sha256':
+            return False
+        try:
+            expected_signature = bytes.fromhex(signature_hex)
+        except ValueError:
+            return False
+        
+        # Compare the raw 32-byte digests rather than their hex encodings
+        computed_signature = hmac.new(
+            _secret_bytes(secret),
             request_data,
             hashlib.sha256
-        ).hexdigest()
+        ).digest()
         
-        # Compare signatures
-        return hmac.compare_digest(computed_signature, signature_header)
+        return hmac.compare_digest(computed_signature, expected_signature)
     except Exception as e:
         logging.error(f"Error verifying webhook signature: {str(e)}")
         return False
 
-def paginate_requests(url, headers=None, params=None, max_pages=None):
+def _page_results(body):
+    # Different APIs handle pagination differently; None means no results list
+    if isinstance(body, dict):
+        return body.get('results', [])
+    if isinstance(body, list):
+        return body
+    return None
+
+def _next_page(url, params, current_url, body, links, page, follows_cursor):
     """
-    Paginate through API results.
+    Work out the request for the page after the current one.
+    
+    Args:
+        url (str): Base URL passed to the paginator
+        params (dict): Initial query parameters
+        current_url (str): URL the current page was fetched from
+        body: Parsed body of the current page
+        links (dict): Parsed Link header of the current response
+        page (int): Current page number
+        follows_cursor (bool): Whether earlier pages advertised a cursor
+    
+    Returns:
+        tuple: (url, params, follows_cursor) for the next request, or None after the last page
+    """
+    # RFC 5988 Link header
+    link = links.get('next')
+    if link:
+        return urljoin(current_url, link['url']), None, True
+    
+    if isinstance(body, dict):
+        next_value = body.get('next')
+        if isinstance(next_value, str) and ('://' in next_value or next_value.startswith('/')):
+            return urljoin(current_url, next_value), None, True
+        
+        meta = body.get('meta')
+        cursor = body.get('next_cursor') or (meta.get('cursor') if isinstance(meta, dict) else None)
+        if cursor:
+            return url, dict(params, cursor=cursor), True
+        
+        # Check if there are more pages
+        if next_value is None or follows_cursor:
+            return None
+    elif not body or follows_cursor:
+        # An empty list means we're past the last page
+        return None
+    
+    return url, dict(params, page=page + 1), False
+
+# Upper bound on concurrent page fetches; the rate limiter's per-host
+# concurrency limit still applies on top of this
+PAGINATE_MAX_WORKERS = 20
+
+def _total_pages(body, page_size):
+    """
+    Get the number of pages advertised by the first page of a paginated API.
+    
+    Args:
+        body: Parsed body of the first page
+        page_size (int): Number of results on the first page
+    
+    Returns:
+        int: Total number of pages, or None if the API doesn't say
+    """
+    if not isinstance(body, dict):
+        return None
+    meta = body.get('meta') if isinstance(body.get('meta'), dict) else {}
+    for value in (body.get('total_pages'), meta.get('total_pages'), meta.get('last_page')):
+        if isinstance(value, int):
+            return value
+    total_count = body.get('total_count', meta.get('total_count'))
+    if isinstance(total_count, int) and page_size:
+        return -(-total_count // page_size)
+    return None
+
+def _fetch_pages_concurrently(url, headers, params, pages):
+    """
+    Fetch numbered pages in parallel and yield their results in page order.
+    """
+    def fetch_page(page):
+        try:
+            return _parse_body(_send('GET', url, headers=headers, params=dict(params, page=page)))
+        except Exception as e:
+            logging.error(f"Error during pagination at page {page}: {str(e)}")
+            raise
+    
+    workers = min(PAGINATE_MAX_WORKERS, len(pages))
+    pages = iter(pages)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Only `workers` pages are in flight or buffered at a time: the next
+        # page is submitted as each one is consumed, in page order
+        in_flight = deque(executor.submit(fetch_page, page) for page in itertools.islice(pages, workers))
+        try:
+            while in_flight:
+                body = in_flight.popleft().result()
+                for page in itertools.islice(pages, 1):
+                    in_flight.append(executor.submit(fetch_page, page))
+                results = _page_results(body)
+                if results is None:
+                    return
+                yield from results
+        finally:
+            # Stopped early (no results list, an error, or the caller quit)
+            for future in in_flight:
+                future.cancel()
+
+def iter_paginated(url, headers=None, params=None, max_pages=None):
+    """
+    Iterate over API results page by page.
+    
+    Follows the next page the API advertises, preferring cursors over page
+    numbers: a Link rel="next" header, a "next" URL in the body, or a
+    "next_cursor" / "meta.cursor" token. Falls back to incrementing a
+    "page" query parameter when none of these is present; if the first page
+    also reports total_pages, meta.last_page or total_count, the remaining
+    pages are fetched concurrently.
     
     Args:
         url (str): Base URL for the API
@@ -235,8 +814,9 @@ def paginate_requests(url, headers=None, params=None, max_pages=None):
         params (dict): Initial query parameters
         max_pages (int): Maximum number of pages to fetch, or None for all
     
-    Returns:
-        list: Combined results from all pages
+    Yields:
+        any: Individual results, with one page in memory at a time (at most
+            PAGINATE_MAX_WORKERS when pages are fetched concurrently)
     """
     if headers is None:
         headers = {}
@@ -244,42 +824,67 @@ def paginate_requests(url, headers=None, params=None, max_pages=None):
     if params is None:
         params = {}
     
-    all_results = []
     page = 1
-    more_pages = True
-    
-    while more_pages and (max_pages is None or page <= max_pages):
-        # Update page parameter
-        current_params = params.copy()
-        current_params['page'] = page
-        
+    pages_fetched = 0
+    # Set once the API advertises a next link or cursor; from then on its
+    # absence marks the last page instead of falling back to page numbers
+    follows_cursor = False
+    next_url = url
+    current_params = dict(params, page=page)
+    
+    while max_pages is None or pages_fetched < max_pages:
         try:
-            response = fetch_data(url, headers=headers, params=current_params)
-            
-            # Different APIs handle pagination differently
-            # This is a common pattern, but may need to be adjusted
-            if isinstance(response, dict):
-                results = response.get('results', [])
-                all_results.extend(results)
-                
-                # Check if there are more pages
-                more_pages = response.get('next') is not None
-            elif isinstance(response, list):
-                all_results.extend(response)
-                
-                # If the response is empty or smaller than expected, assume no more pages
-                more_pages = len(response) > 0
-            else:
-                more_pages = False
-            
-            page += 1
+            response = _send('GET', next_url, headers=headers, params=current_params)
         except Exception as e:
-            logging.error(f"Error during pagination at page {page}: {str(e)}")
+            logging.error(f"Error during pagination at page {pages_fetched + 1}: {str(e)}")
             raise
+        pages_fetched += 1
+        body = _parse_body(response)
+        
+        results = _page_results(body)
+        if results is None:
+            return
+        yield from results
+        
+        following = _next_page(url, params, next_url, body, response.links, page, follows_cursor)
+        if following is None:
+            return
+        next_url, current_params, follows_cursor = following
+        
+        # Numbered pages with a known total: fetch the rest concurrently
+        if pages_fetched == 1 and not follows_cursor:
+            last_page = _total_pages(body, len(results))
+            if max_pages is not None and last_page is not None:
+                last_page = min(last_page, max_pages)
+            if last_page is not None and last_page > 1:
+                yield from _fetch_pages_concurrently(url, headers, params, range(2, last_page + 1))
+                return
+        
+        if not follows_cursor:
+            page += 1
+
+def paginate_requests(url, headers=None, params=None, max_pages=None):
+    """
+    Paginate through API results.
     
-    return all_results
+    Args:
+        url (str): Base URL for the API
+        headers (dict): HTTP headers
+        params (dict): Initial query parameters
+        max_pages (int): Maximum number of pages to fetch, or None for all
+    
+    Returns:
+        list: Combined results from all pages
+    """
+    return list(iter_paginated(url, headers, params, max_pages))
+
+@functools.lru_cache(maxsize=256)
+def _url_prefix(base_url, path, static_items):
+    url = urljoin(base_url, path) if path else base_url
+    query = urlencode(static_items)
+    return f"{url}?{query}" if query else url
 
-def build_url(base_url, path=None, params=None):
+def build_url(base_url, path=None, params=None, static_params=None):
     """
     Build a URL with path and query parameters.
     
@@ -287,22 +892,25 @@ def build_url(base_url, path=None, params=None):
         base_url (str): Base URL
         path (str): Path to append to the base URL
         params (dict): Query parameters
+        static_params (dict): Query parameters that stay the same across calls;
+            the URL up to and including them is built once and cached
     
     Returns:
         str: Complete URL
     """
-    url = base_url
-    
-    if path:
-        url = urljoin(url, path)
+    # Filter out None values
+    static_items = tuple((k, v) for k, v in static_params.items() if v is not None) if static_params else ()
+    try:
+        url = _url_prefix(base_url, path, static_items)
+    except TypeError:
+        # Unhashable values (e.g. lists) can't be cached but urlencode takes them
+        url = _url_prefix.__wrapped__(base_url, path, static_items)
     
     if params:
-        # Filter out None values
-        filtered_params = {k: v for k, v in params.items() if v is not None}
+        query = urlencode([(k, v) for k, v in params.items() if v is not None])
         
         # Add query parameters if any remain after filtering
-        if filtered_params:
-            from urllib.parse import urlencode
-            url = f"{url}?{urlencode(filtered_params)}"
+        if query:
+            url = f"{url}{'&' if static_items else '?'}{query}"
     
     return url
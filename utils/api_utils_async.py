@@ -0,0 +1,171 @@
+import asyncio
+import importlib.util
+import logging
+import weakref
+from urllib.parse import urlparse
+import orjson
+from utils.api_utils import _rate_limiter, _page_results, _next_page
+
+# Pages fetched concurrently ahead of the consumer when the API uses page numbers
+PREFETCH_PAGES = 4
+
+# HTTP/2 lets concurrent page requests to a host share one multiplexed
+# connection; it needs the h2 package (httpx[http2]), and servers that don't
+# offer h2 via ALPN are spoken to over HTTP/1.1 automatically
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# httpx is imported on first use, like requests in api_utils
+_httpx = None
+
+def _get_httpx():
+    global _httpx
+    if _httpx is None:
+        import httpx
+        _httpx = httpx
+    return _httpx
+
+# httpx.AsyncClient is bound to the event loop it was first used on, so keep
+# one pooled client per loop
+_clients = weakref.WeakKeyDictionary()
+
+def get_async_client():
+    """
+    Get the pooled async HTTP client for the running event loop.
+
+    Returns:
+        httpx.AsyncClient: Client with keep-alive connection pooling and HTTP/2 when available
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        httpx = _get_httpx()
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=20, keepalive_expiry=30.0),
+            http2=HTTP2_AVAILABLE
+        )
+        _clients[loop] = client
+    return client
+
+async def _send(method, url, headers=None, params=None, data=None, timeout=30):
+    host = urlparse(url).netloc
+    body = None
+    if data:
+        body = orjson.dumps(data)
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+    # The shared limiter may block, so wait for it off the event loop
+    await asyncio.to_thread(_rate_limiter.acquire, host)
+    response = None
+    try:
+        response = await get_async_client().request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            content=body,
+            timeout=timeout
+        )
+    finally:
+        _rate_limiter.release(host, response)
+
+    # Raise an exception for HTTP errors
+    response.raise_for_status()
+    return response
+
+def _parse_body(response):
+    # Try to parse as JSON, fallback to text if not JSON. orjson parses the
+    # raw bytes, skipping the charset detection response.json() runs first
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return {"text": response.text}
+
+async def fetch_data_async(url, method='GET', headers=None, params=None, data=None, timeout=30):
+    """
+    Fetch data from an API endpoint without blocking the event loop.
+
+    Args:
+        url (str): URL to fetch data from
+        method (str): HTTP method to use (GET, POST, PUT, DELETE)
+        headers (dict): HTTP headers
+        params (dict): Query parameters
+        data (dict): Request body data
+        timeout (int): Request timeout in seconds
+
+    Returns:
+        dict: Response data
+    """
+    if headers is None:
+        headers = {}
+
+    try:
+        return _parse_body(await _send(method, url, headers, params, data, timeout))
+    except _get_httpx().HTTPError as e:
+        logging.error(f"Error fetching data from {url}: {str(e)}")
+        raise
+
+async def paginate_requests_async(url, headers=None, params=None, max_pages=None, prefetch=PREFETCH_PAGES):
+    """
+    Iterate over API results, fetching numbered pages concurrently.
+
+    Cursor and next-link pagination is inherently sequential and is followed
+    one page at a time, as in api_utils.iter_paginated. For page-numbered
+    APIs the next `prefetch` pages are requested together, so walking N pages
+    takes about N / prefetch round trips; up to prefetch - 1 pages past the
+    end may be fetched and discarded.
+
+    Args:
+        url (str): Base URL for the API
+        headers (dict): HTTP headers
+        params (dict): Initial query parameters
+        max_pages (int): Maximum number of pages to fetch, or None for all
+        prefetch (int): Number of numbered pages to request at once
+
+    Yields:
+        any: Individual results, in page order
+    """
+    if headers is None:
+        headers = {}
+
+    if params is None:
+        params = {}
+
+    async def fetch_page(page_url, page_params, number):
+        try:
+            response = await _send('GET', page_url, headers=headers, params=page_params)
+        except Exception as e:
+            logging.error(f"Error during pagination at page {number}: {str(e)}")
+            raise
+        return response, _parse_body(response)
+
+    page = 1
+    pages_fetched = 0
+    following = (url, dict(params, page=page), False)
+
+    while following is not None and (max_pages is None or pages_fetched < max_pages):
+        next_url, next_params, follows_cursor = following
+
+        if follows_cursor or pages_fetched == 0:
+            numbers = [page]
+            batch = [await fetch_page(next_url, next_params, pages_fetched + 1)]
+        else:
+            count = prefetch if max_pages is None else min(prefetch, max_pages - pages_fetched)
+            numbers = [page + offset for offset in range(1, count + 1)]
+            batch = await asyncio.gather(*(
+                fetch_page(url, dict(params, page=number), pages_fetched + offset)
+                for offset, number in enumerate(numbers, 1)
+            ))
+
+        for number, (response, body) in zip(numbers, batch):
+            page = number
+            pages_fetched += 1
+
+            results = _page_results(body)
+            if results is None:
+                return
+            for result in results:
+                yield result
+
+            following = _next_page(url, params, str(response.url), body, response.links, page, follows_cursor)
+            if following is None or following[2]:
+                # Done, or the API advertised a cursor: drop any speculative pages
+                break
@@ -0,0 +1,119 @@
+import hashlib
+import threading
+import time
+import orjson
+
+# BLAKE3 is SIMD-vectorized and several times faster than SHA-256; it is
+# optional, and keys fall back to the stdlib's BLAKE2b without it
+BLAKE3_AVAILABLE = False
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    pass
+
+def content_digest(payload, length=16):
+    """
+    Hash a JSON-serializable payload into a short key for caching and
+    deduplication. Not for security uses such as signatures.
+
+    Args:
+        payload: Value to hash; dict keys are sorted so equal values hash equally
+        length (int): Digest length in bytes
+
+    Returns:
+        str: Hex digest of 2 * length characters
+    """
+    data = payload if isinstance(payload, bytes) else orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    if BLAKE3_AVAILABLE:
+        return blake3(data).hexdigest(length=length)
+    return hashlib.blake2b(data, digest_size=length).hexdigest()
+
+class TTLCache:
+    """
+    A small thread-safe cache whose entries expire after a fixed time.
+    Concurrent misses on the same key compute the value only once.
+    """
+
+    def __init__(self, ttl, maxsize=256):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl (float): Seconds an entry stays valid
+            maxsize (int): Maximum number of entries kept
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """
+        Get the cached value for a key, computing it on a miss.
+
+        Args:
+            key: Hashable cache key
+            compute (callable): Zero-argument function producing the value
+
+        Returns:
+            any: Cached or freshly computed value
+        """
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have filled the entry while we waited
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            try:
+                value = compute()
+            except Exception:
+                # Nothing was stored, so don't keep a lock for the key either;
+                # otherwise every distinct failing key would stay in _key_locks
+                with self._lock:
+                    if key not in self._data and self._key_locks.get(key) is key_lock:
+                        del self._key_locks[key]
+                raise
+            with self._lock:
+                if key not in self._data and len(self._data) >= self.maxsize:
+                    self._evict_expired()
+                self._data[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    def invalidate(self, key):
+        """
+        Drop a single entry.
+
+        Args:
+            key: Cache key to drop
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self._key_locks.pop(key, None)
+
+    def clear(self):
+        """
+        Drop all entries.
+        """
+        with self._lock:
+            self._data.clear()
+            self._key_locks.clear()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._data.items() if expires <= now]:
+            del self._data[key]
+            self._key_locks.pop(key, None)
+        # Still full of live entries: drop the oldest one
+        if len(self._data) >= self.maxsize:
+            oldest = min(self._data, key=lambda k: self._data[k][0])
+            del self._data[oldest]
+            self._key_locks.pop(oldest, None)
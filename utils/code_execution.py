@@ -1,8 +1,332 @@
 import subprocess
 import tempfile
 import os
+import sys
+import json
+import shutil
 import logging
+import queue
+import selectors
+import signal
+import socket
+import struct
+import threading
 import time
+import contextlib
+from collections import defaultdict
+from utils.cache import content_digest
+
+try:
+    import fcntl
+    import resource
+except ImportError:  # Windows
+    fcntl = None
+    resource = None
+
+# Resource limits for executed code, so one snippet can't exhaust the host.
+# RLIMIT_NPROC counts every process of the user running the app (its own
+# threads included), so it is opt-in via EXEC_MAX_PROCS
+EXEC_MEMORY_LIMIT_MB = int(os.environ.get('EXEC_MEMORY_LIMIT_MB', 512))
+EXEC_MAX_PROCS = int(os.environ.get('EXEC_MAX_PROCS', 0))
+
+def _sandbox_limits(language, cpu_seconds):
+    """
+    Get the rlimits for running code in a language.
+    
+    Args:
+        language (str): Language of the code
+        cpu_seconds (int): CPU time limit
+    
+    Returns:
+        list: (resource name, limit) pairs
+    """
+    limits = [
+        ('RLIMIT_CPU', cpu_seconds),
+        ('RLIMIT_FSIZE', 64 << 20),
+        ('RLIMIT_NOFILE', 256),
+    ]
+    # V8 reserves far more address space than it uses, so node can't run
+    # under an address-space cap
+    if EXEC_MEMORY_LIMIT_MB and language != 'javascript':
+        limits.append(('RLIMIT_AS', EXEC_MEMORY_LIMIT_MB << 20))
+    if EXEC_MAX_PROCS:
+        limits.append(('RLIMIT_NPROC', EXEC_MAX_PROCS))
+    
+    # Children inherit our hard limits and can't raise them
+    clamped = []
+    for name, value in limits:
+        _, hard = resource.getrlimit(getattr(resource, name))
+        clamped.append((name, value if hard == resource.RLIM_INFINITY else min(value, hard)))
+    return clamped
+
+# Limits are set on the child from outside with prlimit (Linux), since
+# preexec_fn can deadlock the child of a multi-threaded server
+PRLIMIT_AVAILABLE = resource is not None and hasattr(resource, 'prlimit')
+
+# The limited child starts as this shell stub. It waits for a line on stdin,
+# sent once the parent has applied the limits, then execs the real command
+# with stdin from /dev/null, so the code never runs unlimited
+_LIMIT_GATE = ['/bin/sh', '-c', 'read _; exec "$@" </dev/null', 'sh']
+
+def _run_limited(args, limits, timeout):
+    """
+    Run a command under rlimits without running Python code in the child.
+    
+    Args:
+        args (list): Command to run
+        limits (list): (resource name, limit) pairs from _sandbox_limits
+        timeout (float): Seconds before the command is killed
+    
+    Returns:
+        subprocess.CompletedProcess: Result with text stdout and stderr
+    """
+    process = subprocess.Popen(
+        _LIMIT_GATE + args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    try:
+        for name, value in limits:
+            resource.prlimit(process.pid, getattr(resource, name), (value, value))
+        stdout, stderr = process.communicate('\n', timeout=timeout)
+    except BaseException:
+        process.kill()
+        process.communicate()
+        raise
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+# Python snippets are run by forking a warm interpreter instead of starting a
+# new one each time. A long-lived "zygote" process waits on a Unix socket;
+# for each snippet it receives the code plus the write ends of the caller's
+# stdout/stderr pipes (via SCM_RIGHTS), forks, and the child runs the code in
+# a fresh __main__ namespace. Every snippet still gets its own process, so no
+# state leaks between runs, but interpreter startup is paid only once.
+_ZYGOTE_SRC = r"""
+import json, linecache, os, resource, signal, socket, struct, sys, threading, traceback
+sock = socket.socket(fileno=int(sys.argv[1]))
+limits = [(getattr(resource, name), value) for name, value in json.loads(sys.argv[2])]
+send_lock = threading.Lock()
+
+def recv_exact(n):
+    data = b''
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+def reap(pid):
+    _, status = os.waitpid(pid, 0)
+    with send_lock:
+        sock.sendall(b'X' + struct.pack('!ii', pid, os.waitstatus_to_exitcode(status)))
+
+def run(code):
+    os.setsid()
+    for kind, value in limits:
+        resource.setrlimit(kind, (value, value))
+    linecache.cache['<snippet>'] = (len(code), None, code.splitlines(True), '<snippet>')
+    sys.argv = ['<snippet>']
+    rc = 0
+    try:
+        exec(compile(code, '<snippet>', 'exec'), {'__name__': '__main__', '__builtins__': __builtins__})
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            rc = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            rc = 1
+    except BaseException as e:
+        # Drop this runner's own frame from the traceback
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        rc = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(rc)
+
+while True:
+    try:
+        header, fds, _, _ = socket.recv_fds(sock, 4, 2)
+        if not header:
+            break
+        code = recv_exact(struct.unpack('!I', header)[0]).decode()
+    except (EOFError, OSError):
+        break
+    pid = os.fork()
+    if pid == 0:
+        sock.close()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for fd in fds + [devnull]:
+            os.close(fd)
+        run(code)
+    for fd in fds:
+        os.close(fd)
+    with send_lock:
+        sock.sendall(b'P' + struct.pack('!i', pid))
+    threading.Thread(target=reap, args=(pid,), daemon=True).start()
+"""
+
+class _PythonZygote:
+    """
+    Parent-side handle on the warm Python fork server.
+    """
+    
+    def __init__(self, command, limits):
+        parent_sock, child_sock = socket.socketpair()
+        self.process = subprocess.Popen(
+            command + ['-c', _ZYGOTE_SRC, str(child_sock.fileno()), json.dumps(limits)],
+            pass_fds=(child_sock.fileno(),),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        child_sock.close()
+        self.sock = parent_sock
+        self.alive = True
+        self._send_lock = threading.Lock()
+        self._started = queue.SimpleQueue()
+        self._exits = {}
+        self._exit_cond = threading.Condition()
+        threading.Thread(target=self._read_replies, name='python-zygote-reader', daemon=True).start()
+    
+    def _read_replies(self):
+        reader = self.sock.makefile('rb')
+        try:
+            while True:
+                kind = reader.read(1)
+                if kind == b'P':
+                    self._started.put(struct.unpack('!i', reader.read(4))[0])
+                elif kind == b'X':
+                    pid, returncode = struct.unpack('!ii', reader.read(8))
+                    with self._exit_cond:
+                        self._exits[pid] = returncode
+                        self._exit_cond.notify_all()
+                else:
+                    break
+        finally:
+            # The server died: fail everything still waiting on it
+            self.alive = False
+            self._started.put(None)
+            with self._exit_cond:
+                self._exit_cond.notify_all()
+    
+    def start(self, code, stdout_fd, stderr_fd):
+        """
+        Fork a child running code with the given output descriptors.
+        
+        Returns:
+            int: Child pid, or None if the server is gone
+        """
+        payload = code.encode()
+        with self._send_lock:
+            if not self.alive:
+                return None
+            socket.send_fds(self.sock, [struct.pack('!I', len(payload))], [stdout_fd, stderr_fd])
+            self.sock.sendall(payload)
+            return self._started.get()
+    
+    def wait(self, pid, timeout):
+        """
+        Wait for a child's exit code.
+        
+        Returns:
+            int: Exit code, or None on timeout or if the server died
+        """
+        deadline = time.monotonic() + timeout
+        with self._exit_cond:
+            while pid not in self._exits and self.alive:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._exit_cond.wait(remaining)
+            return self._exits.pop(pid, None)
+
+_zygote = None
+_zygote_lock = threading.Lock()
+
+# Set EXEC_WARM_PYTHON=0 to start a fresh interpreter per snippet instead
+WARM_PYTHON_ENABLED = (
+    os.environ.get('EXEC_WARM_PYTHON', '1') != '0'
+    and os.name == 'posix'
+    and hasattr(socket, 'send_fds')
+)
+
+def _get_zygote(command):
+    global _zygote
+    with _zygote_lock:
+        if _zygote is None or not _zygote.alive:
+            _zygote = _PythonZygote(command, _sandbox_limits('python', 10))
+        return _zygote
+
+def _read_pipes(stdout_fd, stderr_fd, deadline):
+    """
+    Read two pipes to EOF, giving up at deadline.
+    
+    Returns:
+        tuple: (stdout bytes, stderr bytes, finished before the deadline)
+    """
+    chunks = {stdout_fd: [], stderr_fd: []}
+    with selectors.DefaultSelector() as selector:
+        for fd in chunks:
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in selector.select(remaining):
+                data = os.read(key.fd, 65536)
+                if data:
+                    chunks[key.fd].append(data)
+                else:
+                    selector.unregister(key.fd)
+        finished = not selector.get_map()
+    return b''.join(chunks[stdout_fd]), b''.join(chunks[stderr_fd]), finished
+
+def _run_warm_python(command, code, timeout):
+    """
+    Run a Python snippet in a child forked from the warm interpreter.
+    
+    Returns:
+        subprocess.CompletedProcess: Result, or None if the fork server is unavailable
+    """
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    try:
+        try:
+            zygote = _get_zygote(command)
+            pid = zygote.start(code, out_write, err_write)
+        finally:
+            os.close(out_write)
+            os.close(err_write)
+        if pid is None:
+            return None
+        
+        deadline = time.monotonic() + timeout
+        stdout, stderr, finished = _read_pipes(out_read, err_read, deadline)
+        # Wait on the server that forked the child; the global one may have
+        # been replaced since
+        returncode = zygote.wait(pid, max(deadline - time.monotonic(), 0)) if finished else None
+        if returncode is None:
+            # Kill the snippet and anything it spawned (it leads its own session)
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            raise subprocess.TimeoutExpired(command, timeout)
+        return subprocess.CompletedProcess(command, returncode,
+                                           stdout.decode(errors='replace'), stderr.decode(errors='replace'))
+    finally:
+        os.close(out_read)
+        os.close(err_read)
+
+# Linux caps a single command-line argument at 128 KiB (MAX_ARG_STRLEN);
+# code larger than this is run from a temporary file instead
+INLINE_CODE_LIMIT = 100 * 1024
 
 def execute_code(code, language='python'):
 
@@ -10,18 +334,22 @@ def execute_code(code, language='python'):
         'python': {
             'ext': 'py',
             'command': ['python'],
+            'inline_args': ['-c'],
         },
         'javascript': {
             'ext': 'js',
             'command': ['node'],
+            'inline_args': ['-e'],
         },
         'bash': {
             'ext': 'sh',
             'command': ['bash'],
+            'inline_args': ['-c'],
         },
         'ruby': {
             'ext': 'rb',
             'command': ['ruby'],
+            'inline_args': ['-e'],
         }
     }
     
@@ -29,27 +357,45 @@ def execute_code(code, language='python'):
         raise ValueError(f"Unsupported language: {language}. Supported languages are: {', '.join(supported_languages.keys())}")
     
     try:
-        # Create a temporary file for the code
-        with tempfile.NamedTemporaryFile(suffix=f'.{supported_languages[language]["ext"]}', delete=False) as temp:
-            temp.write(code.encode())
-            temp_name = temp.name
-        
-        # Set execute permissions for the temporary file
-        os.chmod(temp_name, 0o755)
+        config = supported_languages[language]
         
         # Execute the code and measure execution time
         start_time = time.time()
-        result = subprocess.run(
-            supported_languages[language]['command'] + [temp_name],
-            capture_output=True,
-            text=True,
-            timeout=10  # Timeout after 10 seconds
-        )
+        result = None
+        if language == 'python' and WARM_PYTHON_ENABLED:
+            try:
+                result = _run_warm_python(config['command'], code, timeout=10)
+            except OSError as e:
+                logging.warning(f"Warm Python interpreter unavailable, starting a fresh one: {str(e)}")
+        if result is None:
+            # The code is passed as an argument rather than on stdin, where a
+            # shell would read it line by line and let the script's own reads
+            # consume the rest of it; only code too big for one argument
+            # goes through a temporary file
+            temp_name = None
+            if len(code.encode()) <= INLINE_CODE_LIMIT:
+                args = config['command'] + config['inline_args'] + [code]
+            else:
+                with tempfile.NamedTemporaryFile(suffix=f".{config['ext']}", delete=False) as temp:
+                    temp.write(code.encode())
+                    temp_name = temp.name
+                args = config['command'] + [temp_name]
+            try:
+                if PRLIMIT_AVAILABLE:
+                    result = _run_limited(args, _sandbox_limits(language, 10), timeout=10)
+                else:
+                    result = subprocess.run(
+                        args,
+                        stdin=subprocess.DEVNULL,
+                        capture_output=True,
+                        text=True,
+                        timeout=10  # Timeout after 10 seconds
+                    )
+            finally:
+                if temp_name is not None:
+                    os.unlink(temp_name)
         end_time = time.time()
         
-        # Remove the temporary file
-        os.unlink(temp_name)
-        
         # Return the execution results
         return {
             'stdout': result.stdout,
@@ -83,10 +429,139 @@ def get_supported_languages():
     """
     return ['python', 'javascript', 'bash', 'ruby']
 
+# Virtual environments for execute_python_with_dependencies, one per distinct
+# dependency set, kept between calls and evicted oldest-first
+_VENV_ROOT = os.path.join(tempfile.gettempdir(), 'exec_venvs')
+_MAX_VENVS = int(os.environ.get('EXEC_VENV_CACHE_SIZE', 8))
+_venv_locks = defaultdict(threading.Lock)
+_venv_locks_guard = threading.Lock()
+
+def _venv_bin(venv_dir, name):
+    # Determine the executable path based on the platform
+    if os.name == 'nt':  # Windows
+        return os.path.join(venv_dir, 'Scripts', name)
+    return os.path.join(venv_dir, 'bin', name)  # Unix/Linux/Mac
+
+@contextlib.contextmanager
+def _venv_lock(venv_dir, exclusive, blocking=True):
+    """
+    Hold the flock on an environment's lock file. Runs hold it shared for as
+    long as they use the environment; builds and eviction take it exclusive.
+    
+    Args:
+        venv_dir (str): Environment directory
+        exclusive (bool): Take an exclusive rather than a shared lock
+        blocking (bool): Wait for the lock instead of giving up at once
+    
+    Yields:
+        bool: Whether the lock was acquired
+    """
+    path = f"{venv_dir}.lock"
+    while True:
+        lock_file = open(path, 'a')
+        try:
+            if fcntl is not None:
+                flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                try:
+                    fcntl.flock(lock_file, flags if blocking else flags | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                # Eviction unlinks the lock file; if that happened while we
+                # waited, we hold a lock nobody else can see, so start over
+                try:
+                    current = os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino
+                except FileNotFoundError:
+                    current = False
+                if not current:
+                    continue
+            yield True
+            return
+        finally:
+            lock_file.close()
+
+def _evict_venvs(keep):
+    try:
+        venvs = [os.path.join(_VENV_ROOT, name) for name in os.listdir(_VENV_ROOT)]
+    except FileNotFoundError:
+        return
+    venvs = [path for path in venvs if os.path.isdir(path)]
+    venvs.sort(key=os.path.getmtime, reverse=True)
+    for path in venvs[_MAX_VENVS:]:
+        if path == keep:
+            continue
+        # Skip environments that are being built or run from right now
+        with _venv_lock(path, exclusive=True, blocking=False) as acquired:
+            if acquired:
+                shutil.rmtree(path, ignore_errors=True)
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(f"{path}.lock")
+
+@contextlib.contextmanager
+def _use_venv(dependencies):
+    """
+    Use a virtual environment with the given dependencies installed,
+    creating it on first use. The environment can't be evicted while the
+    context is open.
+    
+    Args:
+        dependencies (list): Packages to install
+    
+    Yields:
+        str: Path to the environment's python executable
+    """
+    dependencies = sorted(set(dependencies))
+    key = content_digest(dependencies, length=8)
+    venv_dir = os.path.join(_VENV_ROOT, key)
+    ready_marker = os.path.join(venv_dir, '.ready')
+    
+    while True:
+        _build_venv(key, venv_dir, ready_marker, dependencies)
+        with _venv_lock(venv_dir, exclusive=False):
+            # It may have been evicted between the build and taking the lock
+            if not os.path.exists(ready_marker):
+                continue
+            # Mark as recently used for eviction
+            os.utime(venv_dir)
+            _evict_venvs(keep=venv_dir)
+            yield _venv_bin(venv_dir, 'python')
+            return
+
+def _build_venv(key, venv_dir, ready_marker, dependencies):
+    with _venv_locks_guard:
+        lock = _venv_locks[key]
+    
+    with lock:
+        os.makedirs(_VENV_ROOT, exist_ok=True)
+        # Serialize builds across worker processes too
+        with _venv_lock(venv_dir, exclusive=True):
+            if os.path.exists(ready_marker):
+                return
+            
+            # Leftover from an interrupted build
+            shutil.rmtree(venv_dir, ignore_errors=True)
+            
+            # uv creates the environment and resolves/installs packages far
+            # faster than venv + pip; fall back to those when it's missing
+            uv = shutil.which('uv')
+            if uv:
+                subprocess.run([uv, 'venv', '--quiet', '--python', sys.executable, venv_dir], check=True)
+                if dependencies:
+                    subprocess.run([uv, 'pip', 'install', '--quiet', '--python', _venv_bin(venv_dir, 'python')] + dependencies, check=True)
+            else:
+                subprocess.run([sys.executable, '-m', 'venv', venv_dir], check=True)
+                if dependencies:
+                    subprocess.run([_venv_bin(venv_dir, 'python'), '-m', 'pip', 'install', '--quiet'] + dependencies, check=True)
+            
+            open(ready_marker, 'w').close()
+
 def execute_python_with_dependencies(code, dependencies=None):
     """
     Execute Python code after installing dependencies.
     
+    Environments are cached per dependency set, so only the first call with
+    a given set pays for creating the environment and installing packages.
+    
     Args:
         code (str): The Python code to execute
         dependencies (list): List of dependencies to install before execution
@@ -98,44 +573,25 @@ def execute_python_with_dependencies(code, dependencies=None):
         dependencies = []
     
     try:
-        # Create a virtual environment
-        venv_dir = tempfile.mkdtemp()
-        subprocess.run(['python', '-m', 'venv', venv_dir], check=True)
-        
-        # Determine the pip executable path based on the platform
-        if os.name == 'nt':  # Windows
-            pip_path = os.path.join(venv_dir, 'Scripts', 'pip')
-        else:  # Unix/Linux/Mac
-            pip_path = os.path.join(venv_dir, 'bin', 'pip')
-        
-        # Install dependencies
-        for dependency in dependencies:
-            subprocess.run([pip_path, 'install', dependency], check=True)
-        
-        # Create a temporary file for the code
-        with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as temp:
-            temp.write(code.encode())
-            temp_name = temp.name
-        
-        # Determine the python executable path
-        if os.name == 'nt':  # Windows
-            python_path = os.path.join(venv_dir, 'Scripts', 'python')
-        else:  # Unix/Linux/Mac
-            python_path = os.path.join(venv_dir, 'bin', 'python')
-        
-        # Execute the code and measure execution time
-        start_time = time.time()
-        result = subprocess.run(
-            [python_path, temp_name],
-            capture_output=True,
-            text=True,
-            timeout=30  # Longer timeout for code with dependencies
-        )
-        end_time = time.time()
-        
-        # Remove the temporary file and virtual environment
-        os.unlink(temp_name)
-        shutil.rmtree(venv_dir)
+        with _use_venv(dependencies) as python_path:
+            # Create a temporary file for the code
+            with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as temp:
+                temp.write(code.encode())
+                temp_name = temp.name
+            
+            # Execute the code and measure execution time
+            start_time = time.time()
+            try:
+                result = subprocess.run(
+                    [python_path, temp_name],
+                    capture_output=True,
+                    text=True,
+                    timeout=30  # Longer timeout for code with dependencies
+                )
+            finally:
+                # Remove the temporary file; the environment is kept for reuse
+                os.unlink(temp_name)
+            end_time = time.time()
         
         # Return the execution results
         return {
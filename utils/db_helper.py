@@ -2,7 +2,19 @@ import os
 import logging
 import json
 import time
+import itertools
+import heapq
+import threading
+import mmap
+import orjson
+from collections.abc import Mapping
 from datetime import datetime
+from types import MappingProxyType
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # Optional MongoDB support
 MONGODB_AVAILABLE = False
@@ -16,25 +28,208 @@ except ImportError:
 # Optional PostgreSQL support
 POSTGRES_AVAILABLE = False
 try:
-    import psycopg2
-    import psycopg2.extras
+    import psycopg
+    from psycopg import sql
+    from psycopg.rows import dict_row
+    from psycopg.types.json import Jsonb, set_json_dumps, set_json_loads
+    from psycopg_pool import ConnectionPool
     POSTGRES_AVAILABLE = True
 except ImportError:
-    logging.warning("PostgreSQL support not available. Install psycopg2-binary for PostgreSQL support.")
+    logging.warning("PostgreSQL support not available. Install psycopg[binary,pool] for PostgreSQL support.")
+
+# PostgreSQL connection pool bounds; callers beyond PG_POOL_MAX wait for a
+# connection to be returned
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "2"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "25"))
+
+# Executions of the same SQL on a connection before psycopg prepares it
+# server-side, so repeated queries skip parsing and planning
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "5"))
+
+# Most indexes list_documents creates per MongoDB collection for its sorted
+# queries; MongoDB allows 64 per collection and each one slows writes
+MONGO_AUTO_INDEX_LIMIT = int(os.getenv("MONGO_AUTO_INDEX_LIMIT", "16"))
+
+# Batches of at least this many rows with the same columns are loaded with
+# COPY instead of pipelined INSERTs
+PG_COPY_MIN_ROWS = 1000
+
+# Stands in for absent fields, so a missing key never equals a query value
+_MISSING = object()
+
+# The in-memory database's log is rewritten as a snapshot once it holds this
+# many more records than there are live documents
+MEMORY_DB_COMPACT_SLACK = 10000
+
+# Queries filtering on a field before the in-memory database indexes it;
+# until then the field is checked by scanning, so one-off filters don't
+# leave an index to be maintained on every write
+MEMORY_DB_INDEX_AFTER = int(os.getenv("MEMORY_DB_INDEX_AFTER", "3"))
+
+def _encode_log_value(value):
+    # orjson hands datetimes here (OPT_PASSTHROUGH_DATETIME) so they can be
+    # tagged and restored as datetimes rather than strings
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    if isinstance(value, _Record):
+        return dict(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} can't be persisted")
+
+def _pg_value(value):
+    # dict and list values live in JSONB columns (see _infer_column_type);
+    # psycopg can't bind a dict and would send a list as an array
+    if isinstance(value, (dict, list)):
+        return Jsonb(value)
+    return value
+
+def _configure_pg_connection(conn):
+    # Encode and decode JSONB with orjson instead of the stdlib json module
+    set_json_dumps(orjson.dumps, conn)
+    set_json_loads(orjson.loads, conn)
+
+def _decode_log_value(value):
+    if isinstance(value, dict):
+        if len(value) == 1 and "$date" in value:
+            return datetime.fromisoformat(value["$date"])
+        return {key: _decode_log_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_log_value(item) for item in value]
+    return value
+
+class _Descending:
+    """
+    Sort key wrapper that inverts the ordering of the wrapped value.
+    """
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __eq__(self, other):
+        return self.value == other.value
+    
+    def __lt__(self, other):
+        return other.value < self.value
+
+class _Record(Mapping):
+    """
+    Compact read-only mapping for documents of a registered schema.
+    
+    Values live in __slots__ attributes instead of a per-document hash
+    table; subclasses are made by _record_class. Unset slots are absent keys.
+    """
+    __slots__ = ()
+    _slots = {}  # Field name -> slot attribute name
+    
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._slots[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key) from None
+    
+    def get(self, key, default=None):
+        slot = self._slots.get(key)
+        return default if slot is None else getattr(self, slot, default)
+    
+    def __contains__(self, key):
+        slot = self._slots.get(key)
+        return slot is not None and hasattr(self, slot)
+    
+    def __iter__(self):
+        for field, slot in self._slots.items():
+            if hasattr(self, slot):
+                yield field
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def copy(self):
+        return dict(self)
+    
+    def fits(self, changes):
+        """
+        Check whether every changed field has a slot.
+        
+        Args:
+            changes (dict): Fields about to be set
+        
+        Returns:
+            bool: True if the changes can be applied in place
+        """
+        return all(key in self._slots for key in changes)
+    
+    def set_fields(self, changes):
+        # Only called on records whose schema covers every changed field
+        for key, value in changes.items():
+            setattr(self, self._slots[key], value)
+
+def _record_class(name, fields):
+    """
+    Make a _Record subclass with one slot per field.
+    
+    Args:
+        name (str): Collection name, for the class name
+        fields (iterable): Field names; _id and the timestamps are always included
+    
+    Returns:
+        type: The record class
+    """
+    names = list(dict.fromkeys(['_id', 'created_at', 'updated_at', *fields]))
+    # Field names needn't be identifiers, so slots are numbered
+    slots = {field: f"f{number}" for number, field in enumerate(names)}
+    return type(f"Record_{name}", (_Record,), {'__slots__': tuple(slots.values()), '_slots': slots})
 
 class MemoryDBHelper:
     """
     A simple in-memory database that simulates database operations 
     when neither MongoDB nor PostgreSQL is available.
+    
+    Given a log path, every write is also appended to that file as one
+    orjson line, and the file is replayed on startup, so data survives
+    restarts. The log is periodically compacted into a snapshot.
+    
+    Every public method holds one reentrant lock, so the threads of a
+    gthread worker can share an instance; results are collected into lists
+    before the lock is released.
+    
+    A persisted database belongs to a single process: it holds an exclusive
+    lock on "<path>.lock" for as long as it lives, and a second process
+    opening the same path gets a RuntimeError. (The lock needs fcntl, so it
+    isn't enforced on Windows.)
     """
     
-    def __init__(self):
+    def __init__(self, path=None):
         """
         Initialize the in-memory database.
+        
+        Args:
+            path (str): Append-only log to persist writes to and reload from;
+                defaults to the MEMORY_DB_PATH environment variable, and data
+                is not persisted if neither is set
         """
-        self.collections = {}  # Dictionary to store collections
+        self.collections = {}  # Collection name -> {document ID: document}, in insertion order
         self.id_counter = {}   # Counter for generating IDs for each collection
-        logging.warning("Using in-memory database. Data will be lost when the application is restarted.")
+        self.indexes = {}      # Collection name -> {field: {value: set of document IDs}}
+        self.positions = {}    # Collection name -> {document ID: insertion sequence number}
+        self.schemas = {}      # Collection name -> _Record subclass, see register_schema
+        self.filter_counts = {}  # Collection name -> {field: queries filtering on it}, until indexed
+        self._sequence = itertools.count()
+        self._lock = threading.RLock()
+        
+        self.path = path or os.getenv("MEMORY_DB_PATH")
+        self._log = None
+        self._log_records = 0
+        self._lock_file = None
+        if self.path:
+            self._lock_log()
+            self._replay()
+            # Unbuffered append: each record is a single write() call
+            self._log = open(self.path, 'ab', buffering=0)
+            logging.info("Using in-memory database persisted to %s", self.path)
+        else:
+            logging.warning("Using in-memory database. Data will be lost when the application is restarted.")
     
     def connect(self):
         """
@@ -44,9 +239,15 @@ class MemoryDBHelper:
     
     def close(self):
         """
-        Simulated close method.
+        Flush the log to disk and release it, if persisting.
         """
-        pass
+        with self._lock:
+            if self._log is not None and not self._log.closed:
+                os.fsync(self._log.fileno())
+                self._log.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
     
     def get_collections(self):
         """
@@ -55,7 +256,43 @@ class MemoryDBHelper:
         Returns:
             list: List of collection names
         """
-        return list(self.collections.keys())
+        with self._lock:
+            return list(self.collections.keys())
+    
+    def register_schema(self, collection_name, fields):
+        """
+        Store a collection's documents compactly.
+        
+        Documents whose fields all belong to the schema are kept in a
+        __slots__ record rather than a dict, which takes a fraction of the
+        memory for small documents. Others are stored as dicts as usual, and
+        a record updated with a field outside the schema becomes a dict.
+        Views returned earlier for such a document stop tracking it.
+        
+        Args:
+            collection_name (str): Name of the collection
+            fields (list): Field names; _id, created_at and updated_at are implied
+        """
+        with self._lock:
+            self._ensure_collection(collection_name)
+            record_class = _record_class(collection_name, fields)
+            self.schemas[collection_name] = record_class
+            
+            # Repack documents already stored
+            documents = self.collections[collection_name]
+            for doc_id, document in documents.items():
+                documents[doc_id] = self._pack(record_class, dict(document))
+    
+    @staticmethod
+    def _pack(record_class, document):
+        # Move a document dict into a record, or keep the dict if it doesn't fit
+        slots = record_class._slots
+        if not all(key in slots for key in document):
+            return document
+        record = record_class()
+        for key, value in document.items():
+            setattr(record, slots[key], value)
+        return record
     
     def create_document(self, collection_name, data):
         """
@@ -68,47 +305,80 @@ class MemoryDBHelper:
         Returns:
             str: ID of the created document
         """
-        # Ensure collection exists
+        with self._lock:
+            # Ensure collection exists
+            self._ensure_collection(collection_name)
+            
+            # Clone data to avoid modifying the original
+            document = data.copy()
+            
+            # Generate ID if not provided
+            if '_id' not in document:
+                self.id_counter[collection_name] += 1
+                document['_id'] = str(self.id_counter[collection_name])
+            
+            # Add timestamps, taken once so a new document's two stamps agree
+            now = datetime.now()
+            document.setdefault('created_at', now)
+            document.setdefault('updated_at', now)
+            
+            self._append_log({"op": "put", "c": collection_name, "d": document})
+            self._store(collection_name, document)
+            
+            return document['_id']
+    
+    def _ensure_collection(self, collection_name):
         if collection_name not in self.collections:
-            self.collections[collection_name] = []
+            self.collections[collection_name] = {}
             self.id_counter[collection_name] = 0
+            self.indexes[collection_name] = {}
+            self.filter_counts[collection_name] = {}
+            self.positions[collection_name] = {}
+    
+    def _store(self, collection_name, document):
+        # Store document, replacing any existing one with the same ID
+        doc_id = str(document['_id'])
+        documents = self.collections[collection_name]
+        if doc_id in documents:
+            self._unindex(collection_name, doc_id, documents.pop(doc_id))
+        record_class = self.schemas.get(collection_name)
+        if record_class is not None:
+            document = self._pack(record_class, document)
+        documents[doc_id] = document
+        self.positions[collection_name][doc_id] = next(self._sequence)
+        self._index(collection_name, doc_id, document)
+    
+    def create_documents(self, collection_name, documents):
+        """
+        Create several documents in a collection.
         
-        # Clone data to avoid modifying the original
-        document = data.copy()
-        
-        # Generate ID if not provided
-        if '_id' not in document:
-            self.id_counter[collection_name] += 1
-            document['_id'] = str(self.id_counter[collection_name])
-        
-        # Add timestamps
-        document['created_at'] = document.get('created_at', datetime.now())
-        document['updated_at'] = document.get('updated_at', datetime.now())
-        
-        # Store document
-        self.collections[collection_name].append(document)
+        Args:
+            collection_name (str): Name of the collection
+            documents (list): Document data for each document
         
-        return document['_id']
+        Returns:
+            list: IDs of the created documents, in input order
+        """
+        with self._lock:
+            return [self.create_document(collection_name, data) for data in documents]
     
-    def get_document_by_id(self, collection_name, document_id):
+    def get_document_by_id(self, collection_name, document_id, copy=False):
         """
         Get a document by its ID.
         
         Args:
             collection_name (str): Name of the collection
             document_id (str): ID of the document
+            copy (bool): Return a mutable copy instead of a read-only view
         
         Returns:
-            dict: Document data or None if not found
+            Mapping: Read-only view of the stored document (or a dict copy), or None if not found
         """
-        if collection_name not in self.collections:
-            return None
-        
-        for document in self.collections[collection_name]:
-            if str(document.get('_id')) == str(document_id):
-                return document.copy()
-        
-        return None
+        with self._lock:
+            document = self.collections.get(collection_name, {}).get(str(document_id))
+            if document is None:
+                return None
+            return document.copy() if copy else MappingProxyType(document)
     
     def update_document(self, collection_name, document_id, data):
         """
@@ -122,21 +392,31 @@ class MemoryDBHelper:
         Returns:
             int: Number of modified documents (0 or 1)
         """
-        if collection_name not in self.collections:
-            return 0
-        
-        for i, document in enumerate(self.collections[collection_name]):
-            if str(document.get('_id')) == str(document_id):
-                # Update document with new data
-                for key, value in data.items():
-                    document[key] = value
-                
-                # Update timestamp
-                document['updated_at'] = datetime.now()
-                
-                return 1
-        
-        return 0
+        doc_id = str(document_id)
+        with self._lock:
+            document = self.collections.get(collection_name, {}).get(doc_id)
+            if document is None:
+                return 0
+            
+            # Update timestamp along with the new data
+            changes = dict(data, updated_at=datetime.now())
+            self._append_log({"op": "set", "c": collection_name, "id": doc_id, "d": changes})
+            self._apply_changes(collection_name, doc_id, document, changes)
+            
+            return 1
+    
+    def _apply_changes(self, collection_name, doc_id, document, changes):
+        # Update document with new data, keeping the indexes in step
+        self._unindex(collection_name, doc_id, document)
+        if not isinstance(document, _Record):
+            document.update(changes)
+        elif document.fits(changes):
+            document.set_fields(changes)
+        else:
+            # A field outside the schema: fall back to a dict
+            document = {**document, **changes}
+            self.collections[collection_name][doc_id] = document
+        self._index(collection_name, doc_id, document)
     
     def delete_document(self, collection_name, document_id):
         """
@@ -149,48 +429,103 @@ class MemoryDBHelper:
         Returns:
             int: Number of deleted documents (0 or 1)
         """
-        if collection_name not in self.collections:
-            return 0
-        
-        original_len = len(self.collections[collection_name])
-        self.collections[collection_name] = [doc for doc in self.collections[collection_name] 
-                                          if str(doc.get('_id')) != str(document_id)]
-        
-        return original_len - len(self.collections[collection_name])
+        doc_id = str(document_id)
+        with self._lock:
+            if doc_id not in self.collections.get(collection_name, {}):
+                return 0
+            
+            self._append_log({"op": "del", "c": collection_name, "id": doc_id})
+            self._remove(collection_name, doc_id)
+            return 1
+    
+    def _remove(self, collection_name, doc_id):
+        document = self.collections[collection_name].pop(doc_id)
+        self._unindex(collection_name, doc_id, document)
+        del self.positions[collection_name][doc_id]
     
-    def list_documents(self, collection_name, query=None, limit=100, skip=0, sort=None):
+    def list_documents(self, collection_name, query=None, limit=100, skip=0, sort=None, copy=False):
         """
         List documents in a collection.
         
+        Documents are returned as read-only views of the stored data, so
+        listing allocates no per-document copies; the views reflect later
+        updates. Pass copy=True to get mutable dict copies instead.
+        
         Args:
             collection_name (str): Name of the collection
             query (dict): Query filter
             limit (int): Maximum number of documents to return
             skip (int): Number of documents to skip
             sort (list): List of (key, direction) pairs for sort order
+            copy (bool): Return mutable copies instead of read-only views
         
         Returns:
             list: List of documents
         """
+        with self._lock:
+            results = self._page(collection_name, query, limit, skip, sort)
+            
+            # Return read-only views (or copies) so callers can't modify stored data
+            if copy:
+                return [doc.copy() for doc in results]
+            return [MappingProxyType(doc) for doc in results]
+    
+    def iter_documents(self, collection_name, query=None, limit=None, skip=0, sort=None):
+        """
+        Iterate over documents in a collection without building a list.
+        
+        Args:
+            collection_name (str): Name of the collection
+            query (dict): Query filter
+            limit (int): Maximum number of documents to yield, or None for all
+            skip (int): Number of documents to skip
+            sort (list): List of (key, direction) pairs for sort order
+        
+        Yields:
+            Mapping: Read-only view of each document
+        """
+        # Collect the matches before yielding any, so the caller may update
+        # or delete documents as it goes, as with the other backends, and so
+        # the lock isn't held while the caller runs
+        with self._lock:
+            documents = list(self._page(collection_name, query, limit, skip, sort))
+        for document in documents:
+            yield MappingProxyType(document)
+    
+    def _page(self, collection_name, query, limit, skip, sort):
+        """
+        Get one page of the documents matching a query.
+        
+        Args:
+            collection_name (str): Name of the collection
+            query (dict): Query filter
+            limit (int): Maximum number of documents, or None for all
+            skip (int): Number of documents to skip
+            sort (list): List of (key, direction) pairs for sort order
+        
+        Returns:
+            iterable: Stored documents (not copies)
+        """
         if collection_name not in self.collections:
             return []
         
         # Filter documents based on query
-        results = self.collections[collection_name]
-        if query:
-            results = [doc for doc in results if self._matches_query(doc, query)]
+        results = self._find(collection_name, query)
+        wanted = skip + limit if limit is not None else None
         
-        # Sort if specified
         if sort:
-            for key, direction in reversed(sort):
-                results = sorted(results, key=lambda doc: doc.get(key, None),
-                               reverse=(direction < 0))
-        
-        # Apply skip and limit
-        results = results[skip:skip + limit]
+            # Sort in a single pass over a composite key, then apply skip and limit
+            key, reverse = self._sort_key(sort)
+            results = list(results)
+            if wanted is not None and wanted * 8 < len(results):
+                # A small page of a large result: select it with a bounded heap,
+                # O(N log k) instead of sorting all N (same stable order as sorted)
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                return select(wanted, results, key=key)[skip:]
+            return sorted(results, key=key, reverse=reverse)[skip:wanted]
         
-        # Return copies to avoid modifying stored data
-        return [doc.copy() for doc in results]
+        # Unsorted: stop filtering once skip + limit matches are found
+        return itertools.islice(results, skip, wanted)
     
     def count_documents(self, collection_name, query=None):
         """
@@ -203,30 +538,302 @@ class MemoryDBHelper:
         Returns:
             int: Number of documents
         """
-        if collection_name not in self.collections:
-            return 0
+        with self._lock:
+            if collection_name not in self.collections:
+                return 0
+            
+            if not query:
+                return len(self.collections[collection_name])
+            
+            candidates, remaining = self._candidates(collection_name, query)
+            if candidates is not None and not remaining:
+                # Answered by the indexes alone
+                return len(candidates)
+            return sum(1 for _ in self._find(collection_name, query))
+    
+    def _find(self, collection_name, query):
+        """
+        Iterate over the documents in a collection matching a query, in
+        insertion order. Matches are produced lazily, so callers that stop
+        early don't filter the rest of the collection.
         
-        if query:
-            return len([doc for doc in self.collections[collection_name] 
-                      if self._matches_query(doc, query)])
+        Args:
+            collection_name (str): Name of the collection
+            query (dict): Query conditions
+        
+        Returns:
+            iterator: Matching documents (not copies)
+        """
+        documents = self.collections[collection_name]
+        if not query:
+            return iter(documents.values())
+        
+        candidates, remaining = self._candidates(collection_name, query)
+        if candidates is None:
+            results = documents.values()
         else:
-            return len(self.collections[collection_name])
+            positions = self.positions[collection_name]
+            results = (documents[doc_id] for doc_id in sorted(candidates, key=positions.__getitem__))
+        
+        if remaining:
+            return filter(self._compile_query(remaining), results)
+        return iter(results)
     
-    def _matches_query(self, document, query):
+    def _candidates(self, collection_name, query):
         """
-        Check if a document matches a query.
+        Narrow a query down using the per-field hash indexes.
+        
+        Equality conditions are answered from indexes, each built once
+        MEMORY_DB_INDEX_AFTER queries have filtered on that field and
+        maintained on every write after that. Conditions on fields not indexed
+        yet, or on unhashable values, are left for checking each candidate
+        document.
         
         Args:
-            document (dict): Document to check
+            collection_name (str): Name of the collection
             query (dict): Query conditions
         
         Returns:
-            bool: True if the document matches the query
+            tuple: (set of candidate IDs, or None if no condition was indexed,
+                dict of conditions still to check)
         """
+        candidates = None
+        remaining = {}
         for key, value in query.items():
-            if key not in document or document[key] != value:
-                return False
-        return True
+            try:
+                hash(value)
+            except TypeError:
+                remaining[key] = value
+                continue
+            index = self._field_index(collection_name, key)
+            if index is None:
+                remaining[key] = value
+                continue
+            matches = index.get(value, set())
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return set(), {}
+        return candidates, remaining
+    
+    def _field_index(self, collection_name, field):
+        """
+        Get the hash index for a field, building it once the field has been
+        filtered on often enough.
+        
+        Args:
+            collection_name (str): Name of the collection
+            field (str): Document field
+        
+        Returns:
+            dict: Field value -> set of IDs of documents with that value, or
+                None if the field isn't indexed yet
+        """
+        indexes = self.indexes[collection_name]
+        index = indexes.get(field)
+        if index is None:
+            counts = self.filter_counts[collection_name]
+            counts[field] = counts.get(field, 0) + 1
+            if counts[field] < MEMORY_DB_INDEX_AFTER:
+                return None
+            del counts[field]
+            index = {}
+            for doc_id, document in self.collections[collection_name].items():
+                if field in document:
+                    try:
+                        index.setdefault(document[field], set()).add(doc_id)
+                    except TypeError:
+                        pass  # Unhashable values only match via _compile_query
+            indexes[field] = index
+        return index
+    
+    def _index(self, collection_name, doc_id, document):
+        # Add a document to every index built for its collection
+        for field, index in self.indexes[collection_name].items():
+            if field in document:
+                try:
+                    index.setdefault(document[field], set()).add(doc_id)
+                except TypeError:
+                    pass
+    
+    def _unindex(self, collection_name, doc_id, document):
+        # Remove a document from every index built for its collection
+        for field, index in self.indexes[collection_name].items():
+            if field in document:
+                try:
+                    ids = index.get(document[field])
+                except TypeError:
+                    continue
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del index[document[field]]
+    
+    def _append_log(self, record):
+        """
+        Append a write to the log, if persisting, before it is applied.
+        
+        Args:
+            record (dict): Write record, with "op", "c" (collection) and op-specific fields
+        """
+        if self._log is None:
+            return
+        
+        # Compact first: the snapshot must hold every write applied so far
+        # and none that hasn't been
+        live = sum(len(documents) for documents in self.collections.values())
+        if self._log_records > live + MEMORY_DB_COMPACT_SLACK:
+            self._compact()
+        
+        self._log.write(orjson.dumps(
+            record,
+            default=_encode_log_value,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        ))
+        self._log_records += 1
+    
+    def _lock_log(self):
+        """
+        Take the exclusive lock on the log for this process's lifetime.
+        
+        Each process keeps its own copy of the data and its own ID counters,
+        and compaction replaces the log file under any other writer, so two
+        processes sharing a log would silently lose each other's writes.
+        The lock is on a separate file because compaction replaces the log.
+        """
+        if fcntl is None:
+            return
+        lock_file = open(f"{self.path}.lock", 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(
+                f"In-memory database log {self.path} is in use by another process; "
+                "run a single worker or configure PostgreSQL or MongoDB"
+            ) from None
+        self._lock_file = lock_file
+    
+    def _replay(self):
+        """
+        Load the documents recorded in the log file.
+        """
+        try:
+            with open(self.path, 'rb') as log_file:
+                size = os.fstat(log_file.fileno()).st_size
+                if size == 0:
+                    return
+                with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as log_map:
+                    valid_end = 0
+                    for line in iter(log_map.readline, b''):
+                        try:
+                            record = _decode_log_value(orjson.loads(line))
+                        except orjson.JSONDecodeError:
+                            # A write cut short by a crash; everything before it is intact
+                            break
+                        self._apply_record(record)
+                        self._log_records += 1
+                        valid_end = log_map.tell()
+        except FileNotFoundError:
+            return
+        
+        if valid_end < size:
+            # Drop the torn tail so new records don't get appended onto it
+            logging.warning("Discarding truncated record at the end of %s", self.path)
+            os.truncate(self.path, valid_end)
+        
+        # Continue generated IDs after the highest one in use
+        for collection_name, documents in self.collections.items():
+            numeric = [int(doc_id) for doc_id in documents if doc_id.isdigit()]
+            self.id_counter[collection_name] = max(numeric, default=0)
+    
+    def _apply_record(self, record):
+        collection_name = record["c"]
+        self._ensure_collection(collection_name)
+        documents = self.collections[collection_name]
+        if record["op"] == "put":
+            self._store(collection_name, record["d"])
+        elif record["op"] == "set" and record["id"] in documents:
+            self._apply_changes(collection_name, record["id"], documents[record["id"]], record["d"])
+        elif record["op"] == "del" and record["id"] in documents:
+            self._remove(collection_name, record["id"])
+    
+    def _compact(self):
+        """
+        Rewrite the log as one record per live document.
+        """
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'wb') as snapshot:
+            for collection_name, documents in self.collections.items():
+                for document in documents.values():
+                    snapshot.write(orjson.dumps(
+                        {"op": "put", "c": collection_name, "d": document},
+                        default=_encode_log_value,
+                        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+                    ))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temp_path, self.path)
+        
+        self._log.close()
+        self._log = open(self.path, 'ab', buffering=0)
+        self._log_records = sum(len(documents) for documents in self.collections.values())
+    
+    def _sort_key(self, sort):
+        """
+        Build a key function ordering documents by several fields at once.
+        
+        Missing and None values sort before all others, as in MongoDB, so
+        they never get compared against values of another type.
+        
+        Args:
+            sort (list): List of (key, direction) pairs for sort order
+        
+        Returns:
+            tuple: (key function, reverse flag) for list.sort()
+        """
+        fields = [field for field, _ in sort]
+        directions = {direction < 0 for _, direction in sort}
+        
+        if len(directions) == 1:
+            # One direction for every field: sort by a plain tuple, reversed if descending
+            def key(doc):
+                return tuple((doc.get(field) is not None, doc.get(field)) for field in fields)
+            return key, directions.pop()
+        
+        descending = [direction < 0 for _, direction in sort]
+        def key(doc):
+            parts = []
+            for field, desc in zip(fields, descending):
+                value = doc.get(field)
+                part = (value is not None, value)
+                parts.append(_Descending(part) if desc else part)
+            return tuple(parts)
+        return key, False
+    
+    def _compile_query(self, query):
+        """
+        Compile a query into a predicate testing one document.
+        
+        The conditions are captured once as a tuple, so testing each document
+        does no per-call dict iteration.
+        
+        Args:
+            query (dict): Query conditions
+        
+        Returns:
+            callable: Function taking a document and returning True if it matches the query
+        """
+        conditions = tuple(query.items())
+        if len(conditions) == 1:
+            ((key, value),) = conditions
+            return lambda document: document.get(key, _MISSING) == value
+        
+        def matches(document):
+            for key, value in conditions:
+                if document.get(key, _MISSING) != value:
+                    return False
+            return True
+        return matches
 
 # PostgreSQL implementation if available
 if POSTGRES_AVAILABLE:
@@ -246,32 +853,48 @@ if POSTGRES_AVAILABLE:
             if not self.conn_string:
                 raise ValueError("PostgreSQL connection string not provided and DATABASE_URL environment variable not set")
             
-            self.conn = None
+            self.pool = None
+            self._pool_lock = threading.Lock()
+            self._known_tables = set()  # Tables known to exist, so inserts skip the existence check
+            self._statements = {}       # (kind, table, columns, order) -> SQL text
+            self.connect()
         
         def connect(self):
             """
-            Connect to the PostgreSQL database.
+            Open the connection pool if it isn't open already.
             
             Returns:
-                psycopg2.extensions.connection: Connection object
+                psycopg_pool.ConnectionPool: Connection pool
             """
             try:
-                if self.conn is None or self.conn.closed:
-                    self.conn = psycopg2.connect(self.conn_string)
-                    self.conn.autocommit = False
+                pool = self.pool
+                if pool is not None and not pool.closed:
+                    return pool
+                with self._pool_lock:
+                    if self.pool is not None and not self.pool.closed:
+                        return self.pool
+                    self.pool = ConnectionPool(
+                        self.conn_string,
+                        min_size=PG_POOL_MIN,
+                        max_size=PG_POOL_MAX,
+                        kwargs={"prepare_threshold": DB_PREPARE_THRESHOLD},
+                        configure=_configure_pg_connection,
+                        open=True
+                    )
                     logging.info("Connected to PostgreSQL database")
-                return self.conn
+                    self.get_collections()
+                return self.pool
             except Exception as e:
-                logging.error(f"Error connecting to PostgreSQL: {str(e)}")
+                logging.error("Error connecting to PostgreSQL: %s", e)
                 raise
         
         def close(self):
             """
-            Close the PostgreSQL connection.
+            Close all pooled PostgreSQL connections.
             """
-            if self.conn and not self.conn.closed:
-                self.conn.close()
-                self.conn = None
+            if self.pool and not self.pool.closed:
+                self.pool.close()
+                self.pool = None
                 logging.info("PostgreSQL connection closed")
         
         def execute_query(self, query, params=None, fetchall=True):
@@ -286,24 +909,23 @@ if POSTGRES_AVAILABLE:
             Returns:
                 list or dict: Query results
             """
-            conn = self.connect()
             try:
-                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                # The pooled connection commits when the block exits normally
+                # and rolls back if it raises
+                with self.connect().connection() as conn, conn.cursor(row_factory=dict_row) as cursor:
                     cursor.execute(query, params)
                     
-                    if query.strip().upper().startswith(("SELECT", "SHOW", "WITH")):
+                    # Anything that produced rows (including INSERT ... RETURNING) is fetched
+                    if cursor.description is not None:
                         if fetchall:
                             return cursor.fetchall()
                         else:
                             return cursor.fetchone()
-                    else:
-                        conn.commit()
-                        if cursor.rowcount >= 0:
-                            return cursor.rowcount
-                        return None
+                    if cursor.rowcount >= 0:
+                        return cursor.rowcount
+                    return None
             except Exception as e:
-                conn.rollback()
-                logging.error(f"Error executing query: {str(e)}")
+                logging.error("Error executing query: %s", e)
                 raise
         
         def get_collections(self):
@@ -319,8 +941,9 @@ if POSTGRES_AVAILABLE:
             WHERE table_schema = 'public' 
             ORDER BY table_name;
             """
-            tables = self.execute_query(query)
-            return [table['table_name'] for table in tables]
+            tables = [table['table_name'] for table in self.execute_query(query)]
+            self._known_tables.update(tables)
+            return tables
         
         def create_document(self, collection_name, data):
             """
@@ -333,24 +956,115 @@ if POSTGRES_AVAILABLE:
             Returns:
                 str: ID of the created record
             """
-            # Check if table exists, create if not
-            self._ensure_table_exists(collection_name, data)
-            
             # Add timestamp if not present
             if 'created_at' not in data:
                 data['created_at'] = datetime.now()
             
-            columns = ', '.join(data.keys())
-            placeholders = ', '.join([f'%({key})s' for key in data.keys()])
+            columns = tuple(sorted(data))
+            query = self._statement('insert', collection_name, columns)
+            params = [_pg_value(data[key]) for key in columns]
             
-            query = f"""
-            INSERT INTO {collection_name} ({columns}) 
-            VALUES ({placeholders}) 
-            RETURNING id;
+            # Check if table exists, create if not
+            result = self._insert(collection_name, data, lambda: self.execute_query(query, params, fetchall=False))
+            return str(result['id'])
+        
+        def create_documents(self, collection_name, documents):
             """
+            Insert several records into a table in one transaction.
             
-            result = self.execute_query(query, data, fetchall=False)
-            return str(result['id'])
+            Records are grouped by their set of columns. Each group is sent as
+            pipelined INSERTs, so the batch costs about one round trip per group
+            rather than one per record; groups of PG_COPY_MIN_ROWS or more are
+            loaded with COPY, using IDs reserved from the table's sequence.
+            
+            Args:
+                collection_name (str): Table name
+                documents (list): Record data for each record
+            
+            Returns:
+                list: IDs of the created records, in input order
+            """
+            if not documents:
+                return []
+            
+            # Add timestamp if not present, and group records by column set
+            now = datetime.now()
+            groups = {}
+            for position, data in enumerate(documents):
+                if 'created_at' not in data:
+                    data['created_at'] = now
+                groups.setdefault(tuple(sorted(data)), []).append(position)
+            
+            # Check if table exists, create if not
+            return self._insert(collection_name, documents[0],
+                                lambda: self._insert_groups(collection_name, documents, groups))
+        
+        def _insert_groups(self, collection_name, documents, groups):
+            """
+            Insert grouped records in one transaction.
+            
+            Args:
+                collection_name (str): Table name
+                documents (list): Record data for each record
+                groups (dict): Sorted column names -> positions in documents of the records with those columns
+            
+            Returns:
+                list: IDs of the created records, in input order
+            """
+            ids = [None] * len(documents)
+            try:
+                with self.connect().connection() as conn, conn.cursor() as cursor:
+                    for columns, positions in groups.items():
+                        rows = [[_pg_value(documents[position][key]) for key in columns] for position in positions]
+                        
+                        group_ids = None
+                        if len(rows) >= PG_COPY_MIN_ROWS and 'id' not in columns:
+                            group_ids = self._copy_rows(cursor, collection_name, columns, rows)
+                        
+                        if group_ids is None:
+                            # executemany pipelines the INSERTs; each returns one result set
+                            cursor.executemany(self._statement('insert', collection_name, columns), rows, returning=True)
+                            group_ids = []
+                            while True:
+                                group_ids.append(cursor.fetchone()[0])
+                                if not cursor.nextset():
+                                    break
+                        
+                        for position, record_id in zip(positions, group_ids):
+                            ids[position] = str(record_id)
+            except Exception as e:
+                logging.error("Error creating records in %s: %s", collection_name, e)
+                raise
+            
+            return ids
+        
+        def _copy_rows(self, cursor, table_name, columns, rows):
+            """
+            Load rows into a table with COPY.
+            
+            Args:
+                cursor (psycopg.Cursor): Cursor on the batch's connection
+                table_name (str): Table name
+                columns (tuple): Column names, the same for every row
+                rows (list): Values of each row, in column order
+            
+            Returns:
+                list: IDs of the loaded rows, or None if the table's id column
+                    has no sequence to reserve them from
+            """
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id');", (sql.Identifier(table_name).as_string(),))
+            sequence = cursor.fetchone()[0]
+            if sequence is None:
+                return None
+            
+            # COPY returns nothing, so reserve the IDs up front
+            cursor.execute("SELECT nextval(%s) FROM generate_series(1, %s);", (sequence, len(rows)))
+            row_ids = [row[0] for row in cursor.fetchall()]
+            
+            with cursor.copy(self._statement('copy', table_name, columns)) as copy:
+                for row_id, values in zip(row_ids, rows):
+                    copy.write_row((row_id, *values))
+            return row_ids
         
         def get_document_by_id(self, collection_name, document_id):
             """
@@ -363,7 +1077,7 @@ if POSTGRES_AVAILABLE:
             Returns:
                 dict: Record data
             """
-            query = f"SELECT * FROM {collection_name} WHERE id = %s;"
+            query = self._statement('get', collection_name)
             return self.execute_query(query, (document_id,), fetchall=False)
         
         def update_document(self, collection_name, document_id, data):
@@ -381,16 +1095,11 @@ if POSTGRES_AVAILABLE:
             # Add updated_at timestamp
             data['updated_at'] = datetime.now()
             
-            set_clause = ', '.join([f"{key} = %({key})s" for key in data.keys()])
-            data['id'] = document_id
-            
-            query = f"""
-            UPDATE {collection_name} 
-            SET {set_clause} 
-            WHERE id = %(id)s;
-            """
+            columns = tuple(sorted(data))
+            query = self._statement('update', collection_name, columns)
+            params = [_pg_value(data[key]) for key in columns] + [document_id]
             
-            return self.execute_query(query, data)
+            return self.execute_query(query, params)
         
         def delete_document(self, collection_name, document_id):
             """
@@ -403,7 +1112,7 @@ if POSTGRES_AVAILABLE:
             Returns:
                 int: Number of deleted records
             """
-            query = f"DELETE FROM {collection_name} WHERE id = %s;"
+            query = self._statement('delete', collection_name)
             return self.execute_query(query, (document_id,))
         
         def list_documents(self, collection_name, query=None, limit=100, skip=0, sort=None):
@@ -420,39 +1129,48 @@ if POSTGRES_AVAILABLE:
             Returns:
                 list: List of records
             """
-            # Build WHERE clause from query dict
-            where_clause = ""
-            params = {}
+            columns = tuple(sorted(query)) if query else ()
+            order = tuple((key, direction > 0) for key, direction in sort) if sort else ()
+            query_str = self._statement('list', collection_name, columns, order)
+            params = [_pg_value(query[key]) for key in columns] + [limit, skip]
             
-            if query:
-                conditions = []
-                for key, value in query.items():
-                    conditions.append(f"{key} = %({key})s")
-                    params[key] = value
-                
-                if conditions:
-                    where_clause = "WHERE " + " AND ".join(conditions)
+            return self.execute_query(query_str, params)
+        
+        def iter_documents(self, collection_name, query=None, limit=None, skip=0, sort=None, batch_size=1000):
+            """
+            Iterate over records in a table through a server-side cursor.
             
-            # Build ORDER BY clause
-            order_clause = ""
-            if sort:
-                sort_items = []
-                for key, direction in sort:
-                    dir_str = "ASC" if direction > 0 else "DESC"
-                    sort_items.append(f"{key} {dir_str}")
-                
-                if sort_items:
-                    order_clause = "ORDER BY " + ", ".join(sort_items)
+            Rows are fetched from the server batch_size at a time, so memory
+            stays bounded however many records match, and stopping early
+            doesn't transfer the rest. The pooled connection is held until
+            iteration finishes or the generator is closed.
             
-            # Build complete query
-            query_str = f"""
-            SELECT * FROM {collection_name} 
-            {where_clause} 
-            {order_clause} 
-            LIMIT {limit} OFFSET {skip};
+            Args:
+                collection_name (str): Table name
+                query (dict): Query conditions
+                limit (int): Maximum number of records to yield, or None for all
+                skip (int): Number of records to skip
+                sort (list): List of (column, direction) pairs for sort order
+                batch_size (int): Rows fetched per round trip
+            
+            Yields:
+                dict: Each record
             """
+            columns = tuple(sorted(query)) if query else ()
+            order = tuple((key, direction > 0) for key, direction in sort) if sort else ()
+            query_str = self._statement('list', collection_name, columns, order)
+            # LIMIT NULL means no limit
+            params = [_pg_value(query[key]) for key in columns] + [limit, skip]
             
-            return self.execute_query(query_str, params)
+            try:
+                with self.connect().connection() as conn, \
+                        conn.cursor(name="iter_documents", row_factory=dict_row) as cursor:
+                    cursor.itersize = batch_size
+                    cursor.execute(query_str, params)
+                    yield from cursor
+            except Exception as e:
+                logging.error("Error iterating over records in %s: %s", collection_name, e)
+                raise
         
         def count_documents(self, collection_name, query=None):
             """
@@ -465,26 +1183,94 @@ if POSTGRES_AVAILABLE:
             Returns:
                 int: Number of records
             """
-            # Build WHERE clause from query dict
-            where_clause = ""
-            params = {}
+            columns = tuple(sorted(query)) if query else ()
+            query_str = self._statement('count', collection_name, columns)
+            params = [_pg_value(query[key]) for key in columns]
             
-            if query:
-                conditions = []
-                for key, value in query.items():
-                    conditions.append(f"{key} = %({key})s")
-                    params[key] = value
-                
-                if conditions:
-                    where_clause = "WHERE " + " AND ".join(conditions)
+            result = self.execute_query(query_str, params, fetchall=False)
+            return result['count']
+        
+        def _statement(self, kind, table_name, columns=(), order=()):
+            """
+            Get the SQL text for a statement, building it on first use.
+            
+            Table and column names are quoted as identifiers, so they can't
+            inject SQL, and values are always bound as parameters. The text is
+            cached per (kind, table, columns, order), so repeated calls skip the
+            string building and send identical SQL that psycopg can prepare.
+            
+            Args:
+                kind (str): One of 'insert', 'copy', 'get', 'update', 'delete', 'list' or 'count'
+                table_name (str): Table name
+                columns (tuple): Columns inserted, updated or matched by equality, in parameter order
+                order (tuple): (column, ascending) pairs for 'list'
             
-            query_str = f"""
-            SELECT COUNT(*) as count FROM {collection_name} 
-            {where_clause};
+            Returns:
+                str: SQL text with positional %s placeholders
             """
+            key = (kind, table_name, columns, order)
+            statement = self._statements.get(key)
+            if statement is not None:
+                return statement
             
-            result = self.execute_query(query_str, params, fetchall=False)
-            return result['count']
+            table = sql.Identifier(table_name)
+            names = sql.SQL(', ').join(map(sql.Identifier, columns))
+            equals = [sql.SQL("{} = %s").format(sql.Identifier(column)) for column in columns]
+            where = sql.SQL("WHERE {}").format(sql.SQL(" AND ").join(equals)) if equals else sql.SQL("")
+            
+            if kind == 'insert':
+                placeholders = sql.SQL(', ').join([sql.Placeholder()] * len(columns))
+                composed = sql.SQL("INSERT INTO {} ({}) VALUES ({}) RETURNING id;").format(table, names, placeholders)
+            elif kind == 'copy':
+                composed = sql.SQL("COPY {} (id, {}) FROM STDIN").format(table, names)
+            elif kind == 'get':
+                composed = sql.SQL("SELECT * FROM {} WHERE id = %s;").format(table)
+            elif kind == 'update':
+                composed = sql.SQL("UPDATE {} SET {} WHERE id = %s;").format(table, sql.SQL(', ').join(equals))
+            elif kind == 'delete':
+                composed = sql.SQL("DELETE FROM {} WHERE id = %s;").format(table)
+            elif kind == 'list':
+                order_clause = sql.SQL("")
+                if order:
+                    order_clause = sql.SQL("ORDER BY {}").format(sql.SQL(', ').join(
+                        sql.SQL("{} ASC" if ascending else "{} DESC").format(sql.Identifier(column))
+                        for column, ascending in order
+                    ))
+                composed = sql.SQL("SELECT * FROM {} {} {} LIMIT %s OFFSET %s;").format(table, where, order_clause)
+            elif kind == 'count':
+                composed = sql.SQL("SELECT COUNT(*) as count FROM {} {};").format(table, where)
+            else:
+                raise ValueError(f"Unknown statement kind: {kind}")
+            
+            # Query filters come from callers, so keep the cache bounded
+            if len(self._statements) >= 1024:
+                self._statements.clear()
+            statement = composed.as_string()
+            self._statements[key] = statement
+            return statement
+        
+        def _insert(self, table_name, sample_data, insert):
+            """
+            Run an insert into a table, creating the table first if needed.
+            
+            A table dropped after it was cached as existing is recreated and
+            the insert retried once.
+            
+            Args:
+                table_name (str): Table name
+                sample_data (dict): Sample data to infer schema
+                insert (callable): Zero-argument function performing the insert
+            
+            Returns:
+                any: Result of insert()
+            """
+            self._ensure_table_exists(table_name, sample_data)
+            try:
+                return insert()
+            except psycopg.errors.UndefinedTable:
+                self._known_tables.discard(table_name)
+                self._ensure_table_exists(table_name, sample_data)
+                return insert()
         
         def _ensure_table_exists(self, table_name, sample_data):
             """
@@ -494,6 +1280,9 @@ if POSTGRES_AVAILABLE:
                 table_name (str): Table name
                 sample_data (dict): Sample data to infer schema
             """
+            if table_name in self._known_tables:
+                return
+            
             # Check if table exists
             check_query = """
             SELECT EXISTS (
@@ -505,30 +1294,32 @@ if POSTGRES_AVAILABLE:
             
             result = self.execute_query(check_query, (table_name,), fetchall=False)
             if result and result['exists']:
+                self._known_tables.add(table_name)
                 return
             
             # Create table based on sample data
             columns = []
             for key, value in sample_data.items():
                 col_type = self._infer_column_type(value)
-                columns.append(f"{key} {col_type}")
+                columns.append(sql.SQL("{} {}").format(sql.Identifier(key), sql.SQL(col_type)))
             
             # Ensure id, created_at, updated_at columns
             if 'id' not in sample_data:
-                columns.insert(0, "id SERIAL PRIMARY KEY")
+                columns.insert(0, sql.SQL("id SERIAL PRIMARY KEY"))
             if 'created_at' not in sample_data:
-                columns.append("created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+                columns.append(sql.SQL("created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"))
             if 'updated_at' not in sample_data:
-                columns.append("updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+                columns.append(sql.SQL("updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP"))
             
-            create_query = f"""
-            CREATE TABLE {table_name} (
-                {', '.join(columns)}
-            );
-            """
+            # IF NOT EXISTS: another worker may have created it since the check
+            create_query = sql.SQL("CREATE TABLE IF NOT EXISTS {} ({});").format(
+                sql.Identifier(table_name),
+                sql.SQL(', ').join(columns)
+            )
             
             self.execute_query(create_query)
-            logging.info(f"Created table: {table_name}")
+            self._known_tables.add(table_name)
+            logging.info("Created table: %s", table_name)
         
         def _infer_column_type(self, value):
             """
@@ -575,6 +1366,8 @@ if MONGODB_AVAILABLE:
             self.db_name = db_name or os.getenv("MONGO_DB_NAME", "replit_agent_db")
             self.client = None
             self.db = None
+            self._connect_lock = threading.Lock()
+            self._indexed = set()  # (collection name, index keys) already ensured
         
         def connect(self):
             """
@@ -585,12 +1378,15 @@ if MONGODB_AVAILABLE:
             """
             try:
                 if self.client is None:
-                    self.client = MongoClient(self.uri)
-                    self.db = self.client[self.db_name]
-                    logging.info(f"Connected to MongoDB database: {self.db_name}")
+                    with self._connect_lock:
+                        if self.client is None:
+                            client = MongoClient(self.uri)
+                            self.db = client[self.db_name]
+                            self.client = client
+                            logging.info("Connected to MongoDB database: %s", self.db_name)
                 return self.db
             except Exception as e:
-                logging.error(f"Error connecting to MongoDB: {str(e)}")
+                logging.error("Error connecting to MongoDB: %s", e)
                 raise
         
         def close(self):
@@ -633,7 +1429,28 @@ if MONGODB_AVAILABLE:
                 result = collection.insert_one(data)
                 return str(result.inserted_id)
             except Exception as e:
-                logging.error(f"Error creating document in {collection_name}: {str(e)}")
+                logging.error("Error creating document in %s: %s", collection_name, e)
+                raise
+        
+        def create_documents(self, collection_name, documents):
+            """
+            Create several documents in a collection with one insert_many call.
+            
+            Args:
+                collection_name (str): Name of the collection
+                documents (list): Document data for each document
+            
+            Returns:
+                list: IDs of the created documents, in input order
+            """
+            if not documents:
+                return []
+            try:
+                collection = self.get_collection(collection_name)
+                result = collection.insert_many(documents)
+                return [str(inserted_id) for inserted_id in result.inserted_ids]
+            except Exception as e:
+                logging.error("Error creating documents in %s: %s", collection_name, e)
                 raise
         
         def get_document_by_id(self, collection_name, document_id):
@@ -652,7 +1469,7 @@ if MONGODB_AVAILABLE:
                 result = collection.find_one({"_id": ObjectId(document_id)})
                 return self._process_document(result) if result else None
             except Exception as e:
-                logging.error(f"Error getting document {document_id} from {collection_name}: {str(e)}")
+                logging.error("Error getting document %s from %s: %s", document_id, collection_name, e)
                 raise
         
         def update_document(self, collection_name, document_id, data):
@@ -672,7 +1489,7 @@ if MONGODB_AVAILABLE:
                 result = collection.update_one({"_id": ObjectId(document_id)}, {"$set": data})
                 return result.modified_count
             except Exception as e:
-                logging.error(f"Error updating document {document_id} in {collection_name}: {str(e)}")
+                logging.error("Error updating document %s in %s: %s", document_id, collection_name, e)
                 raise
         
         def delete_document(self, collection_name, document_id):
@@ -691,7 +1508,7 @@ if MONGODB_AVAILABLE:
                 result = collection.delete_one({"_id": ObjectId(document_id)})
                 return result.deleted_count
             except Exception as e:
-                logging.error(f"Error deleting document {document_id} from {collection_name}: {str(e)}")
+                logging.error("Error deleting document %s from %s: %s", document_id, collection_name, e)
                 raise
         
         def list_documents(self, collection_name, query=None, limit=100, skip=0, sort=None):
@@ -708,6 +1525,9 @@ if MONGODB_AVAILABLE:
             Returns:
                 list: List of documents
             """
+            if sort:
+                self._index_for_query(collection_name, query, sort)
+            
             try:
                 collection = self.get_collection(collection_name)
                 cursor = collection.find(query or {}).limit(limit).skip(skip)
@@ -717,7 +1537,40 @@ if MONGODB_AVAILABLE:
                 
                 return [self._process_document(doc) for doc in cursor]
             except Exception as e:
-                logging.error(f"Error listing documents in {collection_name}: {str(e)}")
+                logging.error("Error listing documents in %s: %s", collection_name, e)
+                raise
+        
+        def iter_documents(self, collection_name, query=None, limit=None, skip=0, sort=None, batch_size=1000):
+            """
+            Iterate over documents in a collection, fetching them in batches.
+            
+            Args:
+                collection_name (str): Name of the collection
+                query (dict): Query filter
+                limit (int): Maximum number of documents to yield, or None for all
+                skip (int): Number of documents to skip
+                sort (list): List of (key, direction) pairs for sort order
+                batch_size (int): Documents fetched per round trip
+            
+            Yields:
+                dict: Each document
+            """
+            if sort:
+                self._index_for_query(collection_name, query, sort)
+            
+            try:
+                collection = self.get_collection(collection_name)
+                cursor = collection.find(query or {}).skip(skip).batch_size(batch_size)
+                if limit is not None:
+                    cursor = cursor.limit(limit)
+                if sort:
+                    cursor = cursor.sort(sort)
+                
+                with cursor:
+                    for doc in cursor:
+                        yield self._process_document(doc)
+            except Exception as e:
+                logging.error("Error iterating over documents in %s: %s", collection_name, e)
                 raise
         
         def count_documents(self, collection_name, query=None):
@@ -735,8 +1588,72 @@ if MONGODB_AVAILABLE:
                 collection = self.get_collection(collection_name)
                 return collection.count_documents(query or {})
             except Exception as e:
-                logging.error(f"Error counting documents in {collection_name}: {str(e)}")
+                logging.error("Error counting documents in %s: %s", collection_name, e)
+                raise
+        
+        def ensure_index(self, collection_name, keys, unique=False):
+            """
+            Create an index on a collection unless this helper already has.
+            
+            Args:
+                collection_name (str): Name of the collection
+                keys (list): List of (key, direction) pairs, in index order
+                unique (bool): Whether the index enforces unique values
+            
+            Returns:
+                str: Name of the index, or None if it was already ensured
+            """
+            index_id = (collection_name, tuple((key, direction) for key, direction in keys), unique)
+            if index_id in self._indexed:
+                return None
+            
+            try:
+                name = self.get_collection(collection_name).create_index(list(keys), unique=unique)
+            except Exception as e:
+                logging.error("Error creating index on %s: %s", collection_name, e)
                 raise
+            self._indexed.add(index_id)
+            return name
+        
+        def _index_for_query(self, collection_name, query, sort):
+            """
+            Ensure a compound index that serves a filtered, sorted query.
+            
+            Keys follow the equality-sort-range rule: fields matched by
+            equality first, then the sort fields, then fields filtered with
+            operators such as $gt. Index failures are logged, not raised, so
+            the query itself still runs.
+            
+            Args:
+                collection_name (str): Name of the collection
+                query (dict): Query filter
+                sort (list): List of (key, direction) pairs for sort order
+            """
+            equality = []
+            ranges = []
+            for key, value in (query or {}).items():
+                if key.startswith('$'):
+                    continue  # $or, $and, ... can't be covered by one index
+                if isinstance(value, dict) and any(k.startswith('$') for k in value):
+                    ranges.append((key, 1))
+                else:
+                    equality.append((key, 1))
+            
+            sort_keys = [(key, direction) for key, direction in sort]
+            sorted_fields = {key for key, _ in sort_keys}
+            keys = ([k for k in equality if k[0] not in sorted_fields] + sort_keys +
+                    [k for k in ranges if k[0] not in sorted_fields])
+            
+            index_id = (collection_name, tuple(keys), False)
+            if index_id in self._indexed:
+                return
+            if sum(1 for ensured in self._indexed if ensured[0] == collection_name) >= MONGO_AUTO_INDEX_LIMIT:
+                return
+            
+            try:
+                self.ensure_index(collection_name, keys)
+            except Exception:
+                pass  # Already logged by ensure_index
         
         def get_collections(self):
             """
@@ -750,7 +1667,7 @@ if MONGODB_AVAILABLE:
                     self.connect()
                 return self.db.list_collection_names()
             except Exception as e:
-                logging.error(f"Error getting collections: {str(e)}")
+                logging.error("Error getting collections: %s", e)
                 raise
         
         def _process_document(self, document):
@@ -774,6 +1691,7 @@ if MONGODB_AVAILABLE:
 
 # Create singleton instances for easy access
 _db_helper = None
+_db_lock = threading.Lock()
 
 def get_db_helper():
     """
@@ -785,31 +1703,45 @@ def get_db_helper():
     """
     global _db_helper
     
-    if _db_helper:
+    if _db_helper is not None:
         return _db_helper
     
+    # Concurrent first calls must not each build a helper (and a pool)
+    with _db_lock:
+        if _db_helper is None:
+            _db_helper = _create_db_helper()
+    return _db_helper
+
+def _create_db_helper():
+    """
+    Create the database helper for the first backend that is available.
+    
+    Returns:
+        Database helper instance
+    """
     # Try PostgreSQL first (since we created one with create_postgresql_database_tool)
     if POSTGRES_AVAILABLE and os.getenv("DATABASE_URL"):
         try:
-            _db_helper = PostgreSQLHelper()
+            db_helper = PostgreSQLHelper()
             logging.info("Using PostgreSQL database")
-            return _db_helper
+            return db_helper
         except Exception as e:
-            logging.error(f"Failed to initialize PostgreSQL: {str(e)}")
+            logging.error("Failed to initialize PostgreSQL: %s", e)
     
     # Fall back to MongoDB if available and configured
     if MONGODB_AVAILABLE and os.getenv("MONGO_URI"):
         try:
-            _db_helper = MongoDBHelper()
+            db_helper = MongoDBHelper()
             logging.info("Using MongoDB database")
-            return _db_helper
+            return db_helper
         except Exception as e:
-            logging.error(f"Failed to initialize MongoDB: {str(e)}")
+            logging.error("Failed to initialize MongoDB: %s", e)
     
     # Fall back to in-memory database as last resort
-    _db_helper = MemoryDBHelper()
-    logging.info("Using in-memory database (data will not persist)")
-    return _db_helper
+    # (persisted to MEMORY_DB_PATH if that is set)
+    db_helper = MemoryDBHelper()
+    logging.info("Using in-memory database")
+    return db_helper
 
 # Convenience functions that use the global helper instance
 
@@ -826,6 +1758,19 @@ def create_document(collection_name, data):
     """
     return get_db_helper().create_document(collection_name, data)
 
+def create_documents(collection_name, documents):
+    """
+    Create several documents in a collection.
+    
+    Args:
+        collection_name (str): Name of the collection
+        documents (list): Document data for each document
+    
+    Returns:
+        list: IDs of the created documents, in input order
+    """
+    return get_db_helper().create_documents(collection_name, documents)
+
 def get_document_by_id(collection_name, document_id):
     """
     Get a document by its ID.
@@ -882,6 +1827,22 @@ def list_documents(collection_name, query=None, limit=100, skip=0, sort=None):
     """
     return get_db_helper().list_documents(collection_name, query, limit, skip, sort)
 
+def iter_documents(collection_name, query=None, limit=None, skip=0, sort=None):
+    """
+    Iterate over documents in a collection without loading them all at once.
+    
+    Args:
+        collection_name (str): Name of the collection
+        query (dict): Query filter
+        limit (int): Maximum number of documents to yield, or None for all
+        skip (int): Number of documents to skip
+        sort (list): List of (key, direction) pairs for sort order
+    
+    Yields:
+        Mapping: Each document
+    """
+    return get_db_helper().iter_documents(collection_name, query, limit, skip, sort)
+
 def count_documents(collection_name, query=None):
     """
     Count documents in a collection.
@@ -909,6 +1870,7 @@ def close_db_connection():
     Close the database connection.
     """
     global _db_helper
-    if _db_helper is not None:
-        _db_helper.close()
-        _db_helper = None
\ No newline at end of file
+    with _db_lock:
+        if _db_helper is not None:
+            _db_helper.close()
+            _db_helper = None
\ No newline at end of file
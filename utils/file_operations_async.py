@@ -0,0 +1,62 @@
+import asyncio
+from utils import file_operations
+
+# File reads and writes block in the kernel with the GIL released, so running
+# them on the default thread pool lets many proceed at once without stalling
+# the event loop; the pool's size bounds how many are in flight
+
+async def read_file(path):
+    """
+    Read the contents of a file without blocking the event loop.
+
+    Args:
+        path (str): Path to the file to read
+
+    Returns:
+        str: Contents of the file
+    """
+    return await asyncio.to_thread(file_operations.read_file, path)
+
+async def write_file(path, content):
+    """
+    Write content to a file without blocking the event loop.
+
+    Args:
+        path (str): Path to the file to write
+        content (str): Content to write to the file
+    """
+    return await asyncio.to_thread(file_operations.write_file, path, content)
+
+async def copy_file(source, destination, preserve_metadata=False):
+    """
+    Copy a file without blocking the event loop.
+
+    Args:
+        source (str): Path to the source file
+        destination (str): Path to the destination file
+        preserve_metadata (bool): Also copy timestamps and other metadata
+    """
+    return await asyncio.to_thread(file_operations.copy_file, source, destination, preserve_metadata)
+
+async def read_files(paths):
+    """
+    Read several files concurrently.
+
+    Args:
+        paths (list): Paths of the files to read
+
+    Returns:
+        dict: Path -> contents, in the order given
+    """
+    contents = await asyncio.gather(*(read_file(path) for path in paths))
+    return dict(zip(paths, contents))
+
+async def write_files(files):
+    """
+    Write several files concurrently.
+
+    Args:
+        files (dict): Path -> content to write
+    """
+    await asyncio.gather(*(write_file(path, content) for path, content in files.items()))
+    return True
@@ -2,7 +2,125 @@ import os
 import subprocess
 import logging
 import base64
+import glob
+import fnmatch
 from urllib.parse import urlparse
+from utils.cache import TTLCache
+
+# libgit2 bindings run repository operations in-process instead of starting
+# a git process for each one; without them the git command line is used
+PYGIT2_AVAILABLE = False
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    pass
+
+# Status and log output, keyed by the repository state they were read at
+# (see _repo_state). Working tree edits don't change that state, so status
+# is only reused briefly, and code that edits files calls
+# invalidate_status_cache(); the log depends on nothing else
+STATUS_CACHE_TTL = 2
+_status_cache = TTLCache(ttl=STATUS_CACHE_TTL)
+_log_cache = TTLCache(ttl=300)
+
+# Directories commit has already ensured a user identity for, so later
+# commits skip the git config calls
+_identity_checked = set()
+
+def invalidate_status_cache():
+    """
+    Drop cached status output, e.g. after writing or deleting files.
+    """
+    _status_cache.clear()
+
+def _open_repo(directory):
+    """
+    Open the repository containing a directory with pygit2.
+    
+    Args:
+        directory (str): Repository directory or any directory inside it
+    
+    Returns:
+        pygit2.Repository: The repository
+    """
+    path = pygit2.discover_repository(os.path.abspath(directory))
+    if path is None:
+        raise pygit2.GitError(f"Not a git repository: {directory}")
+    return pygit2.Repository(path)
+
+def _repo_state(directory):
+    """
+    Fingerprint the index and the commit HEAD points at, from file stats.
+    
+    Staging, committing, switching branches, resetting and fetching into
+    the current branch all rewrite at least one of .git/index, .git/HEAD,
+    the branch's ref file or packed-refs.
+    
+    Args:
+        directory (str): Repository root directory
+    
+    Returns:
+        tuple: Stat results of those files, or None if directory isn't the
+            root of a repository with a .git directory
+    """
+    git_dir = os.path.join(directory, '.git')
+    try:
+        with open(os.path.join(git_dir, 'HEAD')) as head_file:
+            head = head_file.read().strip()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    
+    paths = ['HEAD', 'index', 'packed-refs']
+    if head.startswith('ref: '):
+        paths.append(head[5:])
+    state = [head]
+    for path in paths:
+        try:
+            info = os.stat(os.path.join(git_dir, path))
+            state.append((info.st_mtime_ns, info.st_ino, info.st_size))
+        except FileNotFoundError:
+            state.append(None)
+    return tuple(state)
+
+def _run_silent(cmd, cwd=None, input=None):
+    """
+    Run a git command whose output is not needed.
+    
+    stdout is discarded rather than captured, and stderr is only decoded if
+    the command fails, for the error message.
+    
+    Args:
+        cmd (list): Command and arguments
+        cwd (str): Directory to run it in
+        input (bytes): Data to send to the command's stdin
+    """
+    try:
+        subprocess.run(cmd, cwd=cwd, input=input, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    except subprocess.CalledProcessError as e:
+        e.stderr = e.stderr.decode(errors='replace')
+        raise
+
+def _clean_message(message):
+    # Tidy a commit message the way git commit -m does: no trailing
+    # whitespace, no leading, trailing or repeated blank lines
+    lines = []
+    for line in message.splitlines():
+        line = line.rstrip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return '\n'.join(lines) + '\n' if lines else ''
+
+def _subject(message):
+    # First paragraph of a commit message on one line, as git log --oneline shows it
+    lines = []
+    for line in message.splitlines():
+        if not line.strip():
+            break
+        lines.append(line.rstrip())
+    return ' '.join(lines)
 
 def init_repo(directory='.'):
     """
@@ -15,13 +133,12 @@ def init_repo(directory='.'):
         bool: True if initialization was successful
     """
     try:
-        result = subprocess.run(
-            ['git', 'init'],
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        if PYGIT2_AVAILABLE:
+            pygit2.init_repository(directory)
+            logging.info(f"Initialized Git repository in {directory}")
+            return True
+        
+        _run_silent(['git', 'init'], directory)
         logging.info(f"Initialized Git repository in {directory}")
         return True
     except subprocess.CalledProcessError as e:
@@ -31,13 +148,21 @@ def init_repo(directory='.'):
         logging.error(f"Error initializing Git repository: {str(e)}")
         raise
 
-def clone_repo(url, directory='.'):
+def clone_repo(url, directory='.', depth=1, filter_blobs=False, commit=None):
     """
     Clone a Git repository from the specified URL.
     
+    Clones are shallow by default: only the latest commit of the default
+    branch is fetched, which is all most tasks need and far less to
+    download. Pass depth=None for the full history.
+    
     Args:
         url (str): URL of the repository to clone
         directory (str): Directory to clone the repository into
+        depth (int): Number of commits of history to fetch, or None for all
+        filter_blobs (bool): Fetch file contents only when checked out
+            (--filter=blob:none), for large histories
+        commit (str): Fetch and check out only this commit
     
     Returns:
         bool: True if cloning was successful
@@ -52,12 +177,27 @@ def clone_repo(url, directory='.'):
         else:
             logging.info(f"Cloning repository from {url}")
         
-        result = subprocess.run(
-            ['git', 'clone', url, directory],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        options = []
+        if depth is not None:
+            options += ['--depth', str(depth)]
+        if filter_blobs:
+            options.append('--filter=blob:none')
+        
+        if commit is not None:
+            # Servers allow fetching a commit by ID, but clone only takes refs
+            commands = [
+                ['git', 'init', directory],
+                ['git', '-C', directory, 'remote', 'add', 'origin', url],
+                ['git', '-C', directory, 'fetch'] + options + ['origin', commit],
+                ['git', '-C', directory, 'checkout', 'FETCH_HEAD'],
+            ]
+        else:
+            if depth is not None:
+                options.append('--single-branch')
+            commands = [['git', 'clone'] + options + [url, directory]]
+        
+        for cmd in commands:
+            _run_silent(cmd)
         return True
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to clone repository: {e.stderr}")
@@ -82,12 +222,16 @@ def add_files(paths, directory='.'):
         if isinstance(paths, str):
             paths = [paths]
         
-        result = subprocess.run(
-            ['git', 'add'] + paths,
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
+        if PYGIT2_AVAILABLE:
+            _add_with_index(paths, directory)
+            return True
+        
+        # Paths go through stdin, NUL-separated, so any number of them fits
+        # in one git add without hitting the command line length limit
+        _run_silent(
+            ['git', 'add', '--pathspec-from-file=-', '--pathspec-file-nul'],
+            directory,
+            input=b'\0'.join(os.fsencode(path) for path in paths)
         )
         return True
     except subprocess.CalledProcessError as e:
@@ -97,6 +241,38 @@ def add_files(paths, directory='.'):
         logging.error(f"Error adding files to Git: {str(e)}")
         raise
 
+def _add_with_index(paths, directory):
+    """
+    Stage paths through pygit2, with git add's semantics: new and modified
+    files are added and deleted tracked files are removed.
+    
+    Args:
+        paths (list): File or directory paths, relative to directory
+        directory (str): Directory the paths are relative to, inside the repository
+    """
+    repo = _open_repo(directory)
+    index = repo.index
+    base = os.path.abspath(directory)
+    specs = [os.path.relpath(os.path.join(base, path), repo.workdir).replace(os.sep, '/') for path in paths]
+    
+    def matches(entry_path, spec):
+        return spec == '.' or entry_path == spec or entry_path.startswith(spec + '/') or fnmatch.fnmatchcase(entry_path, spec)
+    
+    # add_all only adds and updates, so drop tracked files that are gone
+    tracked = [entry.path for entry in index]
+    for path, spec in zip(paths, specs):
+        matched = False
+        for entry_path in tracked:
+            if matches(entry_path, spec):
+                matched = True
+                if not os.path.lexists(os.path.join(repo.workdir, entry_path)):
+                    index.remove(entry_path)
+        if not matched and not glob.has_magic(spec) and not os.path.lexists(os.path.join(base, path)):
+            raise pygit2.GitError(f"pathspec '{path}' did not match any files")
+    
+    index.add_all(specs)
+    index.write()
+
 def commit(message, directory='.'):
     """
     Commit changes to the Git repository.
@@ -109,8 +285,14 @@ def commit(message, directory='.'):
         bool: True if commit was successful
     """
     try:
-        # Configure Git user if not already configured
-        ensure_git_config(directory)
+        # Configure Git user if not already configured; once per directory
+        key = os.path.abspath(directory)
+        if key not in _identity_checked:
+            ensure_git_config(directory)
+            _identity_checked.add(key)
+        
+        if PYGIT2_AVAILABLE:
+            return _commit_index(message, directory)
         
         result = subprocess.run(
             ['git', 'commit', '-m', message],
@@ -131,6 +313,43 @@ def commit(message, directory='.'):
         logging.error(f"Error committing to Git: {str(e)}")
         raise
 
+def _commit_index(message, directory):
+    """
+    Commit the staged changes through pygit2. Unlike git commit, this runs
+    no hooks and doesn't sign the commit.
+    
+    Failures raise the CalledProcessError git commit would, so commit()
+    behaves the same whether or not pygit2 is installed.
+    
+    Args:
+        message (str): Commit message
+        directory (str): Repository directory
+    
+    Returns:
+        bool: True once the commit is made
+    """
+    cmd = ['git', 'commit', '-m', message]
+    repo = _open_repo(directory)
+    tree = repo.index.write_tree()
+    if repo.head_is_unborn:
+        parents = []
+        nothing_staged = len(repo.index) == 0
+    else:
+        parent = repo.head.peel(pygit2.Commit)
+        parents = [parent.id]
+        nothing_staged = parent.tree_id == tree
+    if nothing_staged:
+        # git commit reports this on stdout and exits 1
+        raise subprocess.CalledProcessError(1, cmd, output="nothing to commit\n", stderr="")
+    
+    message = _clean_message(message)
+    if not message:
+        raise subprocess.CalledProcessError(1, cmd, output="", stderr="Aborting commit due to empty commit message.\n")
+    
+    signature = repo.default_signature
+    repo.create_commit('HEAD', signature, signature, message, tree, parents)
+    return True
+
 def push(remote='origin', branch='main', directory='.'):
     """
     Push changes to a remote repository.
@@ -144,13 +363,7 @@ def push(remote='origin', branch='main', directory='.'):
         bool: True if push was successful
     """
     try:
-        result = subprocess.run(
-            ['git', 'push', remote, branch],
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        _run_silent(['git', 'push', remote, branch], directory)
         return True
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to push to Git: {e.stderr}")
@@ -172,13 +385,7 @@ def pull(remote='origin', branch='main', directory='.'):
         bool: True if pull was successful
     """
     try:
-        result = subprocess.run(
-            ['git', 'pull', remote, branch],
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        _run_silent(['git', 'pull', remote, branch], directory)
         return True
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to pull from Git: {e.stderr}")
@@ -191,6 +398,12 @@ def get_status(directory='.'):
     """
     Get the status of the Git repository.
     
+    Repeated calls reuse the last result for up to STATUS_CACHE_TTL seconds
+    while nothing is staged, committed or checked out, so polling doesn't
+    start a git process each time. Working tree edits made outside this
+    process can take that long to show; edits made through the app call
+    invalidate_status_cache().
+    
     Args:
         directory (str): Repository directory
     
@@ -198,14 +411,10 @@ def get_status(directory='.'):
         str: Status message
     """
     try:
-        result = subprocess.run(
-            ['git', 'status'],
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
+        state = _repo_state(directory)
+        if state is None:
+            return _read_status(directory)
+        return _status_cache.get((os.path.abspath(directory), state), lambda: _read_status(directory))
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to get Git status: {e.stderr}")
         raise
@@ -213,10 +422,22 @@ def get_status(directory='.'):
         logging.error(f"Error getting Git status: {str(e)}")
         raise
 
+def _read_status(directory):
+    result = subprocess.run(
+        ['git', 'status'],
+        cwd=directory,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout
+
 def get_log(limit=10, directory='.'):
     """
     Get the commit log of the Git repository.
     
+    The result is reused until the current branch moves.
+    
     Args:
         limit (int): Maximum number of commits to return
         directory (str): Repository directory
@@ -225,14 +446,10 @@ def get_log(limit=10, directory='.'):
         str: Commit log
     """
     try:
-        result = subprocess.run(
-            ['git', 'log', f'-{limit}', '--oneline'],
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
+        state = _repo_state(directory)
+        if state is None:
+            return _read_log(limit, directory)
+        return _log_cache.get((os.path.abspath(directory), limit, state), lambda: _read_log(limit, directory))
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to get Git log: {e.stderr}")
         raise
@@ -240,6 +457,27 @@ def get_log(limit=10, directory='.'):
         logging.error(f"Error getting Git log: {str(e)}")
         raise
 
+def _read_log(limit, directory):
+    if PYGIT2_AVAILABLE:
+        repo = _open_repo(directory)
+        if repo.head_is_unborn:
+            raise pygit2.GitError("Current branch does not have any commits yet")
+        lines = []
+        for entry in repo.walk(repo.head.target, pygit2.GIT_SORT_TIME):
+            if len(lines) >= limit:
+                break
+            lines.append(f"{entry.short_id} {_subject(entry.message)}\n")
+        return ''.join(lines)
+    
+    result = subprocess.run(
+        ['git', 'log', f'-{limit}', '--oneline'],
+        cwd=directory,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout
+
 def create_branch(branch_name, directory='.'):
     """
     Create a new Git branch.
@@ -252,13 +490,12 @@ def create_branch(branch_name, directory='.'):
         bool: True if branch creation was successful
     """
     try:
-        result = subprocess.run(
-            ['git', 'branch', branch_name],
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        if PYGIT2_AVAILABLE:
+            repo = _open_repo(directory)
+            repo.branches.local.create(branch_name, repo.head.peel(pygit2.Commit))
+            return True
+        
+        _run_silent(['git', 'branch', branch_name], directory)
         return True
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to create Git branch: {e.stderr}")
@@ -279,13 +516,16 @@ def checkout_branch(branch_name, directory='.'):
         bool: True if checkout was successful
     """
     try:
-        result = subprocess.run(
-            ['git', 'checkout', branch_name],
-            cwd=directory,
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        if PYGIT2_AVAILABLE:
+            repo = _open_repo(directory)
+            branch = repo.branches.local.get(branch_name)
+            if branch is not None:
+                # Safe checkout: fails rather than overwrite local changes
+                repo.checkout(branch)
+                return True
+            # Remote branches, tags and commits are left to git's own rules
+        
+        _run_silent(['git', 'checkout', branch_name], directory)
         return True
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to checkout Git branch: {e.stderr}")
@@ -303,24 +543,27 @@ def ensure_git_config(directory='.'):
         directory (str): Repository directory
     """
     try:
-        # Check if user name is configured
-        name_result = subprocess.run(
-            ['git', 'config', 'user.name'],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        )
+        if PYGIT2_AVAILABLE and pygit2.discover_repository(os.path.abspath(directory)) is not None:
+            # Reads the repository, global and system config, and sets
+            # missing values in the repository's own, as git config does
+            config = _open_repo(directory).config
+            if 'user.name' not in config:
+                config['user.name'] = 'Replit Agent'
+            if 'user.email' not in config:
+                config['user.email'] = 'agent@replit.com'
+            return
         
-        # Check if user email is configured
-        email_result = subprocess.run(
-            ['git', 'config', 'user.email'],
+        # Check which of user name and email are configured, in one call
+        result = subprocess.run(
+            ['git', 'config', '--name-only', '--get-regexp', r'^user\.(name|email)$'],
             cwd=directory,
             capture_output=True,
             text=True
         )
+        configured = set(result.stdout.split())
         
         # Set default user name if not configured
-        if name_result.returncode != 0:
+        if 'user.name' not in configured:
             subprocess.run(
                 ['git', 'config', 'user.name', 'Replit Agent'],
                 cwd=directory,
@@ -328,7 +571,7 @@ def ensure_git_config(directory='.'):
             )
         
         # Set default user email if not configured
-        if email_result.returncode != 0:
+        if 'user.email' not in configured:
             subprocess.run(
                 ['git', 'config', 'user.email', 'agent@replit.com'],
                 cwd=directory,
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from utils.cache import content_digest
+
+class MemoryBackend:
+    """
+    In-process LRU cache backend with per-entry expiry.
+    Any object with the same get/set methods (e.g. a Redis wrapper) can be
+    used as an LLMCache backend instead.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Initialize the backend.
+
+        Args:
+            maxsize (int): Maximum number of cached responses
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get a cached value.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            any: Cached value, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store a value.
+
+        Args:
+            key (str): Cache key
+            value: Value to store
+            ttl (float, optional): Seconds until the entry expires, or None to keep it
+        """
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop all cached values.
+        """
+        with self._lock:
+            self._data.clear()
+
+class LLMCache:
+    """
+    Exact-match cache for chat completion results, keyed by the full request.
+    """
+
+    def __init__(self, backend=None, ttl=3600):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage backend with get(key) and set(key, value, ttl); defaults to MemoryBackend
+            ttl (float): Default seconds a cached response stays valid
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+
+    @staticmethod
+    def cache_key(model, messages, temperature=None, response_format=None):
+        """
+        Build a deterministic key for a chat completion request.
+
+        Args:
+            model (str): Model name
+            messages (list): Chat messages
+            temperature (float, optional): Sampling temperature
+            response_format (dict, optional): Requested response format
+
+        Returns:
+            str: Hex digest of the request payload
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format,
+        }
+        return content_digest(payload, length=32)
+
+    def get(self, key):
+        """
+        Get a cached response.
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            any: Cached response, or None on a miss
+        """
+        return self.backend.get(key)
+
+    def set(self, key, value, ttl=None):
+        """
+        Cache a response.
+
+        Args:
+            key (str): Key from cache_key()
+            value: Response to cache
+            ttl (float, optional): Seconds to keep it; defaults to the cache's ttl
+        """
+        self.backend.set(key, value, ttl if ttl is not None else self.ttl)
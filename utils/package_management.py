@@ -1,7 +1,28 @@
 import subprocess
+import sys
 import logging
 import os
+import re
 import json
+import importlib.metadata
+from utils.cache import TTLCache
+
+# Installed package lists, per language; each listing runs the package
+# manager, so it's reused for a while and dropped on install or uninstall
+_installed_cache = TTLCache(ttl=30)
+
+# One gem list line: "name (newest, older...)", where a version may be
+# marked "default: " or followed by a platform; captures the name and the
+# newest version
+_GEM_LINE_RE = re.compile(r'^(\S+) \((?:default: )?([^,) ]+)')
+
+# pip as a module of the running interpreter, so installs land in the
+# environment whose metadata _python_version and _freeze_from_metadata read,
+# not wherever the first pip on PATH points
+_PIP = [sys.executable, '-m', 'pip']
+
+# Distributions pip freeze omits from its output
+_FREEZE_EXCLUDED = {'pip', 'setuptools', 'wheel', 'distribute'}
 
 def install_package(package_name, language='python'):
     """
@@ -11,11 +32,25 @@ def install_package(package_name, language='python'):
         package_name (str): Name of the package to install
         language (str): Language of the package manager to use
     
+    Returns:
+        bool: True if installation was successful
+    """
+    return install_packages([package_name], language)
+
+def install_packages(package_names, language='python'):
+    """
+    Install several packages with a single package manager run, so they
+    are resolved and downloaded together.
+    
+    Args:
+        package_names (list): Names of the packages to install, optionally with version specifiers
+        language (str): Language of the package manager to use
+    
     Returns:
         bool: True if installation was successful
     """
     package_managers = {
-        'python': ['pip', 'install'],
+        'python': _PIP + ['install'],
         'javascript': ['npm', 'install'],
         'ruby': ['gem', 'install']
     }
@@ -23,15 +58,13 @@ def install_package(package_name, language='python'):
     if language not in package_managers:
         raise ValueError(f"Unsupported language: {language}. Supported languages are: {', '.join(package_managers.keys())}")
     
+    if not package_names:
+        return True
+    
+    packages = ', '.join(package_names)
     try:
-        # Add a version specifier if provided
-        if '>=' in package_name or '==' in package_name or '<=' in package_name:
-            packages = [package_name]
-        else:
-            packages = [package_name]
-        
-        cmd = package_managers[language] + packages
-        logging.info(f"Installing package: {' '.join(cmd)}")
+        cmd = package_managers[language] + list(package_names)
+        logging.info(f"Installing packages: {' '.join(cmd)}")
         
         result = subprocess.run(
             cmd,
@@ -40,13 +73,16 @@ def install_package(package_name, language='python'):
             check=True
         )
         
-        logging.info(f"Successfully installed {package_name}")
+        _installed_cache.invalidate(language)
+        # Let metadata lookups see the new distributions
+        importlib.invalidate_caches()
+        logging.info(f"Successfully installed {packages}")
         return True
     except subprocess.CalledProcessError as e:
-        logging.error(f"Failed to install package {package_name}: {e.stderr}")
+        logging.error(f"Failed to install packages {packages}: {e.stderr}")
         raise
     except Exception as e:
-        logging.error(f"Error installing package {package_name}: {str(e)}")
+        logging.error(f"Error installing packages {packages}: {str(e)}")
         raise
 
 def uninstall_package(package_name, language='python'):
@@ -61,7 +97,7 @@ def uninstall_package(package_name, language='python'):
         bool: True if uninstallation was successful
     """
     package_managers = {
-        'python': ['pip', 'uninstall', '-y'],
+        'python': _PIP + ['uninstall', '-y'],
         'javascript': ['npm', 'uninstall'],
         'ruby': ['gem', 'uninstall', '-x']
     }
@@ -80,6 +116,8 @@ def uninstall_package(package_name, language='python'):
             check=True
         )
         
+        _installed_cache.invalidate(language)
+        importlib.invalidate_caches()
         logging.info(f"Successfully uninstalled {package_name}")
         return True
     except subprocess.CalledProcessError as e:
@@ -93,6 +131,21 @@ def list_installed_packages(language='python'):
     """
     List all installed packages using the appropriate package manager.
     
+    The listing is cached for 30 seconds, and refreshed after an install or
+    uninstall through this module.
+    
+    Args:
+        language (str): Language of the package manager to use
+    
+    Returns:
+        list: List of installed packages
+    """
+    return list(_installed_cache.get(language, lambda: _list_installed_packages(language)))
+
+def _list_installed_packages(language):
+    """
+    Run the package manager to list installed packages.
+    
     Args:
         language (str): Language of the package manager to use
     
@@ -100,7 +153,7 @@ def list_installed_packages(language='python'):
         list: List of installed packages
     """
     package_managers = {
-        'python': ['pip', 'list', '--format=json'],
+        'python': _PIP + ['list', '--format=json'],
         'javascript': ['npm', 'list', '--json'],
         'ruby': ['gem', 'list', '-e']
     }
@@ -128,11 +181,9 @@ def list_installed_packages(language='python'):
             # Parse the output of gem list
             packages = []
             for line in result.stdout.splitlines():
-                if line.strip():
-                    parts = line.split(' ')
-                    name = parts[0]
-                    version = parts[1].strip('()')
-                    packages.append({'name': name, 'version': version})
+                match = _GEM_LINE_RE.match(line)
+                if match:
+                    packages.append({'name': match[1], 'version': match[2]})
             return packages
         
         return []
@@ -143,6 +194,22 @@ def list_installed_packages(language='python'):
         logging.error(f"Error listing installed packages: {str(e)}")
         raise
 
+def _python_version(package_name):
+    """
+    Look up an installed Python distribution's version from its metadata,
+    which reads one directory entry instead of running pip.
+    
+    Args:
+        package_name (str): Distribution name, in any case or separator style
+    
+    Returns:
+        str: Installed version, or None if not installed
+    """
+    try:
+        return importlib.metadata.version(package_name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
 def check_package_installed(package_name, language='python'):
     """
     Check if a package is installed.
@@ -155,6 +222,8 @@ def check_package_installed(package_name, language='python'):
         bool: True if the package is installed
     """
     try:
+        if language == 'python':
+            return _python_version(package_name) is not None
         packages = list_installed_packages(language)
         return any(pkg['name'].lower() == package_name.lower() for pkg in packages)
     except Exception as e:
@@ -173,6 +242,8 @@ def get_package_version(package_name, language='python'):
         str: Version of the package, or None if not installed
     """
     try:
+        if language == 'python':
+            return _python_version(package_name)
         packages = list_installed_packages(language)
         for pkg in packages:
             if pkg['name'].lower() == package_name.lower():
@@ -182,6 +253,30 @@ def get_package_version(package_name, language='python'):
         logging.error(f"Error getting version of package {package_name}: {str(e)}")
         raise
 
+def _freeze_from_metadata():
+    """
+    Render installed Python distributions as pinned requirements, like
+    pip freeze but read in-process from package metadata.
+    
+    Returns:
+        str: One name==version line per distribution, sorted by name, or
+            None if any was installed from a URL, VCS or editable checkout,
+            which only pip freeze renders correctly
+    """
+    pins = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata['Name']
+        if not name:
+            continue
+        key = name.lower().replace('_', '-')
+        # pip freeze leaves out its own tooling; earlier sys.path entries win
+        if key in _FREEZE_EXCLUDED or key in pins:
+            continue
+        if dist.read_text('direct_url.json') is not None:
+            return None
+        pins[key] = (name.lower(), f"{name}=={dist.version}\n")
+    return ''.join(pin for _, pin in sorted(pins.values()))
+
 def create_requirements_file(output_file='requirements.txt', language='python'):
     """
     Create a requirements file for the current environment.
@@ -195,14 +290,17 @@ def create_requirements_file(output_file='requirements.txt', language='python'):
     """
     try:
         if language == 'python':
-            result = subprocess.run(
-                ['pip', 'freeze'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            requirements = _freeze_from_metadata()
+            if requirements is None:
+                result = subprocess.run(
+                    _PIP + ['freeze'],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+                requirements = result.stdout
             with open(output_file, 'w') as f:
-                f.write(result.stdout)
+                f.write(requirements)
             return True
         elif language == 'javascript':
             # Check if package.json exists
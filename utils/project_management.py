@@ -1,10 +1,79 @@
 import os
+import stat
+import copy
+import contextlib
 import shutil
 import json
+import uuid
+import functools
+import time
 import logging
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from utils import file_operations
 
+# Threads writing a new project's files
+PROJECT_WRITE_WORKERS = 4
+
+# Seconds a project listing may be reused. Other worker processes don't clear
+# this process's listing cache, and a metadata file written into an existing
+# directory doesn't change the parent's mtime, so listings also expire
+PROJECT_LIST_TTL = 5
+
+# Where the OS allows it, a new project's directory is opened once and its
+# contents are created relative to that descriptor, so the kernel doesn't
+# resolve the project path again for every file
+DIR_FD_AVAILABLE = hasattr(os, 'O_DIRECTORY') and {os.open, os.mkdir, os.stat, os.rename} <= os.supports_dir_fd
+
+# Project templates. Files whose content mentions {project_name} are
+# str.format templates (so their literal braces are doubled); the rest are
+# written as-is
+_TEMPLATES = {
+    'python': {
+        'files': {
+            'main.py': '# Main entry point for the application\n\ndef main():\n    print("Hello, World!")\n\nif __name__ == "__main__":\n    main()',
+            'requirements.txt': '# List your dependencies here\n',
+            'README.md': '# {project_name}\n\nA Python project created with Replit Agent.\n'
+        },
+        'directories': ['src', 'tests']
+    },
+    'web': {
+        'files': {
+            'index.html': '<!DOCTYPE html>\n<html>\n<head>\n    <title>{project_name}</title>\n    <link rel="stylesheet" href="styles.css">\n</head>\n<body>\n    <h1>{project_name}</h1>\n    <p>A web project created with Replit Agent.</p>\n    <script src="script.js"></script>\n</body>\n</html>',
+            'styles.css': '/* Your styles here */\nbody {\n    font-family: Arial, sans-serif;\n    margin: 0;\n    padding: 20px;\n}',
+            'script.js': '// Your JavaScript code here\nconsole.log("Hello, World!");',
+            'README.md': '# {project_name}\n\nA web project created with Replit Agent.\n'
+        },
+        'directories': ['assets', 'js', 'css']
+    },
+    'flask': {
+        'files': {
+            'app.py': 'from flask import Flask, render_template\n\napp = Flask(__name__)\n\n@app.route("/")\ndef home():\n    return render_template("index.html")\n\nif __name__ == "__main__":\n    app.run(host="0.0.0.0", port=5000, debug=True)',
+            'requirements.txt': 'flask==2.0.1\n',
+            'README.md': '# {project_name}\n\nA Flask project created with Replit Agent.\n',
+            'templates/index.html': '<!DOCTYPE html>\n<html>\n<head>\n    <title>{project_name}</title>\n    <link rel="stylesheet" href="{{ url_for(\'static\', filename=\'styles.css\') }}">\n</head>\n<body>\n    <h1>{project_name}</h1>\n    <p>A Flask project created with Replit Agent.</p>\n</body>\n</html>',
+            'static/styles.css': '/* Your styles here */\nbody {\n    font-family: Arial, sans-serif;\n    margin: 0;\n    padding: 20px;\n}'
+        },
+        'directories': ['static', 'templates', 'routes']
+    }
+}
+
+# Layout used when no template is given, in the same form as a template
+_BASIC_STRUCTURE = {
+    'files': {
+        'README.md': '# {project_name}\n\nA project created with Replit Agent.\n',
+        '.gitignore': "# Python\n__pycache__/\n*.py[cod]\n*$py.class\n*.so\n.Python\nbuild/\ndevelop-eggs/\ndist/\ndownloads/\neggs/\n.eggs/\nlib/\nlib64/\nparts/\nsdist/\nvar/\nwheels/\n*.egg-info/\n.installed.cfg\n*.egg\n\n# Environment\n.env\n.venv\nenv/\nvenv/\nENV/\nenv.bak/\nvenv.bak/\n\n# IDE\n.idea/\n.vscode/\n*.swp\n*.swo\n"
+    },
+    'directories': ['src', 'docs']
+}
+
+def _parametric_files(spec):
+    return {path for path, content in spec['files'].items() if '{project_name}' in content}
+
+# Template name -> paths of the files that need the project name filled in
+_TEMPLATES_PARAMETRIC = {name: _parametric_files(spec) for name, spec in _TEMPLATES.items()}
+_BASIC_PARAMETRIC = _parametric_files(_BASIC_STRUCTURE)
+
 def create_project(name, template=None):
     """
     Create a new project with the given name and optional template.
@@ -17,21 +86,27 @@ def create_project(name, template=None):
         bool: True if the project was created successfully
     """
     try:
-        # Create the project directory
-        if not os.path.exists(name):
+        # Create the project directory; mkdir itself fails if it exists,
+        # without a separate check that could race
+        try:
             os.makedirs(name)
-        else:
-            raise FileExistsError(f"Project '{name}' already exists")
-        
-        # Initialize with template if provided
-        if template:
-            initialize_from_template(name, template)
-        else:
-            # Create basic project structure
-            create_basic_structure(name)
+        except FileExistsError:
+            raise FileExistsError(f"Project '{name}' already exists") from None
         
-        # Create project metadata
-        create_project_metadata(name)
+        dir_fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY) if DIR_FD_AVAILABLE else None
+        try:
+            # Lay out the template if provided, or a basic project structure,
+            # then write all of its files and the metadata in one batch
+            if template:
+                files = _template_files(name, template, dir_fd)
+            else:
+                files = _basic_files(name, dir_fd)
+            files.append(_metadata_file(name, dir_fd))
+            _write_files(files, dir_fd)
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+            _scan_projects.cache_clear()
         
         logging.info(f"Created project '{name}'")
         return True
@@ -39,6 +114,30 @@ def create_project(name, template=None):
         logging.error(f"Error creating project '{name}': {str(e)}")
         raise
 
+def _write_files(files, dir_fd=None):
+    """
+    Write a batch of files concurrently. Small file writes are mostly
+    waiting on open/close syscalls, which threads can overlap.
+    
+    Args:
+        files (list): (path, content) pairs; dict content is written as a
+            metadata file with _write_metadata
+        dir_fd (int, optional): Open directory the paths are relative to
+    """
+    def write(item):
+        path, content = item
+        if isinstance(content, dict):
+            _write_metadata(path, content, dir_fd)
+        elif dir_fd is not None:
+            with _open_for_writing(path, dir_fd) as f:
+                f.write(content)
+        else:
+            file_operations.write_file(path, content)
+    
+    with ThreadPoolExecutor(max_workers=PROJECT_WRITE_WORKERS) as pool:
+        # Consume the results so the first failed write raises here
+        list(pool.map(write, files))
+
 def initialize_from_template(project_name, template):
     """
     Initialize a project from a template.
@@ -47,54 +146,101 @@ def initialize_from_template(project_name, template):
         project_name (str): Name of the project
         template (str): Template to use
     """
-    templates = {
-        'python': {
-            'files': {
-                'main.py': '# Main entry point for the application\n\ndef main():\n    print("Hello, World!")\n\nif __name__ == "__main__":\n    main()',
-                'requirements.txt': '# List your dependencies here\n',
-                'README.md': f'# {project_name}\n\nA Python project created with Replit Agent.\n'
-            },
-            'directories': ['src', 'tests']
-        },
-        'web': {
-            'files': {
-                'index.html': f'<!DOCTYPE html>\n<html>\n<head>\n    <title>{project_name}</title>\n    <link rel="stylesheet" href="styles.css">\n</head>\n<body>\n    <h1>{project_name}</h1>\n    <p>A web project created with Replit Agent.</p>\n    <script src="script.js"></script>\n</body>\n</html>',
-                'styles.css': '/* Your styles here */\nbody {\n    font-family: Arial, sans-serif;\n    margin: 0;\n    padding: 20px;\n}',
-                'script.js': '// Your JavaScript code here\nconsole.log("Hello, World!");',
-                'README.md': f'# {project_name}\n\nA web project created with Replit Agent.\n'
-            },
-            'directories': ['assets', 'js', 'css']
-        },
-        'flask': {
-            'files': {
-                'app.py': 'from flask import Flask, render_template\n\napp = Flask(__name__)\n\n@app.route("/")\ndef home():\n    return render_template("index.html")\n\nif __name__ == "__main__":\n    app.run(host="0.0.0.0", port=5000, debug=True)',
-                'requirements.txt': 'flask==2.0.1\n',
-                'README.md': f'# {project_name}\n\nA Flask project created with Replit Agent.\n'
-            },
-            'directories': ['static', 'templates', 'routes']
-        }
-    }
+    _write_files(_template_files(project_name, template))
+
+def _template_files(project_name, template, dir_fd=None):
+    """
+    Create a template's directories and render its files.
+    
+    Args:
+        project_name (str): Name of the project
+        template (str): Template to use
+        dir_fd (int, optional): Open project directory to lay out relative to
+    
+    Returns:
+        list: (path, content) pairs of the files to write
+    """
+    if template not in _TEMPLATES:
+        raise ValueError(f"Unknown template: {template}. Available templates: {', '.join(_TEMPLATES.keys())}")
+    return _lay_out(project_name, _TEMPLATES[template], _TEMPLATES_PARAMETRIC[template], dir_fd)
+
+def _lay_out(project_name, spec, parametric, dir_fd=None):
+    """
+    Create a layout's directories and render its files.
     
-    if template not in templates:
-        raise ValueError(f"Unknown template: {template}. Available templates: {', '.join(templates.keys())}")
+    Args:
+        project_name (str): Name of the project
+        spec (dict): Layout with 'files' and 'directories'
+        parametric (set): Paths of the files that need the project name filled in
+        dir_fd (int, optional): Open project directory to lay out relative to
+    
+    Returns:
+        list: (path, content) pairs of the files to write; relative to
+            dir_fd when it is given
+    """
+    root = project_name if dir_fd is None else ''
     
     # Create the base directory structure
-    for directory in templates[template]['directories']:
-        os.makedirs(os.path.join(project_name, directory), exist_ok=True)
-    
-    # Create template files
-    for file_path, content in templates[template]['files'].items():
-        file_operations.write_file(os.path.join(project_name, file_path), content)
-    
-    # Create extra directories for specific templates
-    if template == 'flask':
-        # Create the templates directory with a basic index.html
-        index_html = f'<!DOCTYPE html>\n<html>\n<head>\n    <title>{project_name}</title>\n    <link rel="stylesheet" href="{{ url_for(\'static\', filename=\'styles.css\') }}">\n</head>\n<body>\n    <h1>{project_name}</h1>\n    <p>A Flask project created with Replit Agent.</p>\n</body>\n</html>'
-        file_operations.write_file(os.path.join(project_name, 'templates', 'index.html'), index_html)
-        
-        # Create a basic CSS file
-        css_content = '/* Your styles here */\nbody {\n    font-family: Arial, sans-serif;\n    margin: 0;\n    padding: 20px;\n}'
-        file_operations.write_file(os.path.join(project_name, 'static', 'styles.css'), css_content)
+    for directory in spec['directories']:
+        _make_directory(os.path.join(root, directory), dir_fd)
+    
+    # Render template files
+    files = []
+    for file_path, content in spec['files'].items():
+        if file_path in parametric:
+            content = content.format(project_name=project_name)
+        files.append((os.path.join(root, file_path), content))
+    return files
+
+def _make_directory(path, dir_fd=None):
+    """
+    Create a directory, and its parents only if they are missing.
+    
+    Project directories are normally created inside a project that already
+    exists, so a single mkdir() call usually does it, where os.makedirs
+    would check each path component.
+    
+    Args:
+        path (str): Directory to create; it may already exist
+        dir_fd (int, optional): Open directory the path is relative to
+    """
+    try:
+        os.mkdir(path, dir_fd=dir_fd)
+    except FileExistsError:
+        try:
+            is_dir = stat.S_ISDIR(os.stat(path, dir_fd=dir_fd).st_mode)
+        except OSError:
+            is_dir = False
+        if not is_dir:
+            raise
+    except FileNotFoundError:
+        parent = os.path.dirname(path)
+        if not parent:
+            raise
+        _make_directory(parent, dir_fd)
+        os.mkdir(path, dir_fd=dir_fd)
+
+def _open_for_writing(path, dir_fd=None):
+    """
+    Open a file for writing, creating its parent directories if needed.
+    
+    Args:
+        path (str): Path of the file
+        dir_fd (int, optional): Open directory the path is relative to
+    
+    Returns:
+        file: Text file truncated and open for writing
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    try:
+        fd = os.open(path, flags, 0o666, dir_fd=dir_fd)
+    except FileNotFoundError:
+        parent = os.path.dirname(path)
+        if not parent:
+            raise
+        _make_directory(parent, dir_fd)
+        fd = os.open(path, flags, 0o666, dir_fd=dir_fd)
+    return open(fd, 'w')
 
 def create_basic_structure(project_name):
     """
@@ -103,16 +249,20 @@ def create_basic_structure(project_name):
     Args:
         project_name (str): Name of the project
     """
-    # Create basic directories
-    os.makedirs(os.path.join(project_name, 'src'), exist_ok=True)
-    os.makedirs(os.path.join(project_name, 'docs'), exist_ok=True)
+    _write_files(_basic_files(project_name))
+
+def _basic_files(project_name, dir_fd=None):
+    """
+    Create the basic project directories and render its files.
     
-    # Create basic files
-    readme_content = f"# {project_name}\n\nA project created with Replit Agent.\n"
-    file_operations.write_file(os.path.join(project_name, 'README.md'), readme_content)
+    Args:
+        project_name (str): Name of the project
+        dir_fd (int, optional): Open project directory to lay out relative to
     
-    gitignore_content = "# Python\n__pycache__/\n*.py[cod]\n*$py.class\n*.so\n.Python\nbuild/\ndevelop-eggs/\ndist/\ndownloads/\neggs/\n.eggs/\nlib/\nlib64/\nparts/\nsdist/\nvar/\nwheels/\n*.egg-info/\n.installed.cfg\n*.egg\n\n# Environment\n.env\n.venv\nenv/\nvenv/\nENV/\nenv.bak/\nvenv.bak/\n\n# IDE\n.idea/\n.vscode/\n*.swp\n*.swo\n"
-    file_operations.write_file(os.path.join(project_name, '.gitignore'), gitignore_content)
+    Returns:
+        list: (path, content) pairs of the files to write
+    """
+    return _lay_out(project_name, _BASIC_STRUCTURE, _BASIC_PARAMETRIC, dir_fd)
 
 def create_project_metadata(project_name):
     """
@@ -121,18 +271,53 @@ def create_project_metadata(project_name):
     Args:
         project_name (str): Name of the project
     """
+    _write_metadata(*_metadata_file(project_name))
+    _scan_projects.cache_clear()
+
+def _metadata_file(project_name, dir_fd=None):
+    """
+    Render a new project's metadata file.
+    
+    Args:
+        project_name (str): Name of the project
+        dir_fd (int, optional): Open project directory the path is relative to
+    
+    Returns:
+        tuple: (path, metadata dict) of the metadata file
+    """
     metadata = {
         'name': project_name,
-        'created_at': datetime.datetime.now().isoformat(),
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
         'created_by': 'Replit Agent',
         'description': f'A project named {project_name}',
         'version': '0.1.0'
     }
     
-    file_operations.write_file(
-        os.path.join(project_name, '.project_metadata.json'),
-        json.dumps(metadata, indent=4)
-    )
+    root = project_name if dir_fd is None else ''
+    return os.path.join(root, '.project_metadata.json'), metadata
+
+def _write_metadata(path, metadata, dir_fd=None):
+    """
+    Write a metadata file, serializing straight into it.
+    
+    The JSON goes to a temporary file that then replaces the old one, so
+    readers never see a partly written file. Each write gets its own
+    temporary name, so concurrent writers don't write into each other's file.
+    
+    Args:
+        path (str): Path of the metadata file
+        metadata (dict): Metadata to write
+        dir_fd (int, optional): Open directory the path is relative to
+    """
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with _open_for_writing(temp_path, dir_fd) as f:
+            json.dump(metadata, f, indent=4)
+        os.replace(temp_path, path, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+    except Exception:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_path, dir_fd=dir_fd)
+        raise
 
 def list_projects(directory='.'):
     """
@@ -145,16 +330,29 @@ def list_projects(directory='.'):
         list: List of project names
     """
     try:
-        projects = []
-        for item in os.listdir(directory):
-            path = os.path.join(directory, item)
-            if os.path.isdir(path) and os.path.exists(os.path.join(path, '.project_metadata.json')):
-                projects.append(item)
-        return projects
+        path = os.path.abspath(directory)
+        age_bucket = int(time.monotonic() // PROJECT_LIST_TTL)
+        return list(_scan_projects(path, os.stat(path).st_mtime_ns, age_bucket))
     except Exception as e:
         logging.error(f"Error listing projects in directory {directory}: {str(e)}")
         raise
 
+@functools.lru_cache(maxsize=32)
+def _scan_projects(directory, mtime_ns, age_bucket):
+    # Keyed on the directory's mtime, which changes whenever an entry is
+    # added, removed or renamed in it. Metadata files appearing inside an
+    # existing subdirectory don't change it, so the functions here that
+    # create or delete projects clear this cache themselves, and age_bucket
+    # bounds how long another process's changes can go unseen
+    projects = []
+    # Entry types come from the directory listing, so only directories
+    # cost a stat() call, to look for their metadata file
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, '.project_metadata.json')):
+                projects.append(entry.name)
+    return tuple(projects)
+
 def get_project_info(project_name):
     """
     Get information about a project.
@@ -167,15 +365,23 @@ def get_project_info(project_name):
     """
     try:
         metadata_path = os.path.join(project_name, '.project_metadata.json')
-        if os.path.exists(metadata_path):
-            with open(metadata_path, 'r') as f:
-                return json.load(f)
-        else:
-            raise FileNotFoundError(f"Project metadata not found for '{project_name}'")
+        try:
+            stat_info = os.stat(metadata_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Project metadata not found for '{project_name}'") from None
+        # Copied so callers can't change the cached metadata
+        return copy.deepcopy(_load_metadata(metadata_path, stat_info.st_mtime_ns, stat_info.st_size))
     except Exception as e:
         logging.error(f"Error getting project info for '{project_name}': {str(e)}")
         raise
 
+@functools.lru_cache(maxsize=256)
+def _load_metadata(path, mtime_ns, size):
+    # Keyed on the file's mtime and size as well as its path, so a
+    # rewritten metadata file is read again
+    with open(path, 'r') as f:
+        return json.load(f)
+
 def delete_project(project_name):
     """
     Delete a project.
@@ -187,12 +393,20 @@ def delete_project(project_name):
         bool: True if the project was deleted successfully
     """
     try:
-        if os.path.exists(project_name) and os.path.isdir(project_name):
-            shutil.rmtree(project_name)
-            logging.info(f"Deleted project '{project_name}'")
-            return True
-        else:
+        try:
+            mode = os.lstat(project_name).st_mode
+        except FileNotFoundError:
+            mode = 0
+        if stat.S_ISLNK(mode):
+            raise OSError(f"Project '{project_name}' is a symbolic link")
+        if not stat.S_ISDIR(mode):
             raise FileNotFoundError(f"Project '{project_name}' not found")
+        try:
+            shutil.rmtree(project_name)
+        finally:
+            _scan_projects.cache_clear()
+        logging.info(f"Deleted project '{project_name}'")
+        return True
     except Exception as e:
         logging.error(f"Error deleting project '{project_name}': {str(e)}")
         raise
@@ -219,12 +433,9 @@ def update_project_metadata(project_name, metadata):
         
         # Merge the new metadata with the existing metadata
         current_metadata.update(metadata)
-        current_metadata['updated_at'] = datetime.datetime.now().isoformat()
+        current_metadata['updated_at'] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
         
-        file_operations.write_file(
-            metadata_path,
-            json.dumps(current_metadata, indent=4)
-        )
+        _write_metadata(metadata_path, current_metadata)
         
         return current_metadata
     except Exception as e:
@@ -1,10 +1,11 @@
 import sys
 import os
+import atexit
 import getpass
 import logging
 import readline
-import json
-from datetime import datetime
+import orjson
+from datetime import datetime, timezone
 
 class UserInteraction:
     """
@@ -19,7 +20,14 @@ class UserInteraction:
             history_file (str): Path to the history file
         """
         self.history_file = os.path.expanduser(f"~/{history_file}")
+        # Interaction log files stay open for appending between calls
+        self._log_handles = {}
+        self._vt_enabled = False
+        atexit.register(self._close_logs)
         self._load_history()
+        # Rewriting the history file after every input is wasted I/O; save it
+        # once when the process exits
+        atexit.register(self._save_history)
     
     def _load_history(self):
         """
@@ -68,8 +76,6 @@ class UserInteraction:
         except EOFError:
             print("\nEOF detected. Exiting.")
             sys.exit(0)
-        finally:
-            self._save_history()
     
     def password_prompt(self, message):
         """
@@ -113,8 +119,6 @@ class UserInteraction:
         except EOFError:
             print("\nEOF detected. Exiting.")
             sys.exit(0)
-        finally:
-            self._save_history()
     
     def select_option(self, message, options, allow_cancel=True):
         """
@@ -132,12 +136,12 @@ class UserInteraction:
             return None
         
         try:
-            print(f"{message}:")
-            for i, option in enumerate(options, 1):
-                print(f"  {i}. {option}")
-            
+            # Render the whole menu and write it at once rather than a line at a time
+            lines = [f"{message}:"]
+            lines.extend(f"  {i}. {option}" for i, option in enumerate(options, 1))
             if allow_cancel:
-                print("  0. Cancel")
+                lines.append("  0. Cancel")
+            sys.stdout.write('\n'.join(lines) + '\n')
             
             while True:
                 try:
@@ -161,8 +165,6 @@ class UserInteraction:
         except EOFError:
             print("\nEOF detected. Exiting.")
             sys.exit(0)
-        finally:
-            self._save_history()
     
     def multi_select(self, message, options, default_selected=None):
         """
@@ -182,37 +184,37 @@ class UserInteraction:
         if default_selected is None:
             default_selected = []
         
+        # The selection is a bitmask: bit i set means option number i is selected
+        selected = 0
+        for i in default_selected:
+            if 0 <= i <= len(options):
+                # Index 0 has always meant the first option
+                selected |= 1 << (i or 1)
+        
         try:
-            print(f"{message}:")
+            lines = [f"{message}:"]
             for i, option in enumerate(options, 1):
-                selected = i in default_selected or (i-1) in default_selected
-                marker = "*" if selected else " "
-                print(f"  {i}. [{marker}] {option}")
+                marker = "*" if selected >> i & 1 else " "
+                lines.append(f"  {i}. [{marker}] {option}")
+            lines.append("\nEnter numbers to toggle selection, 'a' to select all, 'n' to select none, or 'd' when done")
+            sys.stdout.write('\n'.join(lines) + '\n')
             
-            print("\nEnter numbers to toggle selection, 'a' to select all, 'n' to select none, or 'd' when done")
-            
-            selected = set(default_selected)
             while True:
                 choice = input("Choice: ").strip().lower()
                 
                 if choice == 'd':
-                    # Convert to 0-based indices
-                    selected_adjusted = {i-1 if i > 0 else i for i in selected}
-                    return [options[i] for i in sorted(selected_adjusted) if 0 <= i < len(options)]
+                    return [option for i, option in enumerate(options, 1) if selected >> i & 1]
                 elif choice == 'a':
-                    selected = set(range(1, len(options) + 1))
+                    selected = (1 << (len(options) + 1)) - 2
                     self._display_multi_select(options, selected)
                 elif choice == 'n':
-                    selected = set()
+                    selected = 0
                     self._display_multi_select(options, selected)
                 else:
                     try:
                         index = int(choice)
                         if 1 <= index <= len(options):
-                            if index in selected:
-                                selected.remove(index)
-                            else:
-                                selected.add(index)
+                            selected ^= 1 << index
                             self._display_multi_select(options, selected)
                         else:
                             print(f"Please enter a number between 1 and {len(options)}")
@@ -224,8 +226,6 @@ class UserInteraction:
         except EOFError:
             print("\nEOF detected. Exiting.")
             sys.exit(0)
-        finally:
-            self._save_history()
     
     def _display_multi_select(self, options, selected):
         """
@@ -233,12 +233,13 @@ class UserInteraction:
         
         Args:
             options (list): List of options
-            selected (set): Set of selected indices
+            selected (int): Bitmask of selected option numbers
         """
-        print("\nCurrent selection:")
+        lines = ["\nCurrent selection:"]
         for i, option in enumerate(options, 1):
-            marker = "*" if i in selected else " "
-            print(f"  {i}. [{marker}] {option}")
+            marker = "*" if selected >> i & 1 else " "
+            lines.append(f"  {i}. [{marker}] {option}")
+        sys.stdout.write('\n'.join(lines) + '\n')
     
     def progress(self, message, total):
         """
@@ -265,26 +266,58 @@ class UserInteraction:
         """
         try:
             log_entry = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
                 'action': action
             }
             
             if details:
                 log_entry['details'] = details
             
-            with open(log_file, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            handle = self._log_handles.get(log_file)
+            if handle is None:
+                # Unbuffered, so each entry lands in the file with a single write
+                handle = self._log_handles[log_file] = open(log_file, 'ab', buffering=0)
+            handle.write(orjson.dumps(log_entry, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE))
         except Exception as e:
             logging.warning(f"Error logging interaction: {str(e)}")
     
+    def _close_logs(self):
+        """
+        Close the open interaction log files.
+        """
+        for handle in self._log_handles.values():
+            handle.close()
+        self._log_handles.clear()
+    
     def clear_screen(self):
         """
         Clear the terminal screen.
         """
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if os.name == 'nt' and not self._vt_enabled:
+            # Running an empty command once switches the Windows 10+ console
+            # into VT mode, so the escape sequences below are understood
+            os.system('')
+            self._vt_enabled = True
+        # Home the cursor and erase the screen and scrollback, as `clear`
+        # does, without spawning a shell for it
+        sys.stdout.write('\x1b[H\x1b[2J\x1b[3J')
+        sys.stdout.flush()
+
+class _LazyUI:
+    """
+    Stand-in for the global UserInteraction that builds it on first use, so
+    importing this module doesn't read the history file.
+    """
+    
+    _instance = None
+    
+    def __getattr__(self, name):
+        if _LazyUI._instance is None:
+            _LazyUI._instance = UserInteraction()
+        return getattr(_LazyUI._instance, name)
 
 # Create a global instance for easy access
-ui = UserInteraction()
+ui = _LazyUI()
 
 # Standalone functions that use the global instance
 def prompt(message, default=None):